@@ -0,0 +1,227 @@
+"""
+공개 API 부하 테스트 (asyncio + httpx)
+- 실행 중인 앱(main:app)에 가상 사용자를 동시에 붙여 실제 클라이언트와 비슷한 요청을 보냄
+  대시보드(/pet-actives), 상태 폴링(/pets/{id}/state), 채팅, 건강/먹이/청결 CRUD, 카메라 업로드 URL 발급
+- 인증은 테스트 모드의 X-Firebase-UID 헤더를 사용하므로 앱을 테스트 모드로 띄워야 함
+  S3는 STORAGE_BACKEND=memory(또는 local)로, DB는 로컬 Postgres로 대체하여 실행
+- 라우트별 p50/p95/p99와 처리량을 출력하고, --levels로 동시 사용자 수를 늘려가며 포화 처리량을 찾음
+
+사용 예:
+    STORAGE_BACKEND=memory DATABASE_URL=postgresql+psycopg2://localhost/capstone uvicorn main:app --workers 2
+    python -m benchmark.load_test --users 20 --duration 30
+    python -m benchmark.load_test --levels 1,2,4,8,16,32 --duration 15
+"""
+import sys
+import time
+import uuid
+import random
+import asyncio
+import argparse
+from collections import defaultdict
+from datetime import date, timedelta
+
+import httpx
+import numpy as np
+
+# 시나리오별 기본 가중치 (채팅은 OpenAI를 호출하므로 --chat-weight로 켤 때만 실행)
+SCENARIO_WEIGHTS = {
+    "dashboard": 30,
+    "state_poll": 40,
+    "health_crud": 8,
+    "feed_crud": 8,
+    "clean_crud": 8,
+    "upload_urls": 6,
+    "chat": 0,
+}
+# 포화 판단: 동시 사용자 수를 늘려도 처리량이 이 비율 이상 늘지 않으면 포화
+SATURATION_GAIN = 0.05
+
+
+class Recorder:
+    """라우트(경로 템플릿)별 지연시간(ms)과 오류 수 집계"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def request(self, client, method, route, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[route] += 1
+            return None
+        finally:
+            self.latencies[route].append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            self.errors[route] += 1
+        return response
+
+    def total(self):
+        return sum(len(values) for values in self.latencies.values())
+
+    def print_routes(self, elapsed):
+        print(f"{'route':<42} {'count':>7} {'errors':>7} {'rps':>8} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9}")
+        for route in sorted(self.latencies):
+            values = np.array(self.latencies[route])
+            print(
+                f"{route:<42} {len(values):>7} {self.errors[route]:>7} {len(values) / elapsed:>8.1f} "
+                f"{np.percentile(values, 50):>9.1f} {np.percentile(values, 95):>9.1f} {np.percentile(values, 99):>9.1f}"
+            )
+
+
+class VirtualUser:
+    """가상 사용자 1명 (사용자/반려동물/장치를 만들고 시나리오를 반복 실행)"""
+
+    def __init__(self, client, recorder, index, run_id):
+        self.client = client
+        self.recorder = recorder
+        self.uid = f"loadtest-{run_id}-{index}"
+        self.headers = {"X-Firebase-UID": self.uid}
+        self.pet_id = None
+        self.sn = None
+        # CRUD 시나리오마다 겹치지 않는 날짜 사용
+        self.next_day = date(2000, 1, 1) + timedelta(days=index * 100000)
+
+    async def call(self, method, route, url=None, **kwargs):
+        return await self.recorder.request(
+            self.client, method, route, url or route, headers=self.headers, **kwargs
+        )
+
+    async def setup(self):
+        await self.call("POST", "/users/", json={"nickname": self.uid[-50:]})
+        response = await self.call("POST", "/pets/", json={
+            "name": "loadtest", "gender": "M", "species": "leopard gecko"
+        })
+        if response is None or response.status_code >= 400:
+            raise RuntimeError(f"pet creation failed for {self.uid}")
+        self.pet_id = response.json()["pet_id"]
+
+        # 카메라 등록 후 사용자에게 등록하고 반려동물에 연결
+        ip = f"10.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 254)}"
+        response = await self.call("GET", "/devices/register", params={"ip": ip})
+        if response is not None and response.status_code < 400:
+            self.sn = response.json()["serial_number"]
+            # 사용자에게 등록된 장치만 반려동물에 연결할 수 있음
+            await self.call("PUT", "/devices/{sn}", f"/devices/{self.sn}", json={"SN": self.sn, "UID": self.uid, "IP": ip})
+            await self.call("PUT", "/pets/{pet_id}/device", f"/pets/{self.pet_id}/device", json={"SN": self.sn})
+
+    async def teardown(self):
+        if self.pet_id:
+            await self.call("DELETE", "/pets/{pet_id}", f"/pets/{self.pet_id}")
+        await self.call("DELETE", "/users/")
+
+    def _day(self):
+        day = self.next_day
+        self.next_day += timedelta(days=1)
+        return day.isoformat()
+
+    async def dashboard(self):
+        await self.call("GET", "/pet-actives/{pet_id}", f"/pet-actives/{self.pet_id}")
+
+    async def state_poll(self):
+        await self.call("GET", "/pets/{pet_id}/state", f"/pets/{self.pet_id}/state")
+
+    async def chat(self):
+        await self.call("POST", "/chats/{pet_id}/query", f"/chats/{self.pet_id}/query",
+                        json={"question": "레오파드 게코 적정 온도는?"})
+
+    async def health_crud(self):
+        url, day = f"/pet-healths/{self.pet_id}", self._day()
+        await self.call("POST", "/pet-healths/{pet_id}", url, json={"date": day, "weight": 52.3, "memo": "loadtest"})
+        await self.call("GET", "/pet-healths/{pet_id}", url, params={"date": day})
+        await self.call("PUT", "/pet-healths/{pet_id}", url, params={"date": day}, json={"weight": 53.1})
+        await self.call("DELETE", "/pet-healths/{pet_id}", url, params={"date": day})
+
+    async def feed_crud(self):
+        url, day = f"/pet-feeds/{self.pet_id}", self._day()
+        key = {"date": day, "food_type": "cricket"}
+        await self.call("POST", "/pet-feeds/{pet_id}", url, json={**key, "food_amount": 5, "amount_unit": "마리"})
+        await self.call("GET", "/pet-feeds/{pet_id}", url, params={"date": day})
+        await self.call("PUT", "/pet-feeds/{pet_id}", url, params=key, json={"food_amount": 6})
+        await self.call("DELETE", "/pet-feeds/{pet_id}", url, params=key)
+
+    async def clean_crud(self):
+        url, day = f"/pet-cleans/{self.pet_id}", self._day()
+        await self.call("POST", "/pet-cleans/{pet_id}", url, json={"date": day, "memo": "loadtest"})
+        await self.call("GET", "/pet-cleans/{pet_id}", url, params={"clean_date": day})
+        await self.call("PUT", "/pet-cleans/{pet_id}", url, params={"date": day}, json={"memo": "updated"})
+        await self.call("DELETE", "/pet-cleans/{pet_id}", url, params={"clean_date": day})
+
+    async def upload_urls(self):
+        if not self.sn:
+            return
+        await self.call("POST", "/s3/stream/upload-urls", json={
+            "SN": self.sn, "filename": f"{self.sn}_20250501_090000.mp4", "count": 10
+        })
+
+
+async def run_level(base_url, users, duration, weights, think_ms, run_id):
+    """동시 사용자 users명으로 duration초 동안 시나리오 반복 실행"""
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=users * 2, max_keepalive_connections=users * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        vusers = [VirtualUser(client, recorder, i, run_id) for i in range(users)]
+        await asyncio.gather(*(vuser.setup() for vuser in vusers))
+
+        # 준비 요청은 측정에서 제외
+        recorder.latencies.clear()
+        recorder.errors.clear()
+
+        names = [name for name, weight in weights.items() if weight > 0]
+        scenario_weights = [weights[name] for name in names]
+        deadline = time.perf_counter() + duration
+
+        async def loop(vuser):
+            while time.perf_counter() < deadline:
+                await getattr(vuser, random.choices(names, scenario_weights)[0])()
+                if think_ms:
+                    await asyncio.sleep(random.uniform(0, 2 * think_ms) / 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(loop(vuser) for vuser in vusers))
+        elapsed = time.perf_counter() - start
+
+        await asyncio.gather(*(vuser.teardown() for vuser in vusers), return_exceptions=True)
+    return recorder, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Public API load test")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="테스트 모드로 실행 중인 앱 주소")
+    parser.add_argument("--users", type=int, default=10, help="동시 가상 사용자 수")
+    parser.add_argument("--levels", default=None, help="포화 탐색용 동시 사용자 수 목록 (쉼표 구분, 지정 시 --users 무시)")
+    parser.add_argument("--duration", type=float, default=30, help="단계별 측정 시간(초)")
+    parser.add_argument("--think-ms", type=float, default=0, help="시나리오 사이 평균 대기 시간(ms)")
+    parser.add_argument("--chat-weight", type=int, default=SCENARIO_WEIGHTS["chat"], help="채팅 시나리오 가중치 (OpenAI 호출)")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    weights = {**SCENARIO_WEIGHTS, "chat": args.chat_weight}
+    levels = [int(v) for v in args.levels.split(",")] if args.levels else [args.users]
+    run_id = uuid.uuid4().hex[:8]
+
+    throughputs = []
+    for users in levels:
+        recorder, elapsed = asyncio.run(run_level(args.base_url, users, args.duration, weights, args.think_ms, run_id))
+        rps = recorder.total() / elapsed
+        all_latencies = np.concatenate([np.array(v) for v in recorder.latencies.values()]) if recorder.total() else np.zeros(1)
+        print(f"\n=== 동시 사용자 {users}명, {elapsed:.1f}s, {recorder.total()}건, {rps:.1f} req/s, "
+              f"p99 {np.percentile(all_latencies, 99):.1f}ms, 오류 {sum(recorder.errors.values())}건 ===")
+        recorder.print_routes(elapsed)
+        throughputs.append((users, rps))
+
+    if len(throughputs) > 1:
+        saturation = throughputs[-1]
+        for (users, rps), (_, next_rps) in zip(throughputs, throughputs[1:]):
+            if next_rps < rps * (1 + SATURATION_GAIN):
+                saturation = (users, rps)
+                break
+        print(f"\n포화 처리량: 약 {saturation[1]:.1f} req/s (동시 사용자 {saturation[0]}명)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
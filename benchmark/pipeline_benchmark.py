@@ -0,0 +1,263 @@
+"""
+활동량 / 히트맵 / 은신 판단 파이프라인 벤치마크
+- 합성 yolo_results 프레임 생성 (장치 수, 초당 프레임 수, 키포인트 수, 박스 누락 비율, 저신뢰 비율 조절)
+- calculate_activity, save_activity_data, generate_heatmap, 은신 규칙(hiding_frame_flags + apply_hiding_rules
+  + 구간 병합)을 각각 측정하여 처리량(frames/s)과 최대 메모리(tracemalloc) 출력
+- save_activity_data는 기본적으로 메모리 SQLite에 저장하며, --database-url로 Postgres를 지정할 수 있음
+  (capstone 스키마는 schema_translate_map으로 대체하므로 별도 준비 불필요)
+
+사용 예:
+    python -m benchmark.pipeline_benchmark --devices 3 --minutes 60 --fps 1
+    python -m benchmark.pipeline_benchmark --stages activity,save --database-url postgresql+psycopg2://...
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+# 파이프라인 모듈이 DB/S3 설정을 임포트 시점에 읽으므로 설정이 없으면 로컬 대체값 사용
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from repository.entity.active_report_entity import ActiveReport
+from repository.entity.active_rollup_entity import ActiveHourlyRollup, ActiveDailyRollup
+from service.active_report_service import ActiveReportService
+from util.active_create import calculate_activity, calculate_activity_from_points
+from util.heatmap_generator import generate_heatmap, cleanup_temp_files
+from util.hiding_detector import HIDING_CHUNK_SIZE, HIDING_MAX_GAP_SECONDS, LOW_CONF_THRESHOLD, \
+    _IntervalBuilder, apply_hiding_rules, hiding_frame_flags
+
+STAGES = ("activity", "save", "heatmap", "hiding")
+FRAME_WIDTH, FRAME_HEIGHT = 1920, 1080
+
+
+def device_serials(count):
+    return [f"SFRXC12515GF{str(i + 1).zfill(5)}" for i in range(count)]
+
+
+def generate_frames(device_serial, start, minutes, fps, keypoints, missing_box_rate, low_conf_rate, seed):
+    """
+    한 장치의 합성 yolo_result 목록 (fetch_yolo_data_by_time_range가 읽는 JSONB와 같은 구조)
+    - 개체 중심은 화면 안에서 랜덤 워크로 이동
+    - missing_box_rate 비율의 프레임은 박스/키포인트 없음, low_conf_rate 비율은 키포인트 대부분이 저신뢰
+    """
+    rng = np.random.default_rng(seed)
+    total = int(minutes * 60 * fps)
+    steps = rng.normal(0, 8, (total, 2))
+    centers = np.cumsum(steps, axis=0) + [FRAME_WIDTH / 2, FRAME_HEIGHT / 2]
+    centers = np.clip(centers, [100, 100], [FRAME_WIDTH - 100, FRAME_HEIGHT - 100])
+    missing = rng.random(total) < missing_box_rate
+    low_conf = rng.random(total) < low_conf_rate
+
+    frames = []
+    for i in range(total):
+        timestamp = (start + timedelta(seconds=i / fps)).strftime("%Y%m%d_%H%M%S")
+        if missing[i]:
+            frames.append({"timestamp": timestamp, "boxes": [], "keypoints": []})
+            continue
+
+        cx, cy = centers[i]
+        kp_xy = rng.normal([cx, cy], 40, (keypoints, 2))
+        if low_conf[i]:
+            kp_conf = rng.uniform(0.0, LOW_CONF_THRESHOLD, keypoints)
+        else:
+            kp_conf = rng.uniform(0.5, 1.0, keypoints)
+        frames.append({
+            "timestamp": timestamp,
+            "boxes": [{"xyxy": [cx - 80, cy - 50, cx + 80, cy + 50], "conf": float(rng.uniform(0.6, 1.0)), "cls": 0}],
+            "keypoints": [[{"xy": [float(x), float(y)], "conf": float(c)} for (x, y), c in zip(kp_xy, kp_conf)]]
+        })
+    return frames
+
+
+def to_dataframe(device_serial, frames):
+    """fetch_yolo_data_by_time_range와 같은 DataFrame 형태"""
+    return pd.DataFrame({
+        "image": [None] * len(frames),
+        "device": [device_serial] * len(frames),
+        "date": [frame["timestamp"][:8] for frame in frames],
+        "yolo_result": frames
+    })
+
+
+def activity_points(frames):
+    """YOLO_ACTIVITY_POINTS_QUERY가 반환하는 (시각, 박스 중심) 배열"""
+    boxed = [frame for frame in frames if frame["boxes"]]
+    times = np.array([datetime.strptime(frame["timestamp"], "%Y%m%d_%H%M%S") for frame in boxed], dtype="datetime64[s]")
+    xyxy = np.array([frame["boxes"][0]["xyxy"] for frame in boxed], dtype=np.float64).reshape(-1, 4)
+    return times, np.column_stack(((xyxy[:, 0] + xyxy[:, 2]) / 2, (xyxy[:, 1] + xyxy[:, 3]) / 2))
+
+
+def hiding_columns(frames):
+    """HIDING_FRAME_COLUMNS 쿼리가 반환하는 (ts, frame_time, box_count, kp_conf) 행"""
+    rows = []
+    for frame in frames:
+        kps = frame["keypoints"][0] if frame["keypoints"] else []
+        rows.append((
+            frame["timestamp"],
+            datetime.strptime(frame["timestamp"], "%Y%m%d_%H%M%S"),
+            len(frame["boxes"]),
+            [kp["conf"] for kp in kps]
+        ))
+    return rows
+
+
+def run_hiding(rows, chunk_size):
+    """process_hiding_for_device의 청크 처리 부분 (carry 없이 청크 경계만 이어붙임)"""
+    builder = _IntervalBuilder(timedelta(seconds=HIDING_MAX_GAP_SECONDS))
+    for offset in range(0, len(rows), chunk_size):
+        chunk = rows[offset:offset + chunk_size]
+        times = np.array([row[1] for row in chunk], dtype="datetime64[s]")
+        no_box, low_conf_hidden = hiding_frame_flags([row[2] for row in chunk], [row[3] for row in chunk])
+        builder.feed(times, apply_hiding_rules(no_box, low_conf_hidden), no_box, low_conf_hidden)
+    return builder.intervals
+
+
+def create_session_factory(database_url):
+    """active_reports와 집계 테이블만 만든 세션 팩토리 (capstone 스키마는 SQLite에서 기본 스키마로 대체)"""
+    schema_map = {"capstone": None} if database_url.startswith("sqlite") else {}
+    engine = create_engine(database_url, execution_options={"schema_translate_map": schema_map})
+    for table in (ActiveReport.__table__, ActiveHourlyRollup.__table__, ActiveDailyRollup.__table__):
+        table.create(bind=engine, checkfirst=True)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def measure(func, repeat):
+    """
+    func를 repeat번 실행한 평균 시간(s)과 tracemalloc 기준 최대 메모리(MiB)
+    (tracemalloc 오버헤드가 시간에 섞이지 않도록 메모리는 별도 1회 실행으로 측정)
+    """
+    result = None
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    seconds = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / 1024 / 1024
+
+
+def report(stage, frames, seconds, peak_mib, note=""):
+    print(f"{stage:<22} {frames:>9} {seconds * 1000:>11.1f} {frames / seconds:>12.0f} {peak_mib:>10.1f}  {note}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Activity / heatmap / hiding pipeline benchmark")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"측정할 단계 (쉼표 구분: {', '.join(STAGES)})")
+    parser.add_argument("--devices", type=int, default=2, help="장치 수")
+    parser.add_argument("--minutes", type=int, default=60, help="장치별 데이터 길이(분)")
+    parser.add_argument("--fps", type=float, default=1.0, help="초당 프레임 수")
+    parser.add_argument("--keypoints", type=int, default=12, help="프레임당 키포인트 수")
+    parser.add_argument("--missing-box-rate", type=float, default=0.1, help="박스가 없는 프레임 비율")
+    parser.add_argument("--low-conf-rate", type=float, default=0.05, help="저신뢰 키포인트 프레임 비율")
+    parser.add_argument("--chunk-size", type=int, default=HIDING_CHUNK_SIZE, help="은신 판단 청크 크기")
+    parser.add_argument("--database-url", default="sqlite://", help="save 단계에서 사용할 DB (기본: 메모리 SQLite)")
+    parser.add_argument("--repeat", type=int, default=3, help="단계별 반복 횟수")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    start = datetime(2025, 5, 1, 9, 0, 0)
+    end = start + timedelta(minutes=args.minutes)
+    data = {
+        sn: generate_frames(sn, start, args.minutes, args.fps, args.keypoints,
+                            args.missing_box_rate, args.low_conf_rate, args.seed + i)
+        for i, sn in enumerate(device_serials(args.devices))
+    }
+    total_frames = sum(len(frames) for frames in data.values())
+    print(f"장치 {args.devices}개, 장치당 {args.minutes}분 x {args.fps}fps, 총 {total_frames}프레임")
+    print(f"{'stage':<22} {'frames':>9} {'time(ms)':>11} {'frames/s':>12} {'peak(MiB)':>10}")
+
+    if "activity" in stages or "save" in stages:
+        frames_df = {sn: to_dataframe(sn, frames) for sn, frames in data.items()}
+        activity = {}
+
+        def run_activity():
+            for sn, df in frames_df.items():
+                activity[sn] = calculate_activity(df, start_time=start, end_time=end)
+
+        _, seconds, peak = measure(run_activity, args.repeat)
+        if "activity" in stages:
+            report("calculate_activity", total_frames, seconds, peak, f"{args.minutes}개 구간/장치, dict 행")
+
+            # 1분 작업 경로: SQL에서 projection한 배열로 바로 계산
+            points = {sn: activity_points(frames) for sn, frames in data.items()}
+
+            def run_activity_points():
+                for sn, (times, centers) in points.items():
+                    calculate_activity_from_points(sn, times, centers, start, end)
+
+            _, seconds, peak = measure(run_activity_points, args.repeat)
+            report("activity (arrays)", total_frames, seconds, peak, f"{args.minutes}개 구간/장치, 배열")
+
+    if "save" in stages:
+        engine, Session = create_session_factory(args.database_url)
+        service = ActiveReportService()
+        rows = sum(len(df) for df in activity.values())
+
+        def run_save():
+            db = Session()
+            try:
+                return sum(service.save_activity_data(db, df) for df in activity.values())
+            finally:
+                db.close()
+
+        def clear():
+            with engine.begin() as connection:
+                for entity in (ActiveReport, ActiveHourlyRollup, ActiveDailyRollup):
+                    connection.execute(entity.__table__.delete().where(entity.SN.in_(list(activity))))
+
+        # INSERT 경로: 실행마다 행을 비운 뒤 저장 / UPDATE 경로: 이미 있는 행에 다시 저장
+        def run_insert():
+            clear()
+            return run_save()
+
+        _, seconds, peak = measure(run_insert, args.repeat)
+        report("save_activity (insert)", rows, seconds, peak, f"{rows}행, {engine.dialect.name}")
+        _, seconds, peak = measure(run_save, args.repeat)
+        report("save_activity (update)", rows, seconds, peak, f"{rows}행, {engine.dialect.name}")
+
+        clear()
+        engine.dispose()
+
+    if "heatmap" in stages:
+        frames = next(iter(data.values()))
+
+        def run_heatmap():
+            path = generate_heatmap(frames)
+            cleanup_temp_files(path)
+            return path
+
+        path, seconds, peak = measure(run_heatmap, args.repeat)
+        report("generate_heatmap", len(frames), seconds, peak, "1개 장치" if path else "키포인트 부족")
+
+    if "hiding" in stages:
+        rows = {sn: hiding_columns(frames) for sn, frames in data.items()}
+
+        def run_all_hiding():
+            return sum(len(run_hiding(device_rows, args.chunk_size)) for device_rows in rows.values())
+
+        intervals, seconds, peak = measure(run_all_hiding, args.repeat)
+        report("hiding rules", total_frames, seconds, peak, f"{intervals}개 구간, 청크 {args.chunk_size}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+RAG 검색 인덱스 벤치마크
+- llm_api/rag_faiss.index(Flat)의 벡터로 Flat / IVF-PQ / HNSW 인덱스를 생성
+- 보류(held-out) 질문 세트에 대해 Flat 결과를 정답으로 recall@k 계산
+- 질문 1건 단위 검색 지연시간의 p50/p99 측정 (retrieve()와 같은 호출 방식)
+- --scale 옵션으로 코퍼스를 노이즈 섞어 복제하여 대규모 코퍼스를 흉내냄
+
+사용 예:
+    python -m benchmark.retrieval_benchmark --scale 100 --k 3
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+# rag_qa_prompt가 repository를 임포트하므로 DB 설정이 없으면 메모리 DB로 대체
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sentence_transformers import SentenceTransformer
+from llm_api.rag_qa_prompt import EMBED_MODEL_NAME, build_index, load_flat_vectors
+
+QUESTIONS_JSON = os.path.join(os.path.dirname(__file__), "data", "heldout_questions.json")
+
+
+def scale_corpus(vectors, scale, noise, seed=0):
+    """코퍼스를 scale배로 복제하고 가우시안 노이즈를 더한다."""
+    if scale <= 1:
+        return vectors
+    rng = np.random.default_rng(seed)
+    copies = [vectors]
+    for _ in range(scale - 1):
+        jittered = vectors + rng.normal(0, noise, vectors.shape).astype("float32")
+        jittered /= np.linalg.norm(jittered, axis=1, keepdims=True)
+        copies.append(jittered)
+    return np.vstack(copies).astype("float32")
+
+
+def measure(index, queries, k):
+    """질문별로 1건씩 검색하여 결과와 지연시간(ms)을 반환"""
+    results = []
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        _, indices = index.search(q.reshape(1, -1), k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(indices[0])
+    return np.array(results), np.array(latencies)
+
+
+def recall_at_k(approx, truth, k):
+    hits = [len(set(a[:k]) & set(t[:k])) / k for a, t in zip(approx, truth)]
+    return float(np.mean(hits))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RAG retrieval index benchmark")
+    parser.add_argument("--index-types", default="flat,ivfpq,hnsw", help="비교할 인덱스 종류 (쉼표 구분)")
+    parser.add_argument("--k", type=int, default=3, help="recall@k의 k")
+    parser.add_argument("--scale", type=int, default=1, help="코퍼스 복제 배수")
+    parser.add_argument("--noise", type=float, default=0.02, help="복제 벡터에 더할 노이즈 표준편차")
+    parser.add_argument("--questions", default=QUESTIONS_JSON, help="보류 질문 세트 JSON 경로")
+    args = parser.parse_args()
+
+    with open(args.questions, "r", encoding="utf-8") as f:
+        questions = json.load(f)
+
+    vectors = scale_corpus(load_flat_vectors(), args.scale, args.noise)
+    print(f"코퍼스 벡터 {vectors.shape[0]}개 (dim={vectors.shape[1]}), 질문 {len(questions)}개")
+
+    model = SentenceTransformer(EMBED_MODEL_NAME)
+    queries = model.encode(questions, convert_to_numpy=True).astype("float32")
+
+    baseline = build_index(vectors, "flat")
+    truth, _ = measure(baseline, queries, args.k)
+
+    print(f"{'index':<8} {'build(s)':>9} {'recall@' + str(args.k):>10} {'p50(ms)':>9} {'p99(ms)':>9}")
+    for index_type in [t.strip() for t in args.index_types.split(",") if t.strip()]:
+        start = time.perf_counter()
+        index = build_index(vectors, index_type)
+        build_seconds = time.perf_counter() - start
+
+        approx, latencies = measure(index, queries, args.k)
+        print(
+            f"{index_type:<8} {build_seconds:>9.2f} {recall_at_k(approx, truth, args.k):>10.3f} "
+            f"{np.percentile(latencies, 50):>9.3f} {np.percentile(latencies, 99):>9.3f}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+스토리지 경로 벤치마크
+- 실제 버킷 대신 로컬 스토리지 백엔드(db/storage_backend.py)에 서비스와 같은 키 구조로 객체를 채움
+  (stream/{SN}/{YYYYMMDD}/{SN}_{YYYYMMDD}_{HHMMSS}.mp4, 1분 단위 영상, heatmap/{YYYYMMDD}/{SN}_heatmap.png)
+- 날짜 목록 조회(페이지네이션), 캐시된 목록 조회, URL 서명, 존재 확인(HEAD), 업로드 처리량을 측정
+- --latency-ms로 S3 API 호출마다 왕복 지연을 더해 캐싱 전략별 차이를 비교
+
+사용 예:
+    python -m benchmark.storage_benchmark --devices 5 --days 3 --latency-ms 20
+    python -m benchmark.storage_benchmark --backend local --root /tmp/storage-bench
+"""
+import os
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+from botocore.exceptions import ClientError
+from cachetools import TTLCache
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from db.storage_backend import LocalStorageClient
+
+BUCKET = "benchmark"
+
+
+def device_serials(count):
+    return [f"SFRXC12515GF{str(i + 1).zfill(5)}" for i in range(count)]
+
+
+def video_keys(sn, date_str, clips_per_day):
+    start = datetime.strptime(date_str, "%Y%m%d")
+    for minute in range(clips_per_day):
+        clip_time = start + timedelta(minutes=minute)
+        yield f"stream/{sn}/{date_str}/{sn}_{clip_time.strftime('%Y%m%d_%H%M%S')}.mp4"
+
+
+def populate(client, serials, dates, clips_per_day, object_size):
+    """객체 채우기 (업로드 처리량 측정 겸)"""
+    body = b"\0" * object_size
+    count = 0
+    start = time.perf_counter()
+    for sn in serials:
+        for date_str in dates:
+            for key in video_keys(sn, date_str, clips_per_day):
+                client.put_object(Bucket=BUCKET, Key=key, Body=body, ContentType="video/mp4")
+                count += 1
+            client.put_object(Bucket=BUCKET, Key=f"heatmap/{date_str}/{sn}_heatmap.png", Body=body, ContentType="image/png")
+            count += 1
+    elapsed = time.perf_counter() - start
+    return count, elapsed
+
+
+def list_prefix(client, prefix):
+    """continuation token으로 prefix 전체 조회"""
+    keys = []
+    for page in client.get_paginator("list_objects_v2").paginate(Bucket=BUCKET, Prefix=prefix):
+        keys.extend(obj["Key"] for obj in page.get("Contents", []))
+    return keys
+
+
+def timed(func, repeat):
+    """func를 repeat번 실행한 지연시간(ms) 배열"""
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+
+def report(name, latencies, calls=None):
+    extra = f" {calls:>9}" if calls is not None else f" {'-':>9}"
+    print(f"{name:<28} {np.percentile(latencies, 50):>9.3f} {np.percentile(latencies, 99):>9.3f}{extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Storage path benchmark on a local storage backend")
+    parser.add_argument("--backend", choices=["memory", "local"], default="memory", help="스토리지 백엔드")
+    parser.add_argument("--root", default=None, help="local 백엔드 저장 디렉토리")
+    parser.add_argument("--devices", type=int, default=3, help="장치 수")
+    parser.add_argument("--days", type=int, default=2, help="날짜 수")
+    parser.add_argument("--clips-per-day", type=int, default=1440, help="하루 영상 수 (1분 단위 = 1440)")
+    parser.add_argument("--object-size", type=int, default=1024, help="객체 크기(bytes)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="S3 API 호출당 추가 지연(ms)")
+    parser.add_argument("--repeat", type=int, default=20, help="측정 반복 횟수")
+    parser.add_argument("--page-size", type=int, default=50, help="API 페이지 크기 (서명할 객체 수)")
+    args = parser.parse_args()
+
+    if args.backend == "local" and not args.root:
+        parser.error("--root is required for the local backend")
+
+    serials = device_serials(args.devices)
+    first_day = datetime(2025, 5, 1)
+    dates = [(first_day + timedelta(days=i)).strftime("%Y%m%d") for i in range(args.days)]
+
+    # 채우는 동안에는 지연 없이, 측정 시에만 지연 적용
+    client = LocalStorageClient(root=args.root if args.backend == "local" else None)
+    count, elapsed = populate(client, serials, dates, args.clips_per_day, args.object_size)
+    print(f"객체 {count}개 업로드: {elapsed:.2f}s ({count / elapsed:.0f} objects/s, "
+          f"{count * args.object_size / elapsed / 1024 / 1024:.1f} MiB/s)")
+    client.latency = args.latency_ms / 1000.0
+
+    sn, date_str = serials[0], dates[0]
+    prefix = f"stream/{sn}/{date_str}/"
+    keys = list(video_keys(sn, date_str, args.clips_per_day))
+    page_keys = keys[:args.page_size]
+
+    print(f"{'operation':<28} {'p50(ms)':>9} {'p99(ms)':>9} {'S3 calls':>9}")
+
+    # 1. 목록 조회: 매번 S3 전체 페이지네이션
+    client.call_counts.clear()
+    report("list day (uncached)", timed(lambda: list_prefix(client, prefix), args.repeat),
+           client.call_counts.get("ListObjectsV2", 0))
+
+    # 2. 목록 조회: (sn, date)별 TTL 캐시 (s3_service와 같은 전략)
+    cache = TTLCache(maxsize=1000, ttl=30)
+
+    def cached_list():
+        if (sn, date_str) not in cache:
+            cache[(sn, date_str)] = list_prefix(client, prefix)
+        return cache[(sn, date_str)]
+
+    client.call_counts.clear()
+    report("list day (ttl cache)", timed(cached_list, args.repeat), client.call_counts.get("ListObjectsV2", 0))
+
+    # 3. 서명: 하루 전체 vs 반환할 페이지만
+    sign = lambda key: client.generate_presigned_url("get_object", Params={"Bucket": BUCKET, "Key": key}, ExpiresIn=3600)
+    report(f"sign all ({len(keys)})", timed(lambda: [sign(k) for k in keys], args.repeat))
+    report(f"sign page ({len(page_keys)})", timed(lambda: [sign(k) for k in page_keys], args.repeat))
+
+    # 4. 존재 확인: HEAD 후 서명 (db/s3_utils.generate_presigned_url) vs 목록 캐시로 확인
+    def head_then_sign(key):
+        try:
+            client.head_object(Bucket=BUCKET, Key=key)
+        except ClientError:
+            return None
+        return sign(key)
+
+    client.call_counts.clear()
+    report("head + sign (hit)", timed(lambda: head_then_sign(keys[0]), args.repeat),
+           client.call_counts.get("HeadObject", 0))
+    client.call_counts.clear()
+    report("head + sign (miss)", timed(lambda: head_then_sign(prefix + "missing.mp4"), args.repeat),
+           client.call_counts.get("HeadObject", 0))
+
+    listed = set(cached_list())
+    client.call_counts.clear()
+    report("cached listing + sign", timed(lambda: sign(keys[0]) if keys[0] in listed else None, args.repeat),
+           sum(client.call_counts.values()))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,7 @@
 - RDS에서 capstone.yolo_results에서 YOLO 결과 데이터를 불러옴 (app.yolo_results가 아님)
 - 최근 15분 단위 활동량 데이터 계산
 - 계산된 데이터를 capstone.active_reports 테이블에 저장
+- 저장한 시간/일 버킷의 집계(capstone.active_hourly_rollups, active_daily_rollups) 갱신
 - 테이블이 없는 경우 자동 생성
 - 크론잡으로 매 시간 15분마다 실행 (00:15, 00:30, 00:45, 01:00, ...)
 - 한국시간(UTC+9) 기준
@@ -21,6 +22,13 @@ from dotenv import load_dotenv
 from sqlalchemy import create_engine, text, MetaData, Table, Column, String, Float, insert, inspect
 from sqlalchemy.orm import sessionmaker
 
+# crontab 실행 시 프로젝트 루트 모듈 임포트용
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from repository.active_rollup_repository import ActiveRollupRepository
+from repository.entity.active_rollup_entity import ActiveHourlyRollup, ActiveDailyRollup
+from util.yolo_partition import partition_date_range
+
 # 5분 단위 실행 crontab
 
 # 로깅 설정
@@ -33,6 +41,30 @@ logger = logging.getLogger(__name__)
 # 한국 시간대 설정
 KST = pytz_timezone('Asia/Seoul')
 
+YOLO_TIME_RANGE_QUERY = text("""
+    SELECT image, device, date, yolo_result
+    FROM capstone.yolo_results
+    WHERE device = :device_serial
+    AND date BETWEEN :start_date AND :end_date
+    AND yolo_result->>'timestamp' >= :start_ts
+    AND yolo_result->>'timestamp' < :end_ts
+    ORDER BY yolo_result->>'timestamp'
+""")
+
+YOLO_ALL_QUERY = text("""
+    SELECT image, device, date, yolo_result
+    FROM capstone.yolo_results
+    WHERE device = :device_serial
+    ORDER BY yolo_result->>'timestamp'
+""")
+
+# (SN, DATE, TIME) 기본 키 기준으로 있으면 갱신, 없으면 삽입
+UPSERT_ACTIVE_REPORT_QUERY = text("""
+    INSERT INTO capstone.active_reports ("SN", "DATE", "TIME", active)
+    VALUES (:SN, :DATE, :TIME, :active)
+    ON CONFLICT ("SN", "DATE", "TIME") DO UPDATE SET active = EXCLUDED.active
+""")
+
 
 def get_kst_now():
     """현재 한국 시간 반환"""
@@ -91,6 +123,10 @@ def ensure_active_reports_table_exists(engine):
     else:
         logger.info("Table capstone.active_reports already exists")
 
+    # 집계 테이블이 없으면 생성
+    ActiveHourlyRollup.__table__.create(bind=engine, checkfirst=True)
+    ActiveDailyRollup.__table__.create(bind=engine, checkfirst=True)
+
 
 def get_time_range():
     """
@@ -123,17 +159,15 @@ def fetch_yolo_data_by_time_range(session, device_serial, start_time, end_time):
         start_str = start_time.strftime("%Y%m%d_%H%M%S")
         end_str = end_time.strftime("%Y%m%d_%H%M%S")
 
-        # SQL 쿼리 구성
-        query = text(f"""
-            SELECT image, device, date, yolo_result 
-            FROM capstone.yolo_results 
-            WHERE device = '{device_serial}' 
-            AND yolo_result->>'timestamp' >= '{start_str}' 
-            AND yolo_result->>'timestamp' < '{end_str}'
-            ORDER BY yolo_result->>'timestamp'
-        """)
-
-        result = session.execute(query)
+        # 파티션 프루닝용 date 범위
+        start_date, end_date = partition_date_range(start_time, end_time)
+        result = session.execute(YOLO_TIME_RANGE_QUERY, {
+            "device_serial": device_serial,
+            "start_date": start_date,
+            "end_date": end_date,
+            "start_ts": start_str,
+            "end_ts": end_str
+        })
 
         # 결과를 DataFrame으로 변환
         rows = []
@@ -160,15 +194,7 @@ def fetch_all_yolo_data(session, device_serial):
     테스트 모드용
     """
     try:
-        # SQL 쿼리 구성
-        query = text(f"""
-            SELECT image, device, date, yolo_result 
-            FROM capstone.yolo_results 
-            WHERE device = '{device_serial}'
-            ORDER BY yolo_result->>'timestamp'
-        """)
-
-        result = session.execute(query)
+        result = session.execute(YOLO_ALL_QUERY, {"device_serial": device_serial})
 
         # 결과를 DataFrame으로 변환
         rows = []
@@ -268,34 +294,18 @@ def save_activity_data(engine, session, activity_df):
         return 0
 
     try:
-        count = 0
-        for _, row in activity_df.iterrows():
-            # 이미 존재하는 데이터 확인 쿼리
-            check_query = text(f"""
-                SELECT COUNT(*) FROM capstone.active_reports 
-                WHERE "SN" = '{row["SN"]}' AND "DATE" = '{row["DATE"]}' AND "TIME" = '{row["TIME"]}'
-            """)
-            result = session.execute(check_query).scalar()
-
-            if result > 0:
-                # 기존 데이터 업데이트
-                update_query = text(f"""
-                    UPDATE capstone.active_reports 
-                    SET active = {row["active"]} 
-                    WHERE "SN" = '{row["SN"]}' AND "DATE" = '{row["DATE"]}' AND "TIME" = '{row["TIME"]}'
-                """)
-                session.execute(update_query)
-                logger.debug(f"Updated activity for {row['SN']} on {row['DATE']} at {row['TIME']}")
-            else:
-                # 새 데이터 삽입
-                insert_query = text(f"""
-                    INSERT INTO capstone.active_reports ("SN", "DATE", "TIME", active)
-                    VALUES ('{row["SN"]}', '{row["DATE"]}', '{row["TIME"]}', {row["active"]})
-                """)
-                session.execute(insert_query)
-                logger.debug(f"Inserted activity for {row['SN']} on {row['DATE']} at {row['TIME']}")
-
-            count += 1
+        # 한 번의 executemany로 모든 행을 upsert
+        records = [
+            {"SN": row["SN"], "DATE": row["DATE"], "TIME": row["TIME"], "active": float(row["active"])}
+            for row in activity_df.to_dict("records")
+        ]
+        session.execute(UPSERT_ACTIVE_REPORT_QUERY, records)
+        count = len(records)
+
+        # 대시보드가 읽는 시간/일 단위 집계 갱신
+        ActiveRollupRepository().refresh_touched(
+            session, ((record["SN"], record["DATE"], record["TIME"]) for record in records)
+        )
 
         session.commit()
         logger.info(f"Saved {count} activity records to database")
@@ -0,0 +1,74 @@
+"""
+활동량 집계 재생성 스크립트
+- capstone.active_reports의 1분 단위 활동량으로 시간/일 단위 집계를 다시 계산
+  (capstone.active_hourly_rollups, capstone.active_daily_rollups, 테이블이 없으면 자동 생성)
+- 집계 테이블 도입 전 데이터 백필이나 active_reports를 직접 수정한 뒤 1회 실행
+  (평소에는 활동량 작업이 저장할 때마다 해당 버킷만 갱신)
+"""
+#active_rollup.py
+import os
+import sys
+import argparse
+import logging
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# crontab 실행 시 프로젝트 루트 모듈 임포트용
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def connect_to_db():
+    """데이터베이스 연결"""
+    # .env 파일 로드
+    load_dotenv()
+
+    # 데이터베이스 URL 가져오기
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise ValueError("DATABASE_URL environment variable is not set")
+
+    # SQLAlchemy 엔진 및 세션 생성
+    engine = create_engine(db_url)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    return engine, Session()
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="Rebuild hourly and daily activity rollups")
+    parser.add_argument("--device", help="처리할 장치 시리얼 번호 (생략 시 모든 장치)")
+    parser.add_argument("--since", help="이 날짜(YYYYMMDD) 이후만 재계산 (생략 시 전체 기간)")
+    args = parser.parse_args()
+
+    engine, session = connect_to_db()
+
+    from repository.active_rollup_repository import ActiveRollupRepository
+    from repository.entity.active_rollup_entity import ActiveHourlyRollup, ActiveDailyRollup
+
+    try:
+        # 집계 테이블이 없으면 생성
+        ActiveHourlyRollup.__table__.create(bind=engine, checkfirst=True)
+        ActiveDailyRollup.__table__.create(bind=engine, checkfirst=True)
+
+        days = ActiveRollupRepository().rebuild(session, args.device, args.since)
+        session.commit()
+        logger.info(f"✅ Rebuilt activity rollups for {days} device-days")
+        return 0
+    except Exception as e:
+        session.rollback()
+        logger.error(f"❌ Activity rollup rebuild failed: {e}")
+        return 1
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
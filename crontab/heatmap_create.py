@@ -55,13 +55,15 @@ def connect_to_s3():
     s3 = boto3.client("s3", region_name=region, aws_access_key_id=access_key, aws_secret_access_key=secret_key)
     return s3, bucket_name
 
+YOLO_BY_DATE_QUERY = text("SELECT yolo_result FROM capstone.yolo_results WHERE device = :device_serial AND date = :date")
+YOLO_ALL_QUERY = text("SELECT yolo_result FROM capstone.yolo_results WHERE device = :device_serial")
+
 def fetch_yolo_data(db, device_serial, date_str=None):
     if date_str:
         formatted_date = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
-        query = text(f"SELECT yolo_result FROM capstone.yolo_results WHERE device = '{device_serial}' AND date = '{formatted_date}'")
+        result = db.execute(YOLO_BY_DATE_QUERY, {"device_serial": device_serial, "date": formatted_date})
     else:
-        query = text(f"SELECT yolo_result FROM capstone.yolo_results WHERE device = '{device_serial}'")
-    result = db.execute(query)
+        result = db.execute(YOLO_ALL_QUERY, {"device_serial": device_serial})
     return [row[0] for row in result]
 
 def generate_heatmap(yolo_results, output_path=None):
@@ -1,83 +1,84 @@
-import numpy as np
-import pandas as pd
-import json
+"""
+은신 구간 감지 스크립트
+- capstone.yolo_results에서 장치별로 마지막 체크포인트 이후 프레임만 청크 단위로 스트리밍
+- 박스 없음 / 저신뢰 키포인트 규칙을 NumPy 마스크로 판단 (util/hiding_detector.py)
+- 연속된 은신 프레임을 구간으로 병합하여 capstone.hiding_intervals 테이블에 저장
+- 장치별 체크포인트는 capstone.hiding_checkpoints 테이블에 저장 (테이블이 없으면 자동 생성)
+"""
+#hiding_detector.py
+import os
+import sys
+import argparse
+import logging
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-import os
-from shapely.geometry import Point
 
-# service logic 에 추가할 것
+# crontab 실행 시 프로젝트 루트 모듈 임포트용
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
 
-# DB 연결 설정
-load_dotenv()
-db_url = os.getenv("DATABASE_URL")
-engine = create_engine(db_url)
-Session = sessionmaker(bind=engine)
-session = Session()
 
-# 데이터 로드
-query = text("SELECT yolo_result FROM capstone.yolo_results ORDER BY yolo_result->>'timestamp'")
-results = session.execute(query)
-data = [row[0] for row in results]
+def connect_to_db():
+    """데이터베이스 연결"""
+    # .env 파일 로드
+    load_dotenv()
 
-hide_log = []
-added_timestamps = set()
-prev_info = {"timestamp": None, "no_box": False}
+    # 데이터베이스 URL 가져오기
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise ValueError("DATABASE_URL environment variable is not set")
 
-for i, yolo_data in enumerate(data):
-    timestamp = yolo_data.get("timestamp")
-    boxes = yolo_data.get("boxes", [])
-    keypoints_list = yolo_data.get("keypoints", [[]])[0]  # keypoints[0]
+    # SQLAlchemy 엔진 및 세션 생성
+    engine = create_engine(db_url)
+    Session = sessionmaker(bind=engine)
+    return engine, Session()
 
-    is_hiding = False
-    hide_reason = ""
-    low_conf_kpts = []
 
-    if not boxes:
-        if prev_info["no_box"]:
-            for ts in [prev_info["timestamp"], timestamp]:
-                if ts not in added_timestamps:
-                    hide_log.append({
-                        "timestamp": ts,
-                        "reason": "연속된 박스 없음"
-                    })
-                    added_timestamps.add(ts)
-        prev_info = {"timestamp": timestamp, "no_box": True}
-        continue
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="Detect hiding intervals and save them")
+    parser.add_argument("--device", help="처리할 장치 시리얼 번호 (생략 시 등록된 모든 장치)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="한 번에 가져올 프레임 수")
+    args = parser.parse_args()
 
-    prev_info["no_box"] = False
+    engine, session = connect_to_db()
 
-    # 유효 키포인트 판단
-    low_conf_kpts = [
-        {"name": kp["name"], "conf": kp["conf"]}
-        for kp in keypoints_list if kp["conf"] <= 0.3
-    ]
+    from util.hiding_detector import (
+        HIDING_CHUNK_SIZE,
+        process_hiding_for_device,
+        process_hiding_for_all_devices
+    )
+    from repository.entity.hiding_interval_entity import HidingInterval, HidingCheckpoint
 
-    if len(low_conf_kpts) >= 6:
-        is_hiding = True
-        hide_reason = "low_conf >= 6"
+    try:
+        # 결과 테이블이 없으면 생성
+        HidingInterval.__table__.create(bind=engine, checkfirst=True)
+        HidingCheckpoint.__table__.create(bind=engine, checkfirst=True)
 
-    if is_hiding and timestamp not in added_timestamps:
-        hide_log.append({
-            "timestamp": timestamp,
-            "reason": hide_reason,
-            "low_conf": low_conf_kpts
-        })
-        added_timestamps.add(timestamp)
+        chunk_size = args.chunk_size or HIDING_CHUNK_SIZE
+        if args.device:
+            results = [process_hiding_for_device(session, args.device, chunk_size)]
+        else:
+            results = process_hiding_for_all_devices(session, chunk_size)
 
-        if prev_info["no_box"] and prev_info["timestamp"] not in added_timestamps:
-            hide_log.append({
-                "timestamp": prev_info["timestamp"],
-                "reason": f"뒤 프레임({timestamp})이 은신으로 판단됨 → 이전도 은신으로 간주"
-            })
-            added_timestamps.add(prev_info["timestamp"])
+        for result in results:
+            logger.info(f"{result['device']}: {result['frames']} frames, {result['intervals']} intervals")
+        logger.info("✅ Hiding detection complete")
+        return 0
+    except Exception as e:
+        session.rollback()
+        logger.error(f"❌ Hiding detection failed: {e}")
+        return 1
+    finally:
+        session.close()
 
-    prev_info = {"timestamp": timestamp, "no_box": False}
 
-# 출력
-print(f"📦 은신 프레임 수: {len(hide_log)}")
-for log in hide_log:
-    print(f"{log['timestamp']} - {log['reason']}")
-    for kp in log.get("low_conf", []):
-        print(f"  ↪ {kp['name']}: {kp['conf']:.3f}")
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
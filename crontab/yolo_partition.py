@@ -0,0 +1,84 @@
+"""
+YOLO 결과 테이블 파티션 관리 스크립트
+- migrate: capstone.yolo_results를 date 기준 월 단위 범위 파티션 테이블로 1회 전환 (기존 데이터는 legacy 파티션)
+- maintain: 미래 월 파티션을 미리 생성하고, 보관 기간이 지난 파티션을 S3에 압축 Parquet로 보관 후 분리/삭제
+  (archive/yolo_results/yolo_results_pYYYYMM.parquet 형식, 매일 crontab으로 실행)
+"""
+#yolo_partition.py
+import os
+import sys
+import argparse
+import logging
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+
+# crontab 실행 시 프로젝트 루트 모듈 임포트용
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def connect_to_db():
+    """데이터베이스 엔진 생성"""
+    # .env 파일 로드
+    load_dotenv()
+
+    # 데이터베이스 URL 가져오기
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise ValueError("DATABASE_URL environment variable is not set")
+
+    return create_engine(db_url)
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="Manage capstone.yolo_results partitions")
+    parser.add_argument("command", choices=["migrate", "maintain"], help="migrate: 파티션 테이블로 전환, maintain: 생성/보관")
+    parser.add_argument("--premake-months", type=int, default=None, help="미리 만들 미래 월 파티션 수")
+    parser.add_argument("--retention-months", type=int, default=None, help="DB에 남길 개월 수")
+    parser.add_argument("--keep-detached", action="store_true", help="보관 후 분리한 파티션 테이블을 삭제하지 않음")
+    args = parser.parse_args()
+
+    engine = connect_to_db()
+
+    from db.s3_utils import get_s3_client, get_bucket_name
+    from util.yolo_partition import (
+        YOLO_PARTITION_PREMAKE_MONTHS,
+        YOLO_RETENTION_MONTHS,
+        migrate_to_partitioned,
+        ensure_future_partitions,
+        archive_expired_partitions
+    )
+
+    try:
+        if args.command == "migrate":
+            converted = migrate_to_partitioned(engine)
+            logger.info("✅ Converted to partitioned table" if converted else "Already partitioned, nothing to do")
+            return 0
+
+        with engine.begin() as connection:
+            created = ensure_future_partitions(
+                connection, months=YOLO_PARTITION_PREMAKE_MONTHS if args.premake_months is None else args.premake_months
+            )
+        archived = archive_expired_partitions(
+            engine, get_s3_client(), get_bucket_name(),
+            retention_months=YOLO_RETENTION_MONTHS if args.retention_months is None else args.retention_months,
+            drop=not args.keep_detached
+        )
+        logger.info(f"✅ Partition maintenance complete: created {created or 'none'}, archived {archived or 'none'}")
+        return 0
+    except Exception as e:
+        logger.error(f"❌ Partition maintenance failed: {e}")
+        return 1
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,3 +14,13 @@ engine = create_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
+
+
+def ensure_indexes(bind=engine):
+    """
+    create_all은 이미 존재하는 테이블에 인덱스를 추가하지 않으므로
+    엔티티에 선언된 인덱스를 개별적으로 확인 후 생성
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
@@ -0,0 +1,47 @@
+# /db/prepared.py
+
+import os
+import re
+import logging
+from typing import Any, Dict
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# 1분 주기 작업처럼 자주 실행되는 쿼리를 Postgres 서버 측 prepared statement로 실행
+# (pgbouncer transaction pooling 등 연결별 상태를 유지할 수 없는 환경에서는 false)
+PG_PREPARED_STATEMENTS = os.getenv("PG_PREPARED_STATEMENTS", "true").lower() == "true"
+
+# :name 형태의 바인드 파라미터 (::type 캐스트는 제외)
+_BIND_PARAM = re.compile(r"(?<![:\w]):(\w+)")
+
+
+class PreparedQuery:
+    """
+    연결마다 한 번 PREPARE 후 EXECUTE로 실행하는 쿼리 (Postgres 전용)
+    - 연결(DBAPI connection)별로 준비 여부를 기억하여 처음 사용할 때만 PREPARE
+    - Postgres가 아니거나 PG_PREPARED_STATEMENTS=false이면 일반 바인딩 쿼리로 실행
+    """
+
+    def __init__(self, name: str, sql: str):
+        self.name = name
+        self.query = text(sql)
+        self.param_names = list(dict.fromkeys(_BIND_PARAM.findall(sql)))
+        positions = {param: i + 1 for i, param in enumerate(self.param_names)}
+        self.prepare_sql = f"PREPARE {name} AS " + _BIND_PARAM.sub(lambda m: f"${positions[m.group(1)]}", sql)
+        args = ", ".join(f":{param}" for param in self.param_names)
+        self.execute_query = text(f"EXECUTE {name}({args})" if args else f"EXECUTE {name}")
+
+    def execute(self, db: Session, params: Dict[str, Any]):
+        connection = db.connection()
+        if not PG_PREPARED_STATEMENTS or connection.dialect.name != "postgresql":
+            return connection.execute(self.query, params)
+
+        prepared = connection.connection.info.setdefault("prepared_statements", set())
+        if self.name not in prepared:
+            connection.exec_driver_sql(self.prepare_sql, execution_options={"no_parameters": True})
+            prepared.add(self.name)
+            logger.debug(f"Prepared statement {self.name}")
+        return connection.execute(self.execute_query, params)
@@ -1,6 +1,5 @@
 # /db/s3_utils.py
 
-import boto3
 import os
 from dotenv import load_dotenv
 import logging
@@ -17,13 +16,10 @@ REGION = os.getenv("AWS_REGION")
 AWS_ACCESS_KEY = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 
-# S3 클라이언트 초기화
-s3_client = boto3.client(
-    "s3",
-    region_name=REGION,
-    aws_access_key_id=AWS_ACCESS_KEY,
-    aws_secret_access_key=AWS_SECRET_KEY,
-)
+from db.storage_backend import create_storage_client, STORAGE_BACKEND
+
+# S3 클라이언트 초기화 (STORAGE_BACKEND=local/memory이면 로컬 스토리지 사용)
+s3_client = create_storage_client(REGION, AWS_ACCESS_KEY, AWS_SECRET_KEY)
 
 
 def get_s3_client():
@@ -31,7 +27,7 @@ def get_s3_client():
     S3 클라이언트 반환
 
     Returns:
-        boto3.client: S3 클라이언트
+        boto3.client: S3 클라이언트 (또는 같은 API의 로컬 스토리지 클라이언트)
     """
     return s3_client
 
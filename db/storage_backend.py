@@ -0,0 +1,201 @@
+# /db/storage_backend.py
+
+import hashlib
+import hmac
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, Optional
+from urllib.parse import quote, urlencode
+
+from botocore.exceptions import ClientError
+
+# 스토리지 백엔드 선택: s3 (기본, 실제 AWS) / local (파일시스템) / memory (프로세스 메모리)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "s3").lower()
+# local 백엔드가 객체를 저장할 디렉토리
+LOCAL_STORAGE_ROOT = os.getenv("LOCAL_STORAGE_ROOT", "./local_storage")
+# local/memory 백엔드가 발급하는 URL의 기본 주소
+LOCAL_STORAGE_BASE_URL = os.getenv("LOCAL_STORAGE_BASE_URL", "http://localhost:8000/local-storage")
+
+LIST_MAX_KEYS = 1000
+
+
+class StorageClient(ABC):
+    """
+    서비스에서 사용하는 S3 클라이언트 API의 부분 집합
+    boto3 S3 클라이언트와 같은 인자/응답 형식을 따르므로 호출부 변경 없이 백엔드를 교체할 수 있음
+    존재하지 않는 객체는 boto3와 같이 ClientError(Code=404)를 발생시킴
+    """
+
+    @abstractmethod
+    def head_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def list_objects_v2(self, Bucket: str, Prefix: str = "", ContinuationToken: Optional[str] = None,
+                        StartAfter: Optional[str] = None, MaxKeys: int = LIST_MAX_KEYS) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def put_object(self, Bucket: str, Key: str, Body: bytes = b"", ContentType: str = "binary/octet-stream") -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def generate_presigned_url(self, ClientMethod: str, Params: Dict[str, Any], ExpiresIn: int = 3600) -> str:
+        ...
+
+    def upload_file(self, Filename: str, Bucket: str, Key: str):
+        with open(Filename, "rb") as f:
+            self.put_object(Bucket=Bucket, Key=Key, Body=f.read())
+
+    def get_paginator(self, operation_name: str) -> "_ListObjectsPaginator":
+        if operation_name != "list_objects_v2":
+            raise ValueError(f"Unsupported paginator: {operation_name}")
+        return _ListObjectsPaginator(self)
+
+
+class _ListObjectsPaginator:
+    """boto3 paginator와 같이 continuation token을 따라 모든 페이지를 순회"""
+
+    def __init__(self, client: StorageClient):
+        self.client = client
+
+    def paginate(self, **kwargs) -> Iterator[Dict[str, Any]]:
+        token = None
+        while True:
+            page = self.client.list_objects_v2(ContinuationToken=token, **kwargs)
+            yield page
+            if not page.get("IsTruncated"):
+                return
+            token = page["NextContinuationToken"]
+
+
+class LocalStorageClient(StorageClient):
+    """
+    로컬 스토리지 백엔드 (개발/벤치마크용)
+    - root가 있으면 {root}/{bucket}/{key} 파일로 저장, 없으면 프로세스 메모리에 저장
+    - latency_ms를 지정하면 S3 API 호출(서명 제외)마다 지연을 추가하여 네트워크 왕복을 흉내냄
+    - 발급 URL은 HMAC 서명된 로컬 주소이며 실제로 제공하는 엔드포인트는 없음
+    """
+
+    def __init__(self, root: Optional[str] = None, latency_ms: float = 0.0,
+                 base_url: str = LOCAL_STORAGE_BASE_URL, secret: str = "local-storage"):
+        self.root = root
+        self.latency = latency_ms / 1000.0
+        self.base_url = base_url.rstrip("/")
+        self.secret = secret.encode("utf-8")
+        self._objects: Dict[tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.call_counts: Dict[str, int] = {}
+        # API 호출마다 (operation, 소요 시간) 을 전달받을 콜백 (지표 수집용)
+        self.on_api_call: Optional[Callable[[str, float], None]] = None
+
+    def head_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        self._api_call("HeadObject")
+        meta = self._get_meta(Bucket, Key)
+        if meta is None:
+            raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+        return {
+            "ContentLength": meta["size"],
+            "LastModified": meta["last_modified"],
+            "ContentType": meta["content_type"]
+        }
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = "", ContinuationToken: Optional[str] = None,
+                        StartAfter: Optional[str] = None, MaxKeys: int = LIST_MAX_KEYS) -> Dict[str, Any]:
+        self._api_call("ListObjectsV2")
+        keys = sorted(self._list_keys(Bucket, Prefix))
+        after = ContinuationToken or StartAfter
+        if after:
+            keys = [key for key in keys if key > after]
+
+        page = keys[:MaxKeys]
+        contents = []
+        for key in page:
+            meta = self._get_meta(Bucket, key)
+            contents.append({"Key": key, "Size": meta["size"], "LastModified": meta["last_modified"]})
+
+        response = {"KeyCount": len(contents), "IsTruncated": len(keys) > MaxKeys}
+        if contents:
+            response["Contents"] = contents
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = page[-1]
+        return response
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes = b"", ContentType: str = "binary/octet-stream") -> Dict[str, Any]:
+        self._api_call("PutObject")
+        meta = {"size": len(Body), "last_modified": datetime.now(timezone.utc), "content_type": ContentType}
+        if self.root:
+            path = self._path(Bucket, Key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(Body)
+        with self._lock:
+            self._objects[(Bucket, Key)] = {**meta, "body": None if self.root else Body}
+        return {}
+
+    def generate_presigned_url(self, ClientMethod: str, Params: Dict[str, Any], ExpiresIn: int = 3600) -> str:
+        expires = int(time.time()) + ExpiresIn
+        path = f"/{Params['Bucket']}/{quote(Params['Key'])}"
+        signature = hmac.new(self.secret, f"{ClientMethod}\n{path}\n{expires}".encode("utf-8"), hashlib.sha256).hexdigest()
+        query = urlencode({"method": ClientMethod, "expires": expires, "signature": signature})
+        return f"{self.base_url}{path}?{query}"
+
+    def _api_call(self, operation: str):
+        with self._lock:
+            self.call_counts[operation] = self.call_counts.get(operation, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.on_api_call:
+            self.on_api_call(operation, self.latency)
+
+    def _path(self, bucket: str, key: str) -> str:
+        return os.path.join(self.root, bucket, *key.split("/"))
+
+    def _get_meta(self, bucket: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            meta = self._objects.get((bucket, key))
+        if meta is not None or not self.root:
+            return meta
+
+        # 다른 프로세스가 저장한 파일
+        path = self._path(bucket, key)
+        if not os.path.isfile(path):
+            return None
+        stat = os.stat(path)
+        return {
+            "size": stat.st_size,
+            "last_modified": datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+            "content_type": "binary/octet-stream"
+        }
+
+    def _list_keys(self, bucket: str, prefix: str):
+        with self._lock:
+            keys = {key for (b, key) in self._objects if b == bucket and key.startswith(prefix)}
+        if self.root:
+            bucket_root = os.path.join(self.root, bucket)
+            for dirpath, _, filenames in os.walk(bucket_root):
+                for filename in filenames:
+                    key = os.path.relpath(os.path.join(dirpath, filename), bucket_root).replace(os.sep, "/")
+                    if key.startswith(prefix):
+                        keys.add(key)
+        return keys
+
+
+def create_storage_client(region: Optional[str] = None, access_key: Optional[str] = None,
+                          secret_key: Optional[str] = None, backend: str = STORAGE_BACKEND):
+    """STORAGE_BACKEND 설정에 맞는 스토리지 클라이언트 생성"""
+    if backend == "local":
+        return LocalStorageClient(root=LOCAL_STORAGE_ROOT)
+    if backend == "memory":
+        return LocalStorageClient()
+
+    import boto3
+    return boto3.client(
+        "s3",
+        region_name=region,
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+    )
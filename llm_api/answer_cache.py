@@ -0,0 +1,77 @@
+# /llm_api/answer_cache.py
+
+import threading
+import time
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """
+    질문 임베딩 기반 답변 캐시 (프로세스 내 메모리)
+    - 프로필 키(종, 성장 단계 등)별로 질문 임베딩과 답변을 저장
+    - 조회 시 같은 프로필 키 안에서 코사인 유사도가 가장 높은 항목이 threshold 이상이면 적중
+    - TTL이 지난 항목은 조회 시 제거되고, 키별 최대 개수를 넘으면 오래된 항목부터 제거
+    - 프로필 키 수가 max_keys를 넘으면 가장 먼저 만들어진 키부터 제거
+    - RAG 코퍼스 버전이 바뀌면 전체 캐시를 비움
+    """
+
+    def __init__(self, similarity_threshold: float = 0.95, ttl_seconds: int = 6 * 3600,
+                 max_entries_per_key: int = 500, max_keys: int = 10000):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_key = max_entries_per_key
+        self.max_keys = max_keys
+        self.corpus_version = None
+        self._entries: Dict[Hashable, List[Tuple[np.ndarray, str, float]]] = {}
+        self._lock = threading.Lock()
+
+    def set_corpus_version(self, version: str):
+        """코퍼스 버전 설정 (이전 버전과 다르면 캐시 무효화)"""
+        with self._lock:
+            if version != self.corpus_version:
+                self._entries.clear()
+                self.corpus_version = version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def lookup(self, query_embedding, profile_key: Hashable) -> Optional[str]:
+        """유사한 질문의 캐시된 답변 반환 (없으면 None)"""
+        query = self._normalize(query_embedding)
+        now = time.time()
+
+        with self._lock:
+            entries = self._entries.get(profile_key)
+            if not entries:
+                return None
+
+            # 만료 항목 제거
+            entries[:] = [e for e in entries if now - e[2] < self.ttl_seconds]
+            if not entries:
+                del self._entries[profile_key]
+                return None
+
+            matrix = np.vstack([e[0] for e in entries])
+            scores = matrix @ query
+            best = int(np.argmax(scores))
+            if scores[best] >= self.similarity_threshold:
+                return entries[best][1]
+        return None
+
+    def store(self, query_embedding, profile_key: Hashable, answer: str):
+        """답변 저장"""
+        entry = (self._normalize(query_embedding), answer, time.time())
+        with self._lock:
+            entries = self._entries.setdefault(profile_key, [])
+            entries.append(entry)
+            if len(entries) > self.max_entries_per_key:
+                del entries[:len(entries) - self.max_entries_per_key]
+            while len(self._entries) > self.max_keys:
+                del self._entries[next(iter(self._entries))]
+
+    def _normalize(self, embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype="float32").reshape(-1)
+        return vector / (np.linalg.norm(vector) or 1.0)
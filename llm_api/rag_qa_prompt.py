@@ -1,17 +1,26 @@
 import os
 import json
+import re
+import asyncio
+import hashlib
+import logging
 import faiss
 import numpy as np
 import openai
+import tiktoken
 import time
 from datetime import datetime, timedelta
 from sentence_transformers import SentenceTransformer
 from sqlalchemy.orm import Session
-from typing import List, Dict
+from typing import List, Dict, AsyncIterator
 
+from llm_api.answer_cache import SemanticAnswerCache
 from repository.chat_repository import ChatRepository
-from repository.pet_repository import PetRepository
-from repository.pet_health_repository import PetHealthRepository
+from service.pet_context_service import PetContextService
+from util.metrics import record_openai_tokens
+from util.profiling import profiled
+
+logger = logging.getLogger(__name__)
 
 CONVERSATION_LOG = "conversation_log.json"
 
@@ -20,7 +29,17 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 FAISS_INDEX = os.path.join(BASE_DIR, "rag_faiss.index")
 METADATA_JSON = os.path.join(BASE_DIR, "rag_metadata.json")
 EMBED_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
-TOP_K = 3
+TOP_K = int(os.getenv("RAG_TOP_K", "3"))
+
+# 검색 인덱스 종류 (flat / ivfpq / hnsw) - 디스크의 Flat 인덱스 벡터로 메모리에서 재구성
+INDEX_TYPE = os.getenv("RAG_INDEX_TYPE", "flat").lower()
+IVF_NLIST = int(os.getenv("RAG_IVF_NLIST", "0"))  # 0이면 코퍼스 크기에 따라 자동 결정
+IVF_NPROBE = int(os.getenv("RAG_IVF_NPROBE", "8"))
+PQ_M = int(os.getenv("RAG_PQ_M", "48"))  # 임베딩 차원(384)의 약수여야 함
+PQ_NBITS = int(os.getenv("RAG_PQ_NBITS", "8"))
+HNSW_M = int(os.getenv("RAG_HNSW_M", "32"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "80"))
+HNSW_EF_SEARCH = int(os.getenv("RAG_HNSW_EF_SEARCH", "64"))
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_ORG_ID = os.getenv("OPENAI_ORG_ID")
 GPT_MODEL = "gpt-3.5-turbo-0125"
@@ -68,27 +87,207 @@ ALLOWED_KEYWORDS = [
     "뭐야", "뭔데", "왜", "어떻게", "알려줘", "말해", "답해줘", "뭔가", "그니까", "그런데", "또", "계속", "그러면"
 
 ]
-SIMILARITY_THRESHOLD = 1.2
+
+# 키워드 검사용 정규식 (공백 제거 후 한 번의 스캔으로 매칭, 긴 키워드 우선)
+KEYWORD_PATTERN = re.compile("|".join(
+    re.escape(k) for k in sorted({k.replace(" ", "") for k in ALLOWED_KEYWORDS}, key=len, reverse=True)
+))
+
+# 로컬 주제 판별 (RAG 코퍼스 임베딩 중심과의 코사인 유사도)
+# ACCEPT 이상이면 통과, REJECT 미만이면 이전 대화가 없을 때만 차단, 나머지는 GPT로 판단
+# (영어 MiniLM 임베딩에 한국어 질문을 넣는 값으로 보정 데이터 없이 정한 기본값이므로 차단은 보수적으로 적용)
+TOPIC_ACCEPT_THRESHOLD = float(os.getenv("TOPIC_ACCEPT_THRESHOLD", "0.55"))
+TOPIC_REJECT_THRESHOLD = float(os.getenv("TOPIC_REJECT_THRESHOLD", "0.2"))
+
+# OpenAI 호출별 타임아웃(초) / 재시도 횟수
+CLASSIFIER_TIMEOUT = float(os.getenv("OPENAI_CLASSIFIER_TIMEOUT", "5"))
+CLASSIFIER_MAX_RETRIES = int(os.getenv("OPENAI_CLASSIFIER_MAX_RETRIES", "1"))
+ANSWER_TIMEOUT = float(os.getenv("OPENAI_ANSWER_TIMEOUT", "60"))
+ANSWER_MAX_RETRIES = int(os.getenv("OPENAI_ANSWER_MAX_RETRIES", "2"))
+RETRY_BACKOFF_SECONDS = 0.5
+RETRYABLE_OPENAI_ERRORS = (
+    openai.error.Timeout,
+    openai.error.APIConnectionError,
+    openai.error.RateLimitError,
+    openai.error.ServiceUnavailableError,
+    openai.error.TryAgain,
+)
+
+INVALID_QUERY_MESSAGE = "❗ 이 시스템은 도마뱀 관련 질문만 처리합니다."
+PET_NOT_FOUND_MESSAGE = "죄송합니다. 해당 반려동물 정보를 찾을 수 없거나 접근 권한이 없습니다."
+AI_ERROR_MESSAGE = "죄송합니다. 현재 AI 서비스에 일시적인 문제가 발생했습니다. 잠시 후 다시 시도해주세요."
+
+# 프롬프트 토큰 예산 (응답 토큰 제외)
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "2500"))
+ANSWER_MAX_TOKENS = int(os.getenv("ANSWER_MAX_TOKENS", "800"))
+CONTEXT_CHUNK_MAX_TOKENS = 300  # 검색 결과 조각별 상한
+HISTORY_MAX_MESSAGES = 10
+MESSAGE_TOKEN_OVERHEAD = 4
+
+# 배치 질문 처리 시 동시 GPT 호출 수
+CHAT_BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", "4"))
+
+# 의미 기반 답변 캐시 (종/성별/성장 단계별 일반 답변을 캐시하고 반려동물별 건강 기록은 조회 후 덧붙임)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))
+ANSWER_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", str(6 * 3600)))
+
+SIMILARITY_THRESHOLD = float(os.getenv("RAG_SIMILARITY_THRESHOLD", "1.2"))
 LOG_RETENTION_HOURS = 24
+CHAT_HISTORY_LIMIT = 10  # 요청당 불러올 최근 대화 수 (질문/답변 쌍 기준)
 
 # ===== 초기화 =====
 embed_model = None
 index = None
 metadata = None
+topic_centroid = None
+token_encoding = None
+pet_context_service = PetContextService()
+answer_cache = SemanticAnswerCache(ANSWER_CACHE_SIMILARITY, ANSWER_CACHE_TTL_SECONDS)
 
 
 def init_llm_system():
-    global embed_model, index, metadata
+    global embed_model, index, metadata, topic_centroid
     print("모델과 인덱스를 불러오는 중...")
     openai.api_key = OPENAI_API_KEY
     openai.organization = OPENAI_ORG_ID
     embed_model = SentenceTransformer(EMBED_MODEL_NAME)
-    index = faiss.read_index(FAISS_INDEX)
+    index = load_index(INDEX_TYPE)
     with open(METADATA_JSON, "r", encoding="utf-8") as f:
         metadata = json.load(f)
+    topic_centroid = build_topic_centroid(load_flat_vectors())
+    # 코퍼스가 바뀌면 캐시된 답변이 더 이상 유효하지 않음
+    answer_cache.set_corpus_version(corpus_version())
     print("✅ 시스템 초기화 완료!")
 
 
+def corpus_version():
+    """RAG 코퍼스(인덱스 + 메타데이터) 파일 내용 해시"""
+    digest = hashlib.sha256()
+    for path in (FAISS_INDEX, METADATA_JSON):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def load_flat_vectors(index_path=FAISS_INDEX):
+    """디스크의 Flat 인덱스에서 원본 벡터 전체를 꺼낸다."""
+    flat_index = faiss.read_index(index_path)
+    return flat_index.reconstruct_n(0, flat_index.ntotal)
+
+
+def build_index(vectors, index_type="flat"):
+    """
+    임베딩 벡터로 지정한 종류의 FAISS 인덱스를 생성한다.
+    모든 인덱스는 L2 거리를 반환하므로 SIMILARITY_THRESHOLD를 그대로 적용할 수 있다.
+
+    Args:
+        vectors: (N, d) float32 임베딩 배열
+        index_type: "flat", "ivfpq", "hnsw"
+
+    Returns:
+        faiss.Index
+    """
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    n, d = vectors.shape
+
+    if index_type == "hnsw":
+        hnsw_index = faiss.IndexHNSWFlat(d, HNSW_M)
+        hnsw_index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        hnsw_index.hnsw.efSearch = HNSW_EF_SEARCH
+        hnsw_index.add(vectors)
+        return hnsw_index
+
+    if index_type == "ivfpq":
+        nlist = IVF_NLIST or max(1, int(4 * np.sqrt(n)))
+        # 학습 데이터가 코드북 크기보다 작으면 IVF-PQ를 학습할 수 없음
+        if n < max(nlist, 2 ** PQ_NBITS) or d % PQ_M != 0:
+            print(f"⚠️ IVF-PQ 학습 불가 (N={n}, nlist={nlist}, m={PQ_M}) → Flat 인덱스 사용")
+            return build_index(vectors, "flat")
+        quantizer = faiss.IndexFlatL2(d)
+        ivf_index = faiss.IndexIVFPQ(quantizer, d, nlist, PQ_M, PQ_NBITS)
+        ivf_index.train(vectors)
+        ivf_index.add(vectors)
+        ivf_index.nprobe = min(IVF_NPROBE, nlist)
+        return ivf_index
+
+    if index_type != "flat":
+        print(f"⚠️ 알 수 없는 인덱스 종류: {index_type} → Flat 인덱스 사용")
+    flat_index = faiss.IndexFlatL2(d)
+    flat_index.add(vectors)
+    return flat_index
+
+
+def load_index(index_type=INDEX_TYPE, index_path=FAISS_INDEX):
+    """검색용 인덱스 로드 (flat이면 디스크 인덱스를 그대로 사용)"""
+    if index_type == "flat":
+        return faiss.read_index(index_path)
+    print(f"{index_type} 인덱스 생성 중...")
+    return build_index(load_flat_vectors(index_path), index_type)
+
+
+def build_topic_centroid(vectors):
+    """코퍼스 임베딩의 평균 방향(단위 벡터)"""
+    centroid = np.asarray(vectors, dtype="float32").mean(axis=0)
+    return centroid / np.linalg.norm(centroid)
+
+
+def topic_score(query_embedding) -> float:
+    """질문 임베딩과 코퍼스 중심의 코사인 유사도"""
+    q = np.asarray(query_embedding, dtype="float32").reshape(-1)
+    return float(np.dot(q, topic_centroid) / (np.linalg.norm(q) or 1.0))
+
+
+def local_topic_decision(query_embedding):
+    """
+    로컬 임베딩으로 주제 적합성 판단
+
+    Returns:
+        True(통과) / False(차단 후보, 이전 대화가 있으면 GPT가 다시 판단) / None(애매하여 GPT 판단 필요)
+    """
+    if query_embedding is None or topic_centroid is None:
+        return None
+    score = topic_score(query_embedding)
+    if score >= TOPIC_ACCEPT_THRESHOLD:
+        decision = True
+    elif score < TOPIC_REJECT_THRESHOLD:
+        decision = False
+    else:
+        return None
+    print(f"🔍 로컬 주제 판단: {'Y' if decision else 'N'} (score={score:.3f})")
+    return decision
+
+
+def chat_completion(timeout, max_retries, **kwargs):
+    """타임아웃/재시도를 적용한 ChatCompletion 호출"""
+    for attempt in range(max_retries + 1):
+        try:
+            return openai.ChatCompletion.create(request_timeout=timeout, **kwargs)
+        except RETRYABLE_OPENAI_ERRORS as e:
+            if attempt == max_retries:
+                raise
+            print(f"OpenAI 호출 재시도 ({attempt + 1}/{max_retries}): {e}")
+            time.sleep(RETRY_BACKOFF_SECONDS * (2 ** attempt))
+
+
+async def achat_completion(timeout, max_retries, **kwargs):
+    """
+    타임아웃/재시도를 적용한 비동기 ChatCompletion 호출
+    stream=True이면 응답 조각의 async generator를 반환함
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return await asyncio.wait_for(
+                openai.ChatCompletion.acreate(request_timeout=timeout, **kwargs),
+                timeout=timeout
+            )
+        except RETRYABLE_OPENAI_ERRORS + (asyncio.TimeoutError,) as e:
+            if attempt == max_retries:
+                raise
+            print(f"OpenAI 비동기 호출 재시도 ({attempt + 1}/{max_retries}): {e}")
+            await asyncio.sleep(RETRY_BACKOFF_SECONDS * (2 ** attempt))
+
+
 def embed_text(text, model):
     return model.encode([text], convert_to_numpy=True)
 
@@ -97,41 +296,65 @@ def retrieve(query_embedding, index, metadata, top_k=TOP_K):
     distances, indices = index.search(query_embedding, top_k)
     results = []
     for idx in indices[0]:
-        if idx < len(metadata):
+        # ANN 인덱스는 후보가 부족하면 -1을 반환함
+        if 0 <= idx < len(metadata):
             results.append(metadata[idx])
     return results, distances[0]
 
 
-def truncate_text(text, max_chars):
+def _get_encoding():
+    global token_encoding
+    if token_encoding is None:
+        try:
+            token_encoding = tiktoken.encoding_for_model(GPT_MODEL)
+        except KeyError:
+            token_encoding = tiktoken.get_encoding("cl100k_base")
+    return token_encoding
+
+
+def count_tokens(text) -> int:
+    if not text:
+        return 0
+    return len(_get_encoding().encode(text))
+
+
+def count_message_tokens(messages) -> int:
+    # 메시지별 역할/구분자 오버헤드 + 응답 시작 토큰
+    return sum(MESSAGE_TOKEN_OVERHEAD + count_tokens(m["content"]) for m in messages) + 3
+
+
+def truncate_tokens(text, max_tokens):
     if not text:
         return ""
-    return text if len(text) <= max_chars else text[:max_chars] + "..."
+    tokens = _get_encoding().encode(text)
+    return text if len(tokens) <= max_tokens else _get_encoding().decode(tokens[:max_tokens]) + "..."
 
 
-def get_pet_info(db: Session, pet_id: str, firebase_uid: str) -> dict:
-    """Get pet information from database"""
-    pet_repo = PetRepository()
-    pet = pet_repo.get_by_id(db, pet_id)
+def retrieve_batch(query_embeddings, top_k=TOP_K):
+    """
+    여러 질문을 한 번의 행렬 검색으로 처리
 
-    if not pet or pet.firebase_uid != firebase_uid:
-        return None
+    Returns:
+        질문별 컨텍스트 리스트 (가장 가까운 결과가 임계값을 넘으면 빈 컨텍스트)
+    """
+    distances, indices = index.search(np.ascontiguousarray(query_embeddings, dtype="float32"), top_k)
+    results = []
+    for row_distances, row_indices in zip(distances, indices):
+        if row_distances[0] > SIMILARITY_THRESHOLD:
+            results.append([{"content": ""}])
+        else:
+            results.append([metadata[idx] for idx in row_indices if 0 <= idx < len(metadata)])
+    return results
 
-    return {
-        "id": pet.pet_id,
-        "name": pet.name,
-        "species": pet.species,
-        "gender": pet.gender,
-        "birthdate": pet.birthdate.isoformat() if pet.birthdate else None,
-        "traits": []  # This would come from another table if needed
-    }
 
+def truncate_text(text, max_chars):
+    if not text:
+        return ""
+    return text if len(text) <= max_chars else text[:max_chars] + "..."
 
-def get_latest_health_record(db: Session, pet_id: str) -> dict:
-    """Get the latest health record for a pet"""
-    health_repo = PetHealthRepository()
-    health_records = health_repo.get_by_pet(db, pet_id)
 
-    if not health_records:
+def _health_record_to_context(record) -> dict:
+    if not record:
         return {
             "date": None,
             "weight": None,
@@ -140,15 +363,11 @@ def get_latest_health_record(db: Session, pet_id: str) -> dict:
             "photo_urls": None
         }
 
-    # Sort by date (most recent first)
-    health_records.sort(key=lambda x: x.date, reverse=True)
-    latest = health_records[0]
-
     return {
-        "date": latest.date.isoformat() if latest.date else None,
-        "weight": latest.weight,
-        "memo": latest.memo,
-        "shedding_status": latest.shedding_status,
+        "date": record.get("date"),
+        "weight": record.get("weight"),
+        "memo": record.get("memo"),
+        "shedding_status": record.get("shedding_status"),
         "photo_urls": None  # Assuming no photo URLs in current schema
     }
 
@@ -173,21 +392,45 @@ def format_pet_context(pet_info, latest_record):
 """
 
 
-def load_recent_conversation_from_db(db: Session, firebase_uid: str) -> List[Dict]:
+def format_profile_context(profile):
+    """캐시 가능한 일반 답변용 프로필 (개체 이름/건강 기록 없이 종, 성별, 성장 단계만)"""
+    species, gender, life_stage = profile
+    return f"""
+[도마뱀 프로필]
+종: {species}
+성별: {gender}
+성장 단계: {life_stage or '알 수 없음'}
+(특정 개체의 이름이나 건강 기록을 가정하지 말고 이 프로필의 도마뱀 전반에 맞는 조언을 하세요.)
+"""
+
+
+def format_pet_note(pet_info, latest_record):
+    """일반 답변 뒤에 덧붙이는 반려동물별 최근 건강 기록 (캐시 조회 후 요청마다 적용)"""
+    record = latest_record or {}
+    details = []
+    if record.get("weight") is not None:
+        details.append(f"몸무게 {record['weight']}g")
+    if record.get("shedding_status"):
+        details.append(f"탈피 상태: {record['shedding_status']}")
+    if record.get("memo"):
+        details.append(f"메모: {truncate_text(record['memo'], 100)}")
+    if not details:
+        return ""
+    name = pet_info.get("name") or "반려동물"
+    return f"\n\n[{name}의 최근 건강 기록 ({record.get('date') or '날짜 없음'})]\n" + ", ".join(details) + \
+        "\n위 기록과 함께 참고해 주세요. 기록에 이상이 있다면 전문 수의사와 상담하세요."
+
+
+def load_recent_conversation_from_db(db: Session, firebase_uid: str, limit: int = CHAT_HISTORY_LIMIT) -> List[Dict]:
     repo = ChatRepository()
-    all_chats = repo.get_by_user(db, firebase_uid)
 
     # timezone-aware datetime으로 생성
     from datetime import timezone
     cutoff = datetime.now(timezone.utc) - timedelta(hours=LOG_RETENTION_HOURS)
 
-    recent_chats = [
-        chat for chat in all_chats
-        if chat.created_at and chat.created_at > cutoff
-    ]
-
-    # Sort by created_at
-    recent_chats.sort(key=lambda x: x.created_at)
+    # 최근 구간의 최신 limit개만 조회 (DB에서 최신순으로 가져와 시간순으로 뒤집음)
+    recent_chats = repo.get_recent_by_user(db, firebase_uid, cutoff, limit)
+    recent_chats.reverse()
 
     # Convert to conversation format
     conversation = []
@@ -199,24 +442,21 @@ def load_recent_conversation_from_db(db: Session, firebase_uid: str) -> List[Dic
     return conversation
 
 
-def is_valid_query(query, db: Session = None, firebase_uid: str = None):
-    if not query.strip():
-        return False  # 빈 입력 방지
+def _load_history(db: Session, firebase_uid: str) -> List[Dict]:
+    if not (db and firebase_uid):
+        return []
+    try:
+        return load_recent_conversation_from_db(db, firebase_uid)
+    except Exception as e:
+        print(f"DB 대화 기록 로드 오류: {e}")
+        return []
 
-    # 키워드 기반 검사 (기존 로직 유지)
-    if any(k.replace(" ", "") in query.replace(" ", "") for k in ALLOWED_KEYWORDS):
-        return True
 
-    # DB에서 최근 대화 기록 확인
-    if db and firebase_uid:
-        try:
-            history = load_recent_conversation_from_db(db, firebase_uid)
-        except Exception as e:
-            print(f"DB 대화 기록 로드 오류: {e}")
-            history = []
-    else:
-        history = []
+def is_keyword_query(query) -> bool:
+    return KEYWORD_PATTERN.search(query.replace(" ", "")) is not None
 
+
+def build_flow_check_messages(query, history) -> List[Dict]:
     last_user_questions = [entry["question"] for entry in reversed(history) if entry["role"] == "user"][:5]
 
     # GPT에게 흐름을 판단시키기 (기존 로직 유지)
@@ -232,17 +472,46 @@ def is_valid_query(query, db: Session = None, firebase_uid: str = None):
         "대화 흐름이 도마뱀 중심이라면 반드시 Y, 관련 없다면 N으로만 답하세요."
     )
 
+    return [
+        {"role": "system", "content": "너는 대화 흐름이 주제 안에서 유지되는지 판단하는 전문가야. 반드시 Y 또는 N으로만 답해."},
+        {"role": "user", "content": context}
+    ]
+
+
+def is_valid_query(query, db: Session = None, firebase_uid: str = None, query_embedding=None, history=None):
+    if not query.strip():
+        return False  # 빈 입력 방지
+
+    # 키워드 기반 검사 (기존 로직 유지)
+    if is_keyword_query(query):
+        return True
+
+    # 로컬 임베딩 기반 검사 (애매한 구간만 GPT로 넘김)
+    if query_embedding is None and embed_model is not None:
+        query_embedding = embed_text(query, embed_model)
+    decision = local_topic_decision(query_embedding)
+    if decision is True:
+        return True
+
+    # DB에서 최근 대화 기록 확인 (호출자가 이미 불러온 경우 재사용)
+    if history is None:
+        history = _load_history(db, firebase_uid)
+
+    # 로컬 차단은 이전 대화가 없을 때만 적용 ("그럼 얼마나 줘야 해?" 같은 후속 질문은 GPT가 흐름으로 판단)
+    if decision is False and not history:
+        return False
+
     try:
-        response = openai.ChatCompletion.create(
+        response = chat_completion(
+            CLASSIFIER_TIMEOUT, CLASSIFIER_MAX_RETRIES,
             model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "너는 대화 흐름이 주제 안에서 유지되는지 판단하는 전문가야. 반드시 Y 또는 N으로만 답해."},
-                {"role": "user", "content": context}
-            ],
+            messages=build_flow_check_messages(query, history),
             max_tokens=1,
             temperature=0
         )
         result = response.choices[0].message.content.strip().upper()
+        usage = response.get("usage") or {}
+        record_token_usage(usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0), "classifier")
         print(f"🔍 흐름 기반 GPT 판단: {result}")
         return result == "Y"
     except Exception as e:
@@ -250,21 +519,46 @@ def is_valid_query(query, db: Session = None, firebase_uid: str = None):
         return True  # 오류 시 통과
 
 
-def generate_answer(contexts, question, pet_info=None, latest_record=None, db=None, firebase_uid=None):
-    context_text = "\n".join([truncate_text(c["content"], 400) for c in contexts])
-    personal_info = format_pet_context(pet_info, latest_record) if pet_info and latest_record else ""
+async def ais_valid_query(query, db: Session = None, firebase_uid: str = None, query_embedding=None, history=None):
+    """is_valid_query의 비동기 버전 (스레드풀 워커를 점유하지 않음)"""
+    if not query.strip():
+        return False
+
+    if is_keyword_query(query):
+        return True
+
+    if query_embedding is None and embed_model is not None:
+        query_embedding = await asyncio.to_thread(embed_text, query, embed_model)
+    decision = local_topic_decision(query_embedding)
+    if decision is True:
+        return True
 
-    history = load_recent_conversation_from_db(db, firebase_uid) if db and firebase_uid else []
+    if history is None:
+        history = await asyncio.to_thread(_load_history, db, firebase_uid)
 
-    message_history = [
-                          {"role": "system", "content": "당신은 도마뱀 사육 전문가입니다."},
-                      ] + [
-                          {"role": "user", "content": h["question"]} if h.get("role") == "user" else {
-                              "role": "assistant", "content": h["answer"]}
-                          for h in history[-10:]
-                      ]
+    if decision is False and not history:
+        return False
+
+    try:
+        response = await achat_completion(
+            CLASSIFIER_TIMEOUT, CLASSIFIER_MAX_RETRIES,
+            model="gpt-3.5-turbo",
+            messages=build_flow_check_messages(query, history),
+            max_tokens=1,
+            temperature=0
+        )
+        result = response.choices[0].message.content.strip().upper()
+        usage = response.get("usage") or {}
+        record_token_usage(usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0), "classifier")
+        print(f"🔍 흐름 기반 GPT 판단: {result}")
+        return result == "Y"
+    except Exception as e:
+        print("흐름 판단 오류:", e)
+        return True  # 오류 시 통과
 
-    message_history.append({"role": "user", "content": f"""
+
+def _answer_user_prompt(personal_info, question, context_text):
+    return f"""
 {personal_info}
 
 [질문]
@@ -278,22 +572,232 @@ def generate_answer(contexts, question, pet_info=None, latest_record=None, db=No
 2. 최근 건강 기록이 있다면 이를 바탕으로 구체적인 조언을 하세요.
 3. 질문이 도마뱀 관련이 아닐 경우, "저는 도마뱀에 대한 질문만 답변할 수 있습니다."라고만 응답하세요.
 4. 응답은 완결된 문장으로 끝나도록 하세요.
-"""})
+"""
+
+
+def build_answer_messages(contexts, question, pet_info=None, latest_record=None, history=None,
+                          budget=PROMPT_TOKEN_BUDGET, profile=None) -> List[Dict]:
+    """
+    답변 생성용 메시지를 토큰 예산 안에서 구성
+    우선순위: 시스템 메시지/질문/지침(필수) → 반려동물 정보 → 검색 결과(순위순) → 최근 대화(최신순)
+    profile(종, 성별, 성장 단계)을 주면 개체 정보 대신 프로필만 넣어 캐시 가능한 일반 답변용으로 구성
+    """
+    system_message = {"role": "system", "content": "당신은 도마뱀 사육 전문가입니다."}
+    used = count_message_tokens([system_message, {"role": "user", "content": _answer_user_prompt("", question, "")}])
+
+    # 1. 반려동물 정보
+    if profile:
+        personal_info = format_profile_context(profile)
+    else:
+        personal_info = format_pet_context(pet_info, latest_record) if pet_info and latest_record else ""
+    personal_cost = count_tokens(personal_info)
+    if used + personal_cost > budget:
+        personal_info = ""
+    else:
+        used += personal_cost
+
+    # 2. 검색 결과 (유사도 순위순, 조각별 상한 적용)
+    selected_contexts = []
+    for c in contexts:
+        chunk = truncate_tokens(c["content"], CONTEXT_CHUNK_MAX_TOKENS)
+        cost = count_tokens(chunk) + 1  # 줄바꿈
+        if used + cost > budget:
+            break
+        selected_contexts.append(chunk)
+        used += cost
+
+    # 3. 최근 대화 (최신 대화부터 예산이 남는 만큼)
+    history_messages = []
+    for h in reversed((history or [])[-HISTORY_MAX_MESSAGES:]):
+        message = {"role": "user", "content": h["question"]} if h.get("role") == "user" else {
+            "role": "assistant", "content": h["answer"]}
+        cost = count_tokens(message["content"]) + MESSAGE_TOKEN_OVERHEAD
+        if used + cost > budget:
+            break
+        history_messages.insert(0, message)
+        used += cost
+
+    return [system_message] + history_messages + [
+        {"role": "user", "content": _answer_user_prompt(personal_info, question, "\n".join(selected_contexts))}
+    ]
+
+
+def record_token_usage(prompt_tokens: int, completion_tokens: int, source: str):
+    """요청별 토큰 사용량 기록 (로그 + Prometheus openai_tokens_total{source, kind})"""
+    logger.info(f"OpenAI token usage ({source}): prompt={prompt_tokens}, completion={completion_tokens}")
+    record_openai_tokens(source, prompt_tokens, completion_tokens)
+
+
+def generate_answer(contexts, question, pet_info=None, latest_record=None, db=None, firebase_uid=None, history=None,
+                    profile=None):
+    if history is None:
+        history = load_recent_conversation_from_db(db, firebase_uid) if db and firebase_uid else []
+    message_history = build_answer_messages(contexts, question, pet_info, latest_record, history, profile=profile)
 
     try:
-        response = openai.ChatCompletion.create(
+        response = chat_completion(
+            ANSWER_TIMEOUT, ANSWER_MAX_RETRIES,
             model=GPT_MODEL,
             messages=message_history,
             temperature=0.3,
-            max_tokens=800,  # 400 -> 800으로 증가
+            max_tokens=ANSWER_MAX_TOKENS,
             top_p=0.9  # 응답 품질 개선
         )
-        return response['choices'][0]['message']['content'].strip()
+        answer = response['choices'][0]['message']['content'].strip()
+        usage = response.get("usage") or {}
+        record_token_usage(
+            usage.get("prompt_tokens", count_message_tokens(message_history)),
+            usage.get("completion_tokens", count_tokens(answer)),
+            "answer"
+        )
+        return answer
+    except Exception as e:
+        print(f"OpenAI API 호출 오류: {e}")
+        return AI_ERROR_MESSAGE
+
+
+async def agenerate_answer(contexts, question, pet_info=None, latest_record=None, history=None, profile=None):
+    """generate_answer의 비동기 버전 (스트리밍 없이 전체 답변 반환)"""
+    message_history = build_answer_messages(contexts, question, pet_info, latest_record, history, profile=profile)
+
+    try:
+        response = await achat_completion(
+            ANSWER_TIMEOUT, ANSWER_MAX_RETRIES,
+            model=GPT_MODEL,
+            messages=message_history,
+            temperature=0.3,
+            max_tokens=ANSWER_MAX_TOKENS,
+            top_p=0.9
+        )
+        answer = response['choices'][0]['message']['content'].strip()
+        usage = response.get("usage") or {}
+        record_token_usage(
+            usage.get("prompt_tokens", count_message_tokens(message_history)),
+            usage.get("completion_tokens", count_tokens(answer)),
+            "answer"
+        )
+        return answer
     except Exception as e:
         print(f"OpenAI API 호출 오류: {e}")
-        return "죄송합니다. 현재 AI 서비스에 일시적인 문제가 발생했습니다. 잠시 후 다시 시도해주세요."
+        return AI_ERROR_MESSAGE
+
+
+async def astream_answer(contexts, question, pet_info=None, latest_record=None, history=None, profile=None):
+    """
+    답변을 스트리밍으로 생성 (토큰 조각 단위로 yield)
+    첫 조각을 받기 전에 실패한 경우에만 재시도함
+    """
+    message_history = build_answer_messages(contexts, question, pet_info, latest_record, history, profile=profile)
+
+    try:
+        stream = await achat_completion(
+            ANSWER_TIMEOUT, ANSWER_MAX_RETRIES,
+            model=GPT_MODEL,
+            messages=message_history,
+            temperature=0.3,
+            max_tokens=ANSWER_MAX_TOKENS,
+            top_p=0.9,
+            stream=True
+        )
+        # 스트리밍 응답에는 usage가 없으므로 로컬 토크나이저로 계산
+        answer_chunks = []
+        async for chunk in stream:
+            delta = chunk["choices"][0].get("delta", {}).get("content")
+            if delta:
+                answer_chunks.append(delta)
+                yield delta
+        record_token_usage(
+            count_message_tokens(message_history), count_tokens("".join(answer_chunks)), "answer_stream"
+        )
+    except Exception as e:
+        print(f"OpenAI API 스트리밍 오류: {e}")
+        yield AI_ERROR_MESSAGE
+
+
+def _load_pet_context(db: Session, pet_id: str, firebase_uid: str):
+    """
+    반려동물 정보와 최신 건강 기록 조회 (캐시된 스냅샷 사용)
+
+    Returns:
+        (pet_info, latest_record) 또는 반려동물 정보를 찾을 수 없으면 None
+    """
+    snapshot = pet_context_service.get_snapshot(db, pet_id)
+    if not snapshot or snapshot["firebase_uid"] != firebase_uid:
+        return None
+
+    pet = snapshot["pet"]
+    pet_info = {
+        "id": pet["pet_id"],
+        "name": pet["name"],
+        "species": pet["species"],
+        "gender": pet["gender"],
+        "birthdate": pet["birthdate"],
+        "traits": []  # This would come from another table if needed
+    }
+    return pet_info, _health_record_to_context(snapshot["latest_health"])
+
 
+def _retrieve_contexts(query_emb):
+    # Retrieve relevant contexts
+    contexts, distances = retrieve(query_emb, index, metadata)
+    if distances[0] > SIMILARITY_THRESHOLD:
+        contexts = [{"content": ""}]
+    return contexts
+
+
+def _life_stage(birthdate):
+    """생일(ISO 문자열)로 성장 단계 계산 (RAG 코퍼스의 유체/아성체/성체/노령기 구분)"""
+    if not birthdate:
+        return None
+    months = (datetime.now().date() - datetime.fromisoformat(birthdate).date()).days // 30
+    if months < 3:
+        return "유체"
+    if months < 9:
+        return "아성체"
+    if months < 60:
+        return "성체"
+    return "노령기"
+
+
+def answer_cache_key(pet_info):
+    """
+    답변 캐시 키 (종, 성별, 성장 단계)
+    캐시에는 개체 이름/건강 기록/대화가 들어가지 않은 일반 답변만 저장하므로 같은 프로필의 모든 사용자가 공유
+    """
+    if not ANSWER_CACHE_ENABLED:
+        return None
+    return (pet_info.get("species"), pet_info.get("gender"), _life_stage(pet_info.get("birthdate")))
+
+
+def is_standalone_question(query_emb) -> bool:
+    """
+    이전 대화 없이도 주제가 분명한 질문인지 (로컬 주제 판단 통과 기준)
+    이어지는 질문은 대화 흐름이 답변에 필요하므로 캐시하지 않고 개인화 답변을 생성
+    """
+    return topic_centroid is not None and topic_score(query_emb) >= TOPIC_ACCEPT_THRESHOLD
+
+
+def get_cached_answer(query_emb, cache_key):
+    if cache_key is None:
+        return None
+    cached = answer_cache.lookup(query_emb, cache_key)
+    if cached is not None:
+        print("💾 답변 캐시 적중")
+    return cached
+
+
+def store_cached_answer(query_emb, cache_key, answer):
+    if cache_key is None or not answer or AI_ERROR_MESSAGE in answer:
+        return
+    answer_cache.store(query_emb, cache_key, answer)
+
+
+def _check_initialized():
+    if not embed_model or not index or not metadata:
+        raise RuntimeError("시스템이 초기화되지 않았습니다. init_llm_system()을 먼저 호출하세요.")
 
+
+@profiled("handle_query")
 def handle_query(query: str, pet_id: str, firebase_uid: str, db: Session) -> str:
     """
     Main function to handle user queries
@@ -307,26 +811,161 @@ def handle_query(query: str, pet_id: str, firebase_uid: str, db: Session) -> str
     Returns:
         Generated answer
     """
-    if not embed_model or not index or not metadata:
-        raise RuntimeError("시스템이 초기화되지 않았습니다. init_llm_system()을 먼저 호출하세요.")
+    _check_initialized()
+
+    # 주제 판별과 검색에 같은 임베딩을 사용
+    query_emb = embed_text(query, embed_model)
+
+    # 대화 기록은 요청당 한 번만 불러와 주제 판별과 답변 생성에서 공유
+    history = _load_history(db, firebase_uid)
 
     # Validate query
-    if not is_valid_query(query, db, firebase_uid):
-        return "❗ 이 시스템은 도마뱀 관련 질문만 처리합니다."
+    if not is_valid_query(query, db, firebase_uid, query_emb, history):
+        return INVALID_QUERY_MESSAGE
+
+    pet_context = _load_pet_context(db, pet_id, firebase_uid)
+    if pet_context is None:
+        return PET_NOT_FOUND_MESSAGE
+    pet_info, latest_record = pet_context
+
+    # 이어지는 질문은 대화 흐름을 반영한 개인화 답변 (캐시하지 않음)
+    cache_key = answer_cache_key(pet_info) if is_standalone_question(query_emb) else None
+    if cache_key is None:
+        return generate_answer(_retrieve_contexts(query_emb), query, pet_info, latest_record, history=history)
+
+    # 같은 프로필의 유사한 질문에 대한 일반 답변이 있으면 검색/GPT 호출 생략, 건강 기록은 요청마다 덧붙임
+    answer = get_cached_answer(query_emb, cache_key)
+    if answer is None:
+        answer = generate_answer(_retrieve_contexts(query_emb), query, history=[], profile=cache_key)
+        if AI_ERROR_MESSAGE in answer:
+            return answer
+        store_cached_answer(query_emb, cache_key, answer)
+    return answer + format_pet_note(pet_info, latest_record)
+
+
+async def handle_query_stream(query: str, pet_id: str, firebase_uid: str, db: Session) -> AsyncIterator[str]:
+    """
+    handle_query의 비동기 스트리밍 버전
+    DB 조회와 임베딩은 스레드에서 실행하고, OpenAI 호출은 비동기로 스트리밍함
 
-    # Get pet information
-    pet_info = get_pet_info(db, pet_id, firebase_uid)
-    if not pet_info:
-        return "죄송합니다. 해당 반려동물 정보를 찾을 수 없거나 접근 권한이 없습니다."
+    Yields:
+        답변 조각 (토큰 단위)
+    """
+    _check_initialized()
+
+    query_emb = await asyncio.to_thread(embed_text, query, embed_model)
+    history = await asyncio.to_thread(_load_history, db, firebase_uid)
+
+    if not await ais_valid_query(query, db, firebase_uid, query_emb, history):
+        yield INVALID_QUERY_MESSAGE
+        return
+
+    pet_context = await asyncio.to_thread(_load_pet_context, db, pet_id, firebase_uid)
+    if pet_context is None:
+        yield PET_NOT_FOUND_MESSAGE
+        return
+    pet_info, latest_record = pet_context
+
+    cache_key = answer_cache_key(pet_info) if is_standalone_question(query_emb) else None
+    if cache_key is None:
+        contexts = await asyncio.to_thread(_retrieve_contexts, query_emb)
+        async for chunk in astream_answer(contexts, query, pet_info, latest_record, history):
+            yield chunk
+        return
+
+    cached = get_cached_answer(query_emb, cache_key)
+    if cached is not None:
+        yield cached
+    else:
+        contexts = await asyncio.to_thread(_retrieve_contexts, query_emb)
+        chunks = []
+        async for chunk in astream_answer(contexts, query, history=[], profile=cache_key):
+            chunks.append(chunk)
+            yield chunk
+        answer = "".join(chunks).strip()
+        if AI_ERROR_MESSAGE in answer:
+            return
+        store_cached_answer(query_emb, cache_key, answer)
+
+    note = format_pet_note(pet_info, latest_record)
+    if note:
+        yield note
+
+
+@profiled("ahandle_query")
+async def ahandle_query(query: str, pet_id: str, firebase_uid: str, db: Session) -> str:
+    """handle_query의 비동기 버전 (스트리밍 결과를 모아서 반환)"""
+    chunks = [chunk async for chunk in handle_query_stream(query, pet_id, firebase_uid, db)]
+    return "".join(chunks).strip()
+
+
+async def handle_queries_batch(queries: List[str], pet_id: str, firebase_uid: str, db: Session,
+                               concurrency: int = CHAT_BATCH_CONCURRENCY) -> List[str]:
+    """
+    여러 질문을 한 번에 처리
+    - 임베딩: 한 번의 encode 호출
+    - 검색: 한 번의 FAISS 행렬 검색
+    - GPT 호출(주제 판별/답변 생성): concurrency 개수 제한으로 동시 실행
+    - 대화 기록과 반려동물 정보는 모든 질문이 공유
 
-    # Get latest health record
-    latest_record = get_latest_health_record(db, pet_id)
+    Returns:
+        질문 순서대로의 답변 리스트
+    """
+    _check_initialized()
+    if not queries:
+        return []
 
-    # Retrieve relevant contexts
-    query_emb = embed_text(query, embed_model)
-    contexts, distances = retrieve(query_emb, index, metadata)
-    if distances[0] > SIMILARITY_THRESHOLD:
-        contexts = [{"content": ""}]
+    embeddings = await asyncio.to_thread(embed_model.encode, list(queries), convert_to_numpy=True)
+    history = await asyncio.to_thread(_load_history, db, firebase_uid)
+
+    pet_context = await asyncio.to_thread(_load_pet_context, db, pet_id, firebase_uid)
+    if pet_context is None:
+        return [PET_NOT_FOUND_MESSAGE] * len(queries)
+    pet_info, latest_record = pet_context
 
-    # Generate answer
-    return generate_answer(contexts, query, pet_info, latest_record, db, firebase_uid)
\ No newline at end of file
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def limited(coro):
+        async with semaphore:
+            return await coro
+
+    # 주제 판별 (GPT가 필요한 질문만 동시 호출)
+    validity = await asyncio.gather(*[
+        limited(ais_valid_query(q, db, firebase_uid, embeddings[i:i + 1], history))
+        for i, q in enumerate(queries)
+    ])
+
+    answers = [INVALID_QUERY_MESSAGE if not valid else None for valid in validity]
+
+    # 단독 질문은 프로필별 일반 답변 캐시 사용 (적중하면 검색/GPT 호출 생략)
+    profile_key = answer_cache_key(pet_info)
+    cache_keys = [
+        profile_key if valid and is_standalone_question(embeddings[i:i + 1]) else None
+        for i, valid in enumerate(validity)
+    ]
+    for i, cache_key in enumerate(cache_keys):
+        if cache_key is not None:
+            answers[i] = get_cached_answer(embeddings[i:i + 1], cache_key)
+
+    pending = [i for i, answer in enumerate(answers) if answer is None]
+    if pending:
+        contexts_batch = await asyncio.to_thread(retrieve_batch, embeddings[pending])
+
+        generated = await asyncio.gather(*[
+            limited(
+                agenerate_answer(contexts, queries[i], history=[], profile=cache_keys[i]) if cache_keys[i]
+                else agenerate_answer(contexts, queries[i], pet_info, latest_record, history)
+            )
+            for i, contexts in zip(pending, contexts_batch)
+        ])
+
+        for i, answer in zip(pending, generated):
+            answers[i] = answer
+            store_cached_answer(embeddings[i:i + 1], cache_keys[i], answer)
+
+    # 일반 답변에는 반려동물별 건강 기록을 덧붙임
+    note = format_pet_note(pet_info, latest_record)
+    return [
+        answer + note if cache_key is not None and AI_ERROR_MESSAGE not in answer else answer
+        for answer, cache_key in zip(answers, cache_keys)
+    ]
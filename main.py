@@ -17,7 +17,8 @@ load_dotenv()
 
 # DB 관련 임포트
 from db.session import get_db
-from db.database import Base, engine
+from db.database import Base, engine, ensure_indexes
+from db.s3_utils import get_s3_client
 
 # LLM 시스템 초기화
 from llm_api.rag_qa_prompt import init_llm_system
@@ -26,11 +27,18 @@ init_llm_system()
 # 유틸리티 임포트
 from util.config_util import setup_test_mode
 from util.swagger_util import setup_swagger
+from util.metrics import setup_metrics
+from util.profiling import setup_profiling
 from util.scheduler import run_every_5_minutes, run_daily_at_midnight
 from util.active_create import process_current_interval
+from util.yolo_partition import ensure_future_partitions
 
 # 서비스 임포트
 from service.heatmap_service import HeatmapService
+from service.pet_state_service import PetStateService
+from service.pet_device_service import PetDeviceService
+from service.active_report_service import ActiveReportService
+from util.pet_state_broker import pet_state_broker, activity_event
 
 # 엔티티 임포트 (스키마 생성용)
 from repository.entity import (
@@ -41,7 +49,13 @@ from repository.entity import (
     pet_feed_entity,
     pet_health_entity,
     pet_active_entity,
-    chat_entity
+    chat_entity,
+    hiding_interval_entity,
+    device_state_entity,
+    pet_device_entity,
+    serial_counter_entity,
+    video_object_entity,
+    active_rollup_entity
 )
 
 # 라우터 임포트
@@ -59,6 +73,7 @@ from router.heatmap_router import router as heatmap_router
 
 # Create tables if they don't exist
 Base.metadata.create_all(bind=engine)
+ensure_indexes(engine)
 
 # Create FastAPI app
 app = FastAPI(
@@ -73,14 +88,40 @@ setup_test_mode(True)  # 개발 중에는 True, 배포 시 False로 변경
 # Swagger UI 설정
 setup_swagger(app)
 
+# Prometheus 지표 수집 (/metrics)
+setup_metrics(app, engine, get_s3_client())
+
+# 프로파일링 모드 (PROFILING_ENABLED=true일 때만 요청 샘플링 / 느린 쿼리 기록)
+setup_profiling(app, engine)
+
 # 5분마다 실행될 활동량 데이터 처리 함수
 def run_activity_process(start_time, end_time):
-    """활동량 데이터 처리 함수"""
+    """활동량 데이터 처리 함수 (반려동물과 연결된 장치별로 실행)"""
     # 데이터베이스 세션 생성
     session = next(get_db())
     try:
-        logger.info(f"Running activity data processing for {start_time} to {end_time}...")
-        process_current_interval(session, start_time, end_time)
+        device_sns = PetDeviceService().get_active_sns(session)
+        pet_state_service = PetStateService()
+        active_report_service = ActiveReportService()
+        for device_sn in device_sns:
+            try:
+                logger.info(f"Running activity data processing for {device_sn} {start_time} to {end_time}...")
+                if process_current_interval(session, start_time, end_time, device_sn):
+                    # 상태 스트림 구독자에게 최신 활동량 전달
+                    latest = active_report_service.get_recent_activity(session, device_sn, 1)
+                    if latest:
+                        pet_state_broker.publish(session, activity_event(latest[0]))
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Error in activity data processing for {device_sn}: {e}")
+
+            try:
+                # 상태 조회 API가 읽을 은신 상태 갱신 후 변경 시 구독자에게 전달
+                state = pet_state_service.refresh_device_state(session, device_sn)
+                pet_state_service.publish_device_state(session, state)
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Error in pet state refresh for {device_sn}: {e}")
     except Exception as e:
         logger.error(f"Error in activity data processing: {e}")
     finally:
@@ -88,22 +129,34 @@ def run_activity_process(start_time, end_time):
 
 # 매일 자정에 실행될 히트맵 생성 함수
 def run_daily_heatmap_generation():
-    """매일 자정에 전날 데이터로 히트맵 생성"""
+    """매일 자정에 전날 데이터로 히트맵 생성 (반려동물과 연결된 장치별로 실행)"""
     # 데이터베이스 세션 생성
     session = next(get_db())
     try:
         logger.info("Running daily heatmap generation...")
         heatmap_service = HeatmapService()
-        result = heatmap_service.generate_previous_day_heatmap(session)
-        if result["success"]:
-            logger.info(f"Daily heatmap generated successfully: {result['url']}")
-        else:
-            logger.error(f"Daily heatmap generation failed: {result['message']}")
+        for device_sn in PetDeviceService().get_active_sns(session):
+            result = heatmap_service.generate_previous_day_heatmap(session, device_sn)
+            if result["success"]:
+                logger.info(f"Daily heatmap generated successfully: {result['url']}")
+            else:
+                logger.error(f"Daily heatmap generation failed for {device_sn}: {result['message']}")
     except Exception as e:
         logger.error(f"Error in daily heatmap generation: {e}")
     finally:
         session.close()
 
+# 매일 자정에 실행될 YOLO 결과 파티션 생성 함수
+def run_daily_partition_maintenance():
+    """미래 월 파티션을 미리 생성 (파티션 테이블이 아니면 아무것도 하지 않음, 보관은 crontab/yolo_partition.py)"""
+    try:
+        with engine.begin() as connection:
+            created = ensure_future_partitions(connection)
+        if created:
+            logger.info(f"Created yolo_results partitions: {created}")
+    except Exception as e:
+        logger.error(f"Error in yolo_results partition maintenance: {e}")
+
 # Include routers
 app.include_router(user_router)
 app.include_router(pet_router)
@@ -128,6 +181,12 @@ async def startup_event():
     # 매일 자정에 실행할 히트맵 생성 태스크 설정
     asyncio.create_task(run_daily_at_midnight(run_daily_heatmap_generation))
 
+    # 매일 자정에 YOLO 결과 파티션 미리 생성
+    asyncio.create_task(run_daily_at_midnight(run_daily_partition_maintenance))
+
+    # 다른 워커가 발행한 반려동물 상태 이벤트 수신
+    asyncio.create_task(pet_state_broker.listen(engine))
+
     logger.info("Scheduled background tasks started")
 
 if __name__ == "__main__":
@@ -5,6 +5,14 @@ from typing import List, Optional
 from sqlalchemy import text
 from repository.entity.active_report_entity import ActiveReport
 
+LATEST_BY_SN_QUERY = text("""
+    SELECT "SN", "DATE", "TIME", active
+    FROM capstone.active_reports
+    WHERE "SN" = :sn
+    ORDER BY "DATE" DESC, "TIME" DESC
+    LIMIT :limit
+""")
+
 
 class ActiveReportRepository:
     def save_or_update(self, db: Session, SN: str, DATE: str, TIME: str, active: float) -> bool:
@@ -43,15 +51,7 @@ class ActiveReportRepository:
 
     def get_latest_by_sn(self, db: Session, SN: str, limit: int = 24) -> List[ActiveReport]:
         """특정 장치의 최근 활동량 데이터 조회 (기본 24시간)"""
-        query = text(f"""
-            SELECT "SN", "DATE", "TIME", active 
-            FROM capstone.active_reports 
-            WHERE "SN" = :sn
-            ORDER BY "DATE" DESC, "TIME" DESC
-            LIMIT :limit
-        """)
-
-        result = db.execute(query, {"sn": SN, "limit": limit})
+        result = db.execute(LATEST_BY_SN_QUERY, {"sn": SN, "limit": limit})
 
         return [ActiveReport(
             SN=row[0],
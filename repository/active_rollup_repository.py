@@ -0,0 +1,109 @@
+# /repository/active_rollup_repository.py
+
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from repository.entity.active_report_entity import ActiveReport
+from repository.entity.active_rollup_entity import ActiveHourlyRollup, ActiveDailyRollup
+
+
+class ActiveRollupRepository:
+    def refresh(self, db: Session, SN: str, DATE: str, hours: Iterable[int]):
+        """
+        변경된 시간 버킷과 해당 날짜의 집계를 active_reports 기준으로 다시 계산 (commit은 호출자가 수행)
+        기존 행 갱신(같은 분 재계산)에도 합계/최댓값이 정확하도록 증분 가산 대신 해당 버킷만 재집계
+        """
+        hours = sorted(set(hours))
+        if not hours:
+            return
+
+        # TIME은 HHMMSS 문자열이므로 시간 범위를 문자열 범위로 조회 (기본 키 인덱스 사용)
+        hour = func.substr(ActiveReport.TIME, 1, 2)
+        rows = db.query(
+            hour, func.sum(ActiveReport.active), func.count(), func.max(ActiveReport.active)
+        ).filter(
+            ActiveReport.SN == SN,
+            ActiveReport.DATE == DATE,
+            ActiveReport.TIME >= f"{hours[0]:02d}",
+            ActiveReport.TIME < f"{hours[-1] + 1:02d}"
+        ).group_by(hour).all()
+
+        for hour_str, total, count, max_active in rows:
+            if int(hour_str) not in hours:
+                continue
+            rollup = db.get(ActiveHourlyRollup, (SN, DATE, int(hour_str)))
+            if rollup is None:
+                rollup = ActiveHourlyRollup(SN=SN, DATE=DATE, HOUR=int(hour_str))
+                db.add(rollup)
+            rollup.active_sum = float(total)
+            rollup.active_count = int(count)
+            rollup.active_max = float(max_active)
+
+        # 일 단위는 최대 24개의 시간 집계에서 다시 계산
+        db.flush()
+        total, count, max_active = db.query(
+            func.sum(ActiveHourlyRollup.active_sum),
+            func.sum(ActiveHourlyRollup.active_count),
+            func.max(ActiveHourlyRollup.active_max)
+        ).filter(
+            ActiveHourlyRollup.SN == SN,
+            ActiveHourlyRollup.DATE == DATE
+        ).one()
+        if not count:
+            return
+
+        daily = db.get(ActiveDailyRollup, (SN, DATE))
+        if daily is None:
+            daily = ActiveDailyRollup(SN=SN, DATE=DATE)
+            db.add(daily)
+        daily.active_sum = float(total)
+        daily.active_count = int(count)
+        daily.active_max = float(max_active)
+
+    def refresh_touched(self, db: Session, reports: Iterable[Tuple[str, str, str]]) -> int:
+        """
+        저장한 분 단위 행 (SN, DATE, TIME)이 속한 (장치, 날짜)별 시간 버킷만 다시 집계 (commit은 호출자가 수행)
+
+        Returns:
+            다시 계산한 (장치, 날짜) 수
+        """
+        touched: Dict[Tuple[str, str], Set[int]] = {}
+        for SN, DATE, TIME in reports:
+            touched.setdefault((SN, DATE), set()).add(int(TIME[:2]))
+
+        db.flush()
+        for (SN, DATE), hours in touched.items():
+            self.refresh(db, SN, DATE, hours)
+        return len(touched)
+
+    def rebuild(self, db: Session, SN: Optional[str] = None, since: Optional[str] = None) -> int:
+        """
+        active_reports 전체(또는 장치 / since(YYYYMMDD) 이후)로 집계 재생성 (기존 데이터 백필용, commit은 호출자가 수행)
+
+        Returns:
+            다시 계산한 (장치, 날짜) 수
+        """
+        query = db.query(ActiveReport.SN, ActiveReport.DATE).distinct()
+        if SN:
+            query = query.filter(ActiveReport.SN == SN)
+        if since:
+            query = query.filter(ActiveReport.DATE >= since)
+
+        days: List[Tuple[str, str]] = query.all()
+        for day_sn, day in days:
+            self.refresh(db, day_sn, day, range(24))
+        return len(days)
+
+    def get_hourly(self, db: Session, SN: str, DATE: str) -> List[ActiveHourlyRollup]:
+        """특정 장치 및 날짜의 시간별 집계 (시간순)"""
+        return db.query(ActiveHourlyRollup).filter(
+            ActiveHourlyRollup.SN == SN,
+            ActiveHourlyRollup.DATE == DATE
+        ).order_by(ActiveHourlyRollup.HOUR).all()
+
+    def get_daily(self, db: Session, SN: str, DATES: List[str]) -> List[ActiveDailyRollup]:
+        """특정 장치의 지정한 날짜들의 일별 집계"""
+        return db.query(ActiveDailyRollup).filter(
+            ActiveDailyRollup.SN == SN,
+            ActiveDailyRollup.DATE.in_(DATES)
+        ).all()
@@ -1,7 +1,8 @@
 # /repository/chat_repository.py
 
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from datetime import datetime
 from repository.entity.chat_entity import Chat
 
 
@@ -17,12 +18,31 @@ class ChatRepository:
         db.refresh(db_chat)
         return db_chat
 
+    def create_many(self, db: Session, firebase_uid: str, pairs: List[Tuple[str, Optional[str]]]) -> List[Chat]:
+        """(question, answer) 목록을 한 트랜잭션으로 저장"""
+        db_chats = [
+            Chat(firebase_uid=firebase_uid, question=question, answer=answer)
+            for question, answer in pairs
+        ]
+        db.add_all(db_chats)
+        db.commit()
+        for db_chat in db_chats:
+            db.refresh(db_chat)
+        return db_chats
+
     def get_by_id(self, db: Session, chat_id: int) -> Optional[Chat]:
         return db.query(Chat).filter(Chat.id == chat_id).first()
 
     def get_by_user(self, db: Session, firebase_uid: str) -> List[Chat]:
         return db.query(Chat).filter(Chat.firebase_uid == firebase_uid).all()
 
+    def get_recent_by_user(self, db: Session, firebase_uid: str, since: datetime, limit: int) -> List[Chat]:
+        """since 이후의 최근 대화 limit개 (최신순)"""
+        return db.query(Chat).filter(
+            Chat.firebase_uid == firebase_uid,
+            Chat.created_at > since
+        ).order_by(Chat.created_at.desc()).limit(limit).all()
+
     def update(self, db: Session, chat_id: int, **kwargs) -> Optional[Chat]:
         db_chat = self.get_by_id(db, chat_id)
         if db_chat:
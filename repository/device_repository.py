@@ -1,5 +1,6 @@
 # /repository/device_repository.py
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from repository.entity.device_entity import Device
@@ -23,6 +24,13 @@ class DeviceRepository:
         db.refresh(db_device)
         return db_device
 
+    def create_many(self, db: Session, rows: List[Dict[str, Any]]) -> int:
+        """장치 여러 대를 한 번에 INSERT (commit은 호출자가 수행)"""
+        if not rows:
+            return 0
+        db.execute(insert(Device), rows)
+        return len(rows)
+
     def get_by_id(self, db: Session, device_id: str) -> Optional[Device]:
         return db.query(Device).filter(Device.device_id == device_id).first()
 
@@ -72,6 +80,3 @@ class DeviceRepository:
             db.commit()
             return True
         return False
-
-    def count_serial_prefix(self, db: Session, prefix: str) -> int:
-        return db.query(Device).filter(Device.SN.like(f"{prefix}%")).count()
\ No newline at end of file
@@ -0,0 +1,35 @@
+# /repository/device_state_repository.py
+
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+from repository.entity.device_state_entity import DeviceState
+
+
+class DeviceStateRepository:
+    def get_by_sn(self, db: Session, SN: str) -> Optional[DeviceState]:
+        return db.query(DeviceState).filter(DeviceState.SN == SN).first()
+
+    def get_by_sns(self, db: Session, SNs: List[str]) -> List[DeviceState]:
+        if not SNs:
+            return []
+        return db.query(DeviceState).filter(DeviceState.SN.in_(SNs)).all()
+
+    def upsert(self, db: Session, SN: str, is_hiding: bool, last_frame_timestamp: Optional[str],
+               updated_at: datetime) -> DeviceState:
+        db_state = self.get_by_sn(db, SN)
+        if db_state:
+            db_state.is_hiding = is_hiding
+            db_state.last_frame_timestamp = last_frame_timestamp
+            db_state.updated_at = updated_at
+        else:
+            db_state = DeviceState(
+                SN=SN,
+                is_hiding=is_hiding,
+                last_frame_timestamp=last_frame_timestamp,
+                updated_at=updated_at
+            )
+            db.add(db_state)
+        db.commit()
+        db.refresh(db_state)
+        return db_state
@@ -0,0 +1,29 @@
+# /repository/entity/active_rollup_entity.py
+
+from sqlalchemy import Column, String, Float, Integer
+from db.database import Base
+
+
+class ActiveHourlyRollup(Base):
+    """active_reports의 1분 단위 활동량을 시간 단위로 집계 (활동량 작업이 저장할 때마다 갱신)"""
+    __tablename__ = "active_hourly_rollups"
+    __table_args__ = {"schema": "capstone"}
+
+    SN = Column(String(255), primary_key=True, nullable=False)
+    DATE = Column(String(8), primary_key=True, nullable=False)
+    HOUR = Column(Integer, primary_key=True, nullable=False)  # 0~23
+    active_sum = Column(Float, nullable=False, default=0)
+    active_count = Column(Integer, nullable=False, default=0)
+    active_max = Column(Float, nullable=False, default=0)
+
+
+class ActiveDailyRollup(Base):
+    """시간 단위 집계를 다시 일 단위로 집계"""
+    __tablename__ = "active_daily_rollups"
+    __table_args__ = {"schema": "capstone"}
+
+    SN = Column(String(255), primary_key=True, nullable=False)
+    DATE = Column(String(8), primary_key=True, nullable=False)
+    active_sum = Column(Float, nullable=False, default=0)
+    active_count = Column(Integer, nullable=False, default=0)
+    active_max = Column(Float, nullable=False, default=0)
@@ -1,6 +1,6 @@
 # /repository/entity/chat_entity.py
 
-from sqlalchemy import Column, String, Text, ForeignKey, Integer, DateTime
+from sqlalchemy import Column, String, Text, ForeignKey, Integer, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from db.database import Base
@@ -8,7 +8,11 @@ from db.database import Base
 
 class Chat(Base):
     __tablename__ = "chat"
-    __table_args__ = {"schema": "capstone"}
+    __table_args__ = (
+        # 사용자별 최근 대화 구간 조회용
+        Index("ix_chat_firebase_uid_created_at", "firebase_uid", "created_at"),
+        {"schema": "capstone"},
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     firebase_uid = Column(String, ForeignKey("capstone.user.firebase_uid"), nullable=False)
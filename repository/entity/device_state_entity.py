@@ -0,0 +1,15 @@
+# /repository/entity/device_state_entity.py
+
+from sqlalchemy import Column, String, Boolean, DateTime
+from db.database import Base
+
+
+class DeviceState(Base):
+    """장치별 현재 상태 (1분 주기 작업에서 갱신, 상태 조회 API는 이 값만 읽음)"""
+    __tablename__ = "device_states"
+    __table_args__ = {"schema": "capstone"}
+
+    SN = Column(String(255), primary_key=True)
+    is_hiding = Column(Boolean, nullable=False, default=False)
+    last_frame_timestamp = Column(String(15), nullable=True)  # 판단에 사용한 마지막 프레임 (YYYYMMDD_HHMMSS)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,31 @@
+# /repository/entity/hiding_interval_entity.py
+
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, Index
+from db.database import Base
+
+
+class HidingInterval(Base):
+    __tablename__ = "hiding_intervals"
+    __table_args__ = (
+        Index("ix_hiding_intervals_sn_start_time", "SN", "start_time"),
+        {"schema": "capstone"},
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    SN = Column(String(255), nullable=False)
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
+    frame_count = Column(Integer, nullable=False)
+    no_box_frames = Column(Integer, nullable=False, default=0)
+    low_conf_frames = Column(Integer, nullable=False, default=0)
+
+
+class HidingCheckpoint(Base):
+    __tablename__ = "hiding_checkpoints"
+    __table_args__ = {"schema": "capstone"}
+
+    SN = Column(String(255), primary_key=True)
+    last_timestamp = Column(String(15), nullable=False)  # YOLO timestamp (YYYYMMDD_HHMMSS)
+    # 마지막 프레임 상태 (다음 실행에서 이전 프레임 기준 규칙 적용용)
+    last_no_box = Column(Boolean, nullable=False, default=False)
+    last_hidden = Column(Boolean, nullable=False, default=False)
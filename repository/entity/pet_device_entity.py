@@ -0,0 +1,19 @@
+# /repository/entity/pet_device_entity.py
+
+from sqlalchemy import Column, String, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from db.database import Base
+
+
+class PetDevice(Base):
+    """반려동물과 반려동물을 촬영하는 장치(SN)의 연결 (반려동물당 장치 1대)"""
+    __tablename__ = "pet_device"
+    __table_args__ = {"schema": "capstone"}
+
+    pet_id = Column(String, ForeignKey("capstone.pet.pet_id", ondelete="CASCADE"), primary_key=True)
+    SN = Column(String, ForeignKey("capstone.device.SN", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), default=func.now())
+
+    # Relationships
+    pet = relationship("Pet", back_populates="pet_device")
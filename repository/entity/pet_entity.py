@@ -21,4 +21,5 @@ class Pet(Base):
     pet_cleans = relationship("PetClean", back_populates="pet", cascade="all, delete-orphan")
     pet_feeds = relationship("PetFeed", back_populates="pet", cascade="all, delete-orphan")
     pet_healths = relationship("PetHealth", back_populates="pet", cascade="all, delete-orphan")
-    pet_actives = relationship("PetActive", back_populates="pet", cascade="all, delete-orphan")
\ No newline at end of file
+    pet_actives = relationship("PetActive", back_populates="pet", cascade="all, delete-orphan")
+    pet_device = relationship("PetDevice", back_populates="pet", uselist=False, cascade="all, delete-orphan")
\ No newline at end of file
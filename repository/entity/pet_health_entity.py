@@ -1,13 +1,17 @@
 # /repository/entity/pet_health_entity.py
 
-from sqlalchemy import Column, String, Date, ForeignKey, Float, Text
+from sqlalchemy import Column, String, Date, ForeignKey, Float, Text, Index
 from sqlalchemy.orm import relationship
 from db.database import Base
 
 
 class PetHealth(Base):
     __tablename__ = "pet_health"
-    __table_args__ = {"schema": "capstone"}
+    __table_args__ = (
+        # 반려동물별 최신 건강 기록 조회용
+        Index("ix_pet_health_pet_id_date", "pet_id", "date"),
+        {"schema": "capstone"},
+    )
 
     # Composite primary key
     firebase_uid = Column(String, ForeignKey("capstone.user.firebase_uid"), primary_key=True)
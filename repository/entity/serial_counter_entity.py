@@ -0,0 +1,13 @@
+# /repository/entity/serial_counter_entity.py
+
+from sqlalchemy import Column, String, Integer
+from db.database import Base
+
+
+class SerialCounter(Base):
+    """SN prefix(제조사+모델+연도+주차+공장)별 마지막으로 발급한 순번"""
+    __tablename__ = "serial_counters"
+    __table_args__ = {"schema": "capstone"}
+
+    prefix = Column(String(32), primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
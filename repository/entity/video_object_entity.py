@@ -0,0 +1,24 @@
+# /repository/entity/video_object_entity.py
+
+from sqlalchemy import Column, String, BigInteger, DateTime, Index, func
+from db.database import Base
+
+
+class VideoObject(Base):
+    """
+    S3 영상 객체 메타데이터 인덱스 (목록 조회/HEAD 결과로 채워지며 영상 상세 조회 시 S3 호출 없이 사용)
+    S3에서 삭제/만료된 객체는 목록 동기화나 HEAD 재확인(indexed_at 기준 TTL) 시 제거됨
+    """
+    __tablename__ = "video_objects"
+    __table_args__ = (
+        Index("ix_video_objects_sn_date", "SN", "date"),
+        {"schema": "capstone"},
+    )
+
+    s3_key = Column(String, primary_key=True)
+    SN = Column(String, nullable=False)
+    date = Column(String(8), nullable=False)  # YYYYMMDD
+    size = Column(BigInteger, nullable=False, default=0)
+    last_modified = Column(DateTime(timezone=True), nullable=True)
+    content_type = Column(String, nullable=False, default="video/mp4")
+    indexed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # S3에서 마지막으로 확인한 시각
@@ -0,0 +1,59 @@
+# /repository/hiding_interval_repository.py
+
+from sqlalchemy.orm import Session
+from typing import List, Optional, Dict, Any
+from datetime import datetime, timedelta
+from repository.entity.hiding_interval_entity import HidingInterval, HidingCheckpoint
+
+
+class HidingIntervalRepository:
+    def get_checkpoint(self, db: Session, SN: str) -> Optional[HidingCheckpoint]:
+        return db.query(HidingCheckpoint).filter(HidingCheckpoint.SN == SN).first()
+
+    def set_checkpoint(self, db: Session, SN: str, last_timestamp: str, last_no_box: bool, last_hidden: bool):
+        checkpoint = self.get_checkpoint(db, SN)
+        if checkpoint:
+            checkpoint.last_timestamp = last_timestamp
+            checkpoint.last_no_box = last_no_box
+            checkpoint.last_hidden = last_hidden
+        else:
+            db.add(HidingCheckpoint(
+                SN=SN,
+                last_timestamp=last_timestamp,
+                last_no_box=last_no_box,
+                last_hidden=last_hidden
+            ))
+
+    def get_latest(self, db: Session, SN: str) -> Optional[HidingInterval]:
+        return db.query(HidingInterval).filter(
+            HidingInterval.SN == SN
+        ).order_by(HidingInterval.end_time.desc()).first()
+
+    def get_by_range(self, db: Session, SN: str, start: datetime, end: datetime) -> List[HidingInterval]:
+        return db.query(HidingInterval).filter(
+            HidingInterval.SN == SN,
+            HidingInterval.end_time >= start,
+            HidingInterval.start_time < end
+        ).order_by(HidingInterval.start_time).all()
+
+    def save_intervals(self, db: Session, SN: str, intervals: List[Dict[str, Any]], max_gap: timedelta) -> int:
+        """
+        은신 구간 저장 (commit은 호출자가 수행)
+        첫 구간이 마지막으로 저장된 구간과 max_gap 이내로 이어지면 새로 추가하지 않고 기존 구간을 연장
+        """
+        if not intervals:
+            return 0
+
+        latest = self.get_latest(db, SN)
+        for interval in intervals:
+            if latest and timedelta(0) <= interval["start_time"] - latest.end_time <= max_gap:
+                latest.end_time = max(latest.end_time, interval["end_time"])
+                latest.frame_count += interval["frame_count"]
+                latest.no_box_frames += interval["no_box_frames"]
+                latest.low_conf_frames += interval["low_conf_frames"]
+                continue
+
+            latest = HidingInterval(SN=SN, **interval)
+            db.add(latest)
+
+        return len(intervals)
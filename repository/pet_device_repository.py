@@ -0,0 +1,36 @@
+# /repository/pet_device_repository.py
+
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from repository.entity.pet_device_entity import PetDevice
+
+
+class PetDeviceRepository:
+    def get_by_pet(self, db: Session, pet_id: str) -> Optional[PetDevice]:
+        return db.query(PetDevice).filter(PetDevice.pet_id == pet_id).first()
+
+    def get_pet_ids_by_sn(self, db: Session, SN: str) -> List[str]:
+        return [row[0] for row in db.query(PetDevice.pet_id).filter(PetDevice.SN == SN).all()]
+
+    def get_all_sns(self, db: Session) -> List[str]:
+        """반려동물과 연결된 장치 SN 목록 (중복 제거)"""
+        return [row[0] for row in db.query(PetDevice.SN).distinct().all()]
+
+    def upsert(self, db: Session, pet_id: str, SN: str) -> PetDevice:
+        db_link = self.get_by_pet(db, pet_id)
+        if db_link:
+            db_link.SN = SN
+        else:
+            db_link = PetDevice(pet_id=pet_id, SN=SN)
+            db.add(db_link)
+        db.commit()
+        db.refresh(db_link)
+        return db_link
+
+    def delete(self, db: Session, pet_id: str) -> bool:
+        db_link = self.get_by_pet(db, pet_id)
+        if db_link:
+            db.delete(db_link)
+            db.commit()
+            return True
+        return False
@@ -1,8 +1,10 @@
 # /repository/pet_repository.py
 
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import select, true
+from sqlalchemy.orm import Session, aliased
+from typing import List, Optional, Tuple
 from repository.entity.pet_entity import Pet
+from repository.entity.pet_health_entity import PetHealth
 from datetime import date
 
 
@@ -25,6 +27,21 @@ class PetRepository:
     def get_by_id(self, db: Session, pet_id: str) -> Optional[Pet]:
         return db.query(Pet).filter(Pet.pet_id == pet_id).first()
 
+    def get_with_latest_health(self, db: Session, pet_id: str) -> Optional[Tuple[Pet, Optional[PetHealth]]]:
+        """반려동물과 최신 건강 기록을 한 번의 쿼리로 조회 (LATERAL ... ORDER BY date DESC LIMIT 1)"""
+        latest = select(PetHealth).where(
+            PetHealth.pet_id == Pet.pet_id
+        ).order_by(PetHealth.date.desc()).limit(1).lateral()
+        latest_health = aliased(PetHealth, latest)
+
+        row = db.query(Pet, latest_health).outerjoin(latest, true()).filter(Pet.pet_id == pet_id).first()
+        if row is None:
+            return None
+        return row[0], row[1]
+
+    def get_by_user_and_id(self, db: Session, firebase_uid: str, pet_id: str) -> Optional[Pet]:
+        return db.query(Pet).filter(Pet.pet_id == pet_id, Pet.firebase_uid == firebase_uid).first()
+
     def get_by_user(self, db: Session, firebase_uid: str) -> List[Pet]:
         return db.query(Pet).filter(Pet.firebase_uid == firebase_uid).all()
 
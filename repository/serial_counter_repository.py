@@ -0,0 +1,38 @@
+# /repository/serial_counter_repository.py
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# 기존 카운터 증가 (행 잠금으로 동시 발급 직렬화)
+INCREMENT_COUNTER_QUERY = text("""
+    UPDATE capstone.serial_counters
+    SET last_value = last_value + :count
+    WHERE prefix = :prefix
+    RETURNING last_value
+""")
+
+# 주차가 바뀌어 카운터가 없으면 생성
+# 카운터 도입 전에 등록된 장치가 있을 수 있으므로 처음 한 번만 기존 개수로 시작값을 맞춤
+CREATE_COUNTER_QUERY = text("""
+    INSERT INTO capstone.serial_counters (prefix, last_value)
+    VALUES (
+        :prefix,
+        (SELECT COUNT(*) FROM capstone.device WHERE "SN" LIKE :prefix || '%') + :count
+    )
+    ON CONFLICT (prefix) DO UPDATE
+    SET last_value = capstone.serial_counters.last_value + :count
+    RETURNING last_value
+""")
+
+
+class SerialCounterRepository:
+    def allocate(self, db: Session, prefix: str, count: int = 1) -> int:
+        """
+        prefix의 순번 count개를 발급하고 첫 번째 순번 반환 (commit은 호출자가 수행)
+        같은 트랜잭션에서 장치를 등록하면 롤백 시 순번도 함께 롤백됨
+        """
+        params = {"prefix": prefix, "count": count}
+        last_value = db.execute(INCREMENT_COUNTER_QUERY, params).scalar()
+        if last_value is None:
+            last_value = db.execute(CREATE_COUNTER_QUERY, params).scalar()
+        return last_value - count + 1
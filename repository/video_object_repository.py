@@ -0,0 +1,41 @@
+# /repository/video_object_repository.py
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import List, Optional, Dict, Any, Iterable
+from repository.entity.video_object_entity import VideoObject
+
+
+class VideoObjectRepository:
+    def get_by_key(self, db: Session, s3_key: str) -> Optional[VideoObject]:
+        return db.query(VideoObject).filter(VideoObject.s3_key == s3_key).first()
+
+    def upsert_many(self, db: Session, rows: List[Dict[str, Any]]) -> int:
+        """s3_key 기준으로 메타데이터 일괄 저장 (이미 있으면 갱신, commit은 호출자가 수행)"""
+        if not rows:
+            return 0
+        stmt = insert(VideoObject).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[VideoObject.s3_key],
+            set_={
+                "size": stmt.excluded.size,
+                "last_modified": stmt.excluded.last_modified,
+                "content_type": stmt.excluded.content_type,
+                "indexed_at": func.now()
+            }
+        )
+        db.execute(stmt)
+        return len(rows)
+
+    def delete_by_key(self, db: Session, s3_key: str) -> int:
+        """S3에서 사라진 객체를 인덱스에서 제거 (commit은 호출자가 수행)"""
+        return db.query(VideoObject).filter(VideoObject.s3_key == s3_key).delete(synchronize_session=False)
+
+    def delete_missing(self, db: Session, SN: str, date: str, keys: Iterable[str]) -> int:
+        """해당 장치/날짜의 인덱스 중 S3 목록(keys)에 없는 행 제거 (commit은 호출자가 수행)"""
+        query = db.query(VideoObject).filter(VideoObject.SN == SN, VideoObject.date == date)
+        keys = list(keys)
+        if keys:
+            query = query.filter(VideoObject.s3_key.notin_(keys))
+        return query.delete(synchronize_session=False)
@@ -1,11 +1,13 @@
 # /router/chat_router.py
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from router.model.chat_model import ChatQuery, ChatResponse
+from router.model.chat_model import ChatQuery, ChatResponse, ChatBatchQuery, ChatBatchResponse
 from service.chat_service import ChatService
 from db.session import get_db
+from db.database import SessionLocal
 from util.firebase_util import get_current_user_firebase_uid
 
 router = APIRouter(prefix="/chats", tags=["chats"])
@@ -35,7 +37,7 @@ def read_chats_by_pet(
     summary="반려동물에 대한 질문 처리",
     description="반려동물에 대한 질문을 처리하고 자동으로 답변을 생성합니다."
 )
-def query_and_save(
+async def query_and_save(
     pet_id: str,
     chat_data: ChatQuery,
     db: Session = Depends(get_db),
@@ -44,6 +46,57 @@ def query_and_save(
     """
     Process a query about a pet, generate an answer automatically, and save the chat
     """
-    # The create_chat method automatically generates an answer
-    chat = chat_service.create_chat(db, firebase_uid, pet_id, chat_data.question)
-    return chat
\ No newline at end of file
+    # The acreate_chat method automatically generates an answer
+    chat = await chat_service.acreate_chat(db, firebase_uid, pet_id, chat_data.question)
+    return chat
+
+
+@router.post(
+    "/{pet_id}/query/batch",
+    response_model=ChatBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="반려동물에 대한 여러 질문 일괄 처리",
+    description="최대 50개의 질문을 한 번에 처리합니다. 임베딩과 검색은 한 번에 수행하고 답변 생성은 동시에 실행합니다."
+)
+async def query_and_save_batch(
+    pet_id: str,
+    batch_data: ChatBatchQuery,
+    db: Session = Depends(get_db),
+    firebase_uid: str = Depends(get_current_user_firebase_uid)
+):
+    """
+    Process several queries about a pet at once
+    """
+    return await chat_service.create_chats_batch(
+        db, firebase_uid, pet_id, batch_data.questions, batch_data.save
+    )
+
+
+@router.post(
+    "/{pet_id}/query/stream",
+    summary="반려동물에 대한 질문 처리 (스트리밍)",
+    description="답변을 server-sent events로 스트리밍합니다. "
+                "`token` 이벤트로 답변 조각을 보내고, 저장이 끝나면 `done` 이벤트로 저장된 채팅을 보냅니다."
+)
+async def query_and_save_stream(
+    pet_id: str,
+    chat_data: ChatQuery,
+    firebase_uid: str = Depends(get_current_user_firebase_uid)
+):
+    """
+    Process a query about a pet and stream the answer as server-sent events
+    """
+    # get_db 의존성은 응답 스트리밍 전에 세션을 닫으므로 스트림이 세션을 직접 관리함
+    async def event_stream():
+        db = SessionLocal()
+        try:
+            async for event in chat_service.stream_chat(db, firebase_uid, pet_id, chat_data.question):
+                yield event
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
\ No newline at end of file
@@ -6,7 +6,8 @@ from typing import List
 
 from router.model.device_model import (
     DeviceCreate, DeviceUpdate, DeviceResponse,
-    SerialResponse, OpenCVImageRequest
+    SerialResponse, OpenCVImageRequest,
+    DeviceBulkRegisterRequest, DeviceBulkRegisterResponse
 )
 from service.device_service import DeviceService
 from db.session import get_db
@@ -96,6 +97,21 @@ def register_sn_by_ip(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@cam_router.post(
+    "/register/bulk",
+    response_model=DeviceBulkRegisterResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="SN 일괄 생성 및 등록",
+    description="공장 출고용으로 IP 목록(최대 5000개)에 대해 SN을 한 번에 발급하고 한 트랜잭션으로 등록합니다. 요청 순서대로 IP와 SN을 반환합니다.",
+)
+def register_sn_bulk(req: DeviceBulkRegisterRequest, db: Session = Depends(get_db)):
+    try:
+        devices = device_service.register_devices_bulk(db, req.ips)
+        return {"devices": devices}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @cam_router.get(
     "/{sn}",
     response_model=DeviceResponse,
@@ -20,4 +20,20 @@ class ChatResponse(BaseModel):
     messages: List[ChatMessage]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class ChatBatchQuery(BaseModel):
+    questions: List[str] = Field(..., min_length=1, max_length=50)
+    save: bool = Field(True, description="답변을 채팅 내역으로 저장할지 여부")
+
+
+class ChatBatchMessage(BaseModel):
+    id: Optional[int] = None
+    question: str
+    answer: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+class ChatBatchResponse(BaseModel):
+    messages: List[ChatBatchMessage]
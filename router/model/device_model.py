@@ -1,7 +1,7 @@
 # /router/model/device_model.py
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 
 class DeviceBase(BaseModel):
@@ -32,6 +32,19 @@ class SerialResponse(BaseModel):
     serial_number: str = Field(..., example="SFRXC12515GF00001")
 
 
+class DeviceBulkRegisterRequest(BaseModel):
+    ips: List[str] = Field(..., min_length=1, max_length=5000, example=["192.168.0.153", "192.168.0.154"])
+
+
+class SerialAssignment(BaseModel):
+    ip: str = Field(..., example="192.168.0.153")
+    serial_number: str = Field(..., example="SFRXC12515GF00001")
+
+
+class DeviceBulkRegisterResponse(BaseModel):
+    devices: List[SerialAssignment]
+
+
 class OpenCVImageRequest(BaseModel):
     SN: str = Field(..., example="SFRXC12515GF00001")
     filename: str = Field(..., example="SFRXC12515GF00001_20250413_140000.jpg")
\ No newline at end of file
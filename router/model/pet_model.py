@@ -2,7 +2,7 @@
 
 from pydantic import BaseModel, Field
 from typing import Optional
-from datetime import date
+from datetime import date, datetime
 
 
 class PetBase(BaseModel):
@@ -27,4 +27,14 @@ class PetResponse(PetBase):
     pet_id: str
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class PetDeviceLink(BaseModel):
+    SN: str = Field(..., min_length=1, example="SFRXC12515GF00001")
+
+
+class PetDeviceResponse(BaseModel):
+    pet_id: str
+    SN: str
+    created_at: Optional[datetime] = None
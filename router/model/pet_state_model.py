@@ -2,6 +2,7 @@
 
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+from datetime import datetime
 
 class KeypointInfo(BaseModel):
     name: str
@@ -14,4 +15,6 @@ class HideLog(BaseModel):
 
 class PetStateResponse(BaseModel):
     pet_id: str
-    is_hiding: bool
\ No newline at end of file
+    is_hiding: bool
+    updated_at: Optional[datetime] = None  # 상태가 계산된 시각
+    last_frame_timestamp: Optional[str] = None  # 판단에 사용한 마지막 프레임 (YYYYMMDD_HHMMSS)
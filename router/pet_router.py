@@ -1,28 +1,73 @@
 # /router/pet_router.py
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+import asyncio
 from sqlalchemy.orm import Session
 from typing import List
 
-from router.model.pet_model import PetCreate, PetResponse, PetUpdate
+from router.model.pet_model import PetCreate, PetResponse, PetUpdate, PetDeviceLink, PetDeviceResponse
 from service.pet_service import PetService
 from db.session import get_db
+from db.database import SessionLocal
 from util.firebase_util import get_current_user_firebase_uid
 from router.model.pet_state_model import PetStateResponse
 from service.pet_state_service import PetStateService
+from service.pet_device_service import PetDeviceService
+from service.device_service import DeviceService
 
 router = APIRouter(prefix="/pets", tags=["pets"])
 pet_service = PetService()
 
 # 서비스 인스턴스 생성
 pet_state_service = PetStateService()
+pet_device_service = PetDeviceService()
+device_service = DeviceService()
+
+
+def _get_owned_pet(db: Session, pet_id: str, firebase_uid: str):
+    """현재 사용자의 반려동물 조회 (없거나 다른 사용자의 반려동물이면 404)"""
+    pet = pet_service.get_user_pet(db, firebase_uid, pet_id)
+    if pet is None:
+        raise HTTPException(status_code=404, detail="Pet not found")
+    return pet
+
+
+@router.get(
+    "/state/stream",
+    summary="반려동물 상태 스트리밍",
+    description="현재 사용자의 모든 반려동물 상태를 server-sent events로 전달합니다. "
+                "연결 시 현재 상태를 `state` 이벤트로 보내고, 이후 은신 상태가 바뀌면 `state`, "
+                "1분마다 최신 활동량이 계산되면 `activity` 이벤트를 보냅니다. 상태 조회 API 폴링을 대체합니다."
+)
+async def stream_pet_states(
+        firebase_uid: str = Depends(get_current_user_firebase_uid)
+):
+    # get_db 의존성은 응답 스트리밍 전에 세션을 닫으므로 스트림 시작 시 세션을 직접 열고 닫음
+    def load_snapshot():
+        db = SessionLocal()
+        try:
+            return pet_state_service.get_user_pet_snapshot(db, firebase_uid)
+        finally:
+            db.close()
+
+    async def event_stream():
+        sn_to_pets, snapshot = await asyncio.to_thread(load_snapshot)
+        async for event in pet_state_service.stream_pet_states(sn_to_pets, snapshot):
+            yield event
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get(
     "/{pet_id}/state",
     response_model=PetStateResponse,
     summary="반려동물 은신 상태 조회",
-    description="지정된 반려동물의 현재 은신 상태를 조회합니다. 최근 5개 데이터를 기준으로 판단합니다."
+    description="지정된 반려동물의 현재 은신 상태를 조회합니다. 1분마다 최근 5개 데이터를 기준으로 미리 계산된 값과 계산 시각을 반환합니다."
 )
 def get_pet_state(
         pet_id: str,
@@ -30,15 +75,77 @@ def get_pet_state(
         firebase_uid: str = Depends(get_current_user_firebase_uid)
 ):
     # 먼저 해당 pet이 현재 사용자의 것인지 확인
-    pet = pet_service.get_pet(db, pet_id)
-    if pet is None:
-        raise HTTPException(status_code=404, detail="Pet not found")
+    _get_owned_pet(db, pet_id, firebase_uid)
 
     # 반려동물 상태 조회
     state = pet_state_service.get_pet_state(db, pet_id, firebase_uid)
     return state
 
 
+@router.get(
+    "/{pet_id}/device",
+    response_model=PetDeviceResponse,
+    summary="반려동물 연결 장치 조회",
+    description="지정된 반려동물에 연결된 장치(SN)를 조회합니다."
+)
+def get_pet_device(
+        pet_id: str,
+        db: Session = Depends(get_db),
+        firebase_uid: str = Depends(get_current_user_firebase_uid)
+):
+    _get_owned_pet(db, pet_id, firebase_uid)
+
+    link = pet_device_service.get_link(db, pet_id)
+    if link is None:
+        raise HTTPException(status_code=404, detail="No device linked to this pet")
+    return link
+
+
+@router.put(
+    "/{pet_id}/device",
+    response_model=PetDeviceResponse,
+    summary="반려동물에 장치 연결",
+    description="지정된 반려동물에 장치(SN)를 연결합니다. 현재 사용자에게 등록된(UID가 일치하는) 장치만 연결할 수 있습니다. 이미 연결된 장치가 있으면 교체합니다. 활동량, 은신 상태, 하이라이트 영상 등은 연결된 장치의 데이터로 조회됩니다."
+)
+def link_pet_device(
+        pet_id: str,
+        link_data: PetDeviceLink,
+        db: Session = Depends(get_db),
+        firebase_uid: str = Depends(get_current_user_firebase_uid)
+):
+    _get_owned_pet(db, pet_id, firebase_uid)
+
+    # 사용자에게 등록된 장치만 연결 가능
+    device = device_service.get_by_sn(db, link_data.SN)
+    if device is None:
+        raise HTTPException(status_code=404, detail="Serial Number not found")
+    if device["UID"] != firebase_uid:
+        raise HTTPException(status_code=403, detail="Device is not registered to this user")
+
+    link = pet_device_service.link_device(db, pet_id, link_data.SN, firebase_uid)
+    if link is None:
+        raise HTTPException(status_code=404, detail="Serial Number not found")
+    return link
+
+
+@router.delete(
+    "/{pet_id}/device",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="반려동물 장치 연결 해제",
+    description="지정된 반려동물의 장치 연결을 해제합니다."
+)
+def unlink_pet_device(
+        pet_id: str,
+        db: Session = Depends(get_db),
+        firebase_uid: str = Depends(get_current_user_firebase_uid)
+):
+    _get_owned_pet(db, pet_id, firebase_uid)
+
+    if not pet_device_service.unlink_device(db, pet_id):
+        raise HTTPException(status_code=404, detail="No device linked to this pet")
+    return None
+
+
 @router.post("/",
              response_model=PetResponse,
              status_code=status.HTTP_201_CREATED,
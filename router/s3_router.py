@@ -1,6 +1,6 @@
 # /router/s3_router.py
 
-from fastapi import APIRouter, Depends, HTTPException, Body, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Body, Query
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from db.session import get_db
@@ -26,6 +26,18 @@ class UploadResponse(BaseModel):
     )
     expires_in: int = Field(..., example=300)
 
+class BatchUploadRequest(BaseModel):
+    SN: str = Field(..., example="SFRXC12515GF00001")
+    filename: str = Field(..., example="SFRXC12515GF00001_20250413_140000.mp4", description="첫 번째 파일명")
+    count: int = Field(10, ge=1, le=60, example=10, description="발급할 URL 개수")
+    interval_seconds: int = Field(60, ge=1, le=3600, example=60, description="파일 간 시간 간격 (초)")
+
+class BatchUploadItem(UploadResponse):
+    filename: str = Field(..., example="SFRXC12515GF00001_20250413_140000.mp4")
+
+class BatchUploadResponse(BaseModel):
+    uploads: List[BatchUploadItem]
+
 class VideoFile(BaseModel):
     filename: str = Field(..., example="SFRXC12515GF00001_20250508_002000.mp4")
     download_url: str = Field(..., example="https://direp.s3.ap-northeast-2.amazonaws.com/stream/SFRXC12515GF00001/20250508/SFRXC12515GF00001_20250508_002000.mp4?...")
@@ -38,6 +50,7 @@ class VideoFile(BaseModel):
 
 class VideoListResponse(BaseModel):
     videos: List[VideoFile]
+    next_cursor: Optional[str] = Field(None, description="다음 페이지 커서 (마지막 페이지면 null)")
 
 # CAM-specific endpoints
 @cam_router.post(
@@ -65,6 +78,39 @@ def get_stream_upload_url(
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+@cam_router.post(
+    "/stream/upload-urls",
+    response_model=BatchUploadResponse,
+    summary="Stream 영상 업로드용 Pre-signed URL 일괄 발급",
+    description="첫 파일명부터 interval_seconds 간격으로 이어지는 다음 count개(최대 60개) 영상 파일의 업로드 URL을 한 번에 발급합니다. "
+                "각 URL은 해당 파일의 녹화 종료 시점(첫 파일 기준 interval_seconds × 순번)에 업로드 여유 시간을 더한 만큼 유효하며, "
+                "파일별 expires_in으로 반환됩니다.",
+)
+def get_stream_upload_urls(
+    req: BatchUploadRequest = Body(
+        ...,
+        example={
+            "SN": "SFRXC12515GF00001",
+            "filename": "SFRXC12515GF00001_20250413_140000.mp4",
+            "count": 10,
+            "interval_seconds": 60,
+        },
+    ),
+    db: Session = Depends(get_db),
+):
+    try:
+        uploads = s3_service.generate_presigned_upload_urls(
+            db, req.SN, req.filename, req.count, folder="stream",
+            interval_seconds=req.interval_seconds
+        )
+        return {"uploads": uploads}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @cam_router.post(
     "/opencv/upload-url",
     response_model=UploadResponse,
@@ -120,19 +166,22 @@ def get_video_url(
     "/videos/date",
     response_model=VideoListResponse,
     summary="특정 날짜의 영상 목록 및 URL 발급",
-    description="디바이스의 SN, 사용자 ID, 날짜를 기준으로 해당 날짜의 모든 영상 목록과 재생 URL을 발급합니다.",
+    description="디바이스의 SN, 사용자 ID, 날짜를 기준으로 해당 날짜의 영상 목록과 재생 URL을 발급합니다. "
+                "limit을 지정하면 페이지 단위로 반환하며, 응답의 next_cursor를 cursor로 넘기면 다음 페이지를 조회합니다.",
 )
 def list_videos_by_date(
+    background_tasks: BackgroundTasks,
     sn: str = Query(..., description="디바이스의 시리얼 넘버", example="SFRXC12515GF00001"),
     firebase_uid: str = Query(..., description="사용자의 Firebase UID", example="uid123456"),
     date: str = Query(..., description="영상 날짜 (YYYYMMDD 또는 YYYY-MM-DD)", example="20250508"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="페이지 크기 (생략 시 전체)"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
     db: Session = Depends(get_db),
 ):
     try:
-        videos = s3_service.list_videos_by_date(
-            db, sn, firebase_uid, date
+        return s3_service.list_videos_by_date(
+            db, sn, firebase_uid, date, limit=limit, cursor=cursor, background_tasks=background_tasks
         )
-        return {"videos": videos}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except FileNotFoundError as e:
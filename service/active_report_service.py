@@ -3,15 +3,17 @@
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 from repository.active_report_repository import ActiveReportRepository
+from repository.active_rollup_repository import ActiveRollupRepository
 import pandas as pd
 
 
 class ActiveReportService:
     def __init__(self):
         self.repository = ActiveReportRepository()
+        self.rollup_repository = ActiveRollupRepository()
 
     def save_activity_data(self, db: Session, activity_df: pd.DataFrame) -> int:
-        """활동량 데이터를 저장"""
+        """활동량 데이터를 저장하고 변경된 시간/일 단위 집계 갱신"""
         if activity_df.empty:
             return 0
 
@@ -27,6 +29,11 @@ class ActiveReportService:
                 )
                 count += 1
 
+            # 저장한 분 단위 행이 속한 (장치, 날짜)별 시간 버킷만 다시 집계
+            self.rollup_repository.refresh_touched(
+                db, zip(activity_df["SN"], activity_df["DATE"], activity_df["TIME"])
+            )
+
             db.commit()
             return count
         except Exception as e:
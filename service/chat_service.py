@@ -1,14 +1,21 @@
 # /service/chat_service.py
 
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator
 from repository.chat_repository import ChatRepository
+import asyncio
+import json
 import sys
 import os
 
 # llm_api 모듈 추가
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from llm_api.rag_qa_prompt import handle_query as rag_handle_query
+from llm_api.rag_qa_prompt import ahandle_query as rag_ahandle_query
+from llm_api.rag_qa_prompt import handle_query_stream as rag_handle_query_stream
+from llm_api.rag_qa_prompt import handle_queries_batch as rag_handle_queries_batch
+
+RAG_ERROR_MESSAGE = "죄송합니다. 현재 시스템에 문제가 발생했습니다. 잠시 후 다시 시도해주세요."
 
 
 class ChatService:
@@ -24,12 +31,69 @@ class ChatService:
             answer = rag_handle_query(question, pet_id, firebase_uid, db)
         except Exception as e:
             print(f"RAG 시스템 오류: {e}")
-            answer = "죄송합니다. 현재 시스템에 문제가 발생했습니다. 잠시 후 다시 시도해주세요."
+            answer = RAG_ERROR_MESSAGE
 
         # Create chat in repository
         chat = self.repository.create(db, firebase_uid, question, answer)
         return self._chat_to_dict(chat)
 
+    async def acreate_chat(self, db: Session, firebase_uid: str, pet_id: str, question: str) -> Dict[str, Any]:
+        """
+        create_chat의 비동기 버전 (OpenAI 호출 동안 스레드풀 워커를 점유하지 않음)
+        """
+        try:
+            answer = await rag_ahandle_query(question, pet_id, firebase_uid, db)
+        except Exception as e:
+            print(f"RAG 시스템 오류: {e}")
+            answer = RAG_ERROR_MESSAGE
+
+        chat = await asyncio.to_thread(self.repository.create, db, firebase_uid, question, answer)
+        return self._chat_to_dict(chat)
+
+    async def create_chats_batch(self, db: Session, firebase_uid: str, pet_id: str,
+                                 questions: List[str], save: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        여러 질문에 대한 답변을 한 번에 생성 (save=True이면 채팅으로 저장)
+        """
+        try:
+            answers = await rag_handle_queries_batch(questions, pet_id, firebase_uid, db)
+        except Exception as e:
+            print(f"RAG 시스템 오류: {e}")
+            answers = [RAG_ERROR_MESSAGE] * len(questions)
+
+        if not save:
+            return {"messages": [
+                {"id": None, "question": question, "answer": answer, "created_at": None}
+                for question, answer in zip(questions, answers)
+            ]}
+
+        chats = await asyncio.to_thread(
+            self.repository.create_many, db, firebase_uid, list(zip(questions, answers))
+        )
+        return {"messages": [self._chat_to_dict(chat) for chat in chats]}
+
+    async def stream_chat(self, db: Session, firebase_uid: str, pet_id: str, question: str) -> AsyncIterator[str]:
+        """
+        답변을 SSE(server-sent events) 형식으로 스트리밍하고, 완료되면 채팅을 저장
+
+        Events:
+            token: 답변 조각 {"content": str}
+            done: 저장된 채팅 {"id", "question", "answer", "created_at"}
+        """
+        chunks = []
+        try:
+            async for chunk in rag_handle_query_stream(question, pet_id, firebase_uid, db):
+                chunks.append(chunk)
+                yield self._sse_event("token", {"content": chunk})
+        except Exception as e:
+            print(f"RAG 시스템 오류: {e}")
+            chunks = [RAG_ERROR_MESSAGE]
+            yield self._sse_event("token", {"content": RAG_ERROR_MESSAGE})
+
+        answer = "".join(chunks).strip()
+        chat = await asyncio.to_thread(self.repository.create, db, firebase_uid, question, answer)
+        yield self._sse_event("done", self._chat_to_dict(chat))
+
     def get_chats_by_user_and_pet(self, db: Session, firebase_uid: str, pet_id: str) -> Dict[str, List[Dict[str, Any]]]:
         """
         Get all chats for a specific user (pet_id는 현재 사용하지 않지만 향후 확장 가능)
@@ -41,6 +105,9 @@ class ChatService:
         messages = [self._chat_to_dict(chat) for chat in chats]
         return {"messages": messages}
 
+    def _sse_event(self, event: str, data: Dict[str, Any]) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
     def _chat_to_dict(self, chat) -> Dict[str, Any]:
         return {
             "id": chat.id,
@@ -3,13 +3,20 @@
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 from repository.device_repository import DeviceRepository
+from repository.serial_counter_repository import SerialCounterRepository
+from service.s3_service import invalidate_device_cache
 import uuid
 from datetime import datetime
 
+# SN 순번 자릿수 (prefix당 최대 발급 개수)
+SERIAL_SEQ_DIGITS = 5
+SERIAL_SEQ_MAX = 10 ** SERIAL_SEQ_DIGITS - 1
+
 
 class DeviceService:
     def __init__(self):
         self.repository = DeviceRepository()
+        self.serial_counter_repository = SerialCounterRepository()
 
     def create_device(self, db: Session, SN: str, UID: Optional[str] = None,
                       IP: Optional[str] = None, rtsp_url: Optional[str] = None) -> Dict[str, Any]:
@@ -44,9 +51,47 @@ class DeviceService:
         return [self._device_to_dict(device) for device in devices]
 
     def generate_and_register_sn(self, db: Session, ip: str) -> str:
-        if not ip:
+        return self.register_devices_bulk(db, [ip])[0]["serial_number"]
+
+    def register_devices_bulk(self, db: Session, ips: List[str]) -> List[Dict[str, str]]:
+        """
+        IP 목록에 대해 SN을 발급하고 장치를 한 트랜잭션으로 등록 (공장 일괄 등록용)
+
+        Returns:
+            List[Dict[str, str]]: 요청 순서대로 {"ip", "serial_number"}
+        """
+        if not ips or any(not ip for ip in ips):
             raise ValueError("IP is required")
 
+        base_prefix = self._serial_prefix()
+
+        try:
+            # 카운터 행 하나를 UPDATE ... RETURNING으로 증가시켜 순번 구간을 한 번에 확보
+            first_seq = self.serial_counter_repository.allocate(db, base_prefix, len(ips))
+            if first_seq + len(ips) - 1 > SERIAL_SEQ_MAX:
+                raise ValueError(f"Serial numbers exhausted for prefix {base_prefix}")
+
+            rows = []
+            for offset, ip in enumerate(ips):
+                rows.append({
+                    "device_id": str(uuid.uuid4()),
+                    "SN": f"{base_prefix}{str(first_seq + offset).zfill(SERIAL_SEQ_DIGITS)}",
+                    "UID": None,
+                    "IP": ip,
+                    # rtsp_url 구성
+                    "rtsp_url": f"rtsp://{ip}:8554/stream"
+                })
+
+            # DB 저장
+            self.repository.create_many(db, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        return [{"ip": row["IP"], "serial_number": row["SN"]} for row in rows]
+
+    def _serial_prefix(self) -> str:
         # 시리얼 넘버 구성 요소
         manufacturer = "SF"
         model = "RXC1"
@@ -54,25 +99,7 @@ class DeviceService:
         year = str(now.year % 100).zfill(2)
         week = str(now.isocalendar()[1]).zfill(2)  # Compatible with Python 3.8+ (isocalendar returns a tuple)
         factory = "GF"
-
-        # SN prefix 기반 개수 → 시퀀스 생성
-        base_prefix = f"{manufacturer}{model}{year}{week}{factory}"
-        existing_count = self.repository.count_serial_prefix(db, base_prefix)
-        seq_num = str(existing_count + 1).zfill(5)
-        final_sn = f"{base_prefix}{seq_num}"
-
-        # rtsp_url 구성
-        rtsp_url = f"rtsp://{ip}:8554/stream"
-
-        # DB 저장
-        device_data = {
-            "device_id": str(uuid.uuid4()),
-            "SN": final_sn,
-            "IP": ip,
-            "rtsp_url": rtsp_url
-        }
-        device = self.repository.create_device(db, device_data)
-        return final_sn
+        return f"{manufacturer}{model}{year}{week}{factory}"
 
     def get_device(self, db: Session, device_id: str) -> Optional[Dict[str, Any]]:
         device = self.repository.get_by_id(db, device_id)
@@ -91,19 +118,30 @@ class DeviceService:
         return [self._device_to_dict(device) for device in devices]
 
     def update_device(self, db: Session, device_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        previous = self.repository.get_by_id(db, device_id)
+        previous_sn = previous.SN if previous else None
         device = self.repository.update(db, device_id, **data)
         if not device:
             return None
+        invalidate_device_cache(previous_sn)
+        invalidate_device_cache(device.SN)
         return self._device_to_dict(device)
 
     def update_sn(self, db: Session, sn: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         device = self.repository.update_by_sn(db, sn, data)
         if not device:
             return None
+        invalidate_device_cache(sn)
+        invalidate_device_cache(device.SN)
         return self._device_to_dict(device)
 
     def delete_device(self, db: Session, device_id: str) -> bool:
-        return self.repository.delete(db, device_id)
+        device = self.repository.get_by_id(db, device_id)
+        sn = device.SN if device else None
+        deleted = self.repository.delete(db, device_id)
+        if deleted:
+            invalidate_device_cache(sn)
+        return deleted
 
     def _device_to_dict(self, device) -> Dict[str, Any]:
         return {
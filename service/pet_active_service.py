@@ -4,11 +4,14 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text, func
 from typing import Dict, Any, Optional, List
 from repository.pet_active_repository import PetActiveRepository
+from repository.active_rollup_repository import ActiveRollupRepository
+from service.pet_device_service import PetDeviceService
 from datetime import datetime, date, timedelta
 import logging
 from pytz import timezone
 from db.s3_utils import generate_presigned_url  # S3 유틸 가져오기
 from collections import Counter
+from util.profiling import profiled
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
@@ -20,7 +23,10 @@ KST = timezone('Asia/Seoul')
 class PetActiveService:
     def __init__(self):
         self.repository = PetActiveRepository()
+        self.rollup_repository = ActiveRollupRepository()
+        self.pet_device_service = PetDeviceService()
 
+    @profiled("get_pet_active")
     def get_pet_active(self, db: Session, firebase_uid: str, pet_id: str, query_date: Optional[date] = None) -> Dict[
         str, Any]:
         """
@@ -42,9 +48,13 @@ class PetActiveService:
         # 조회 날짜 문자열 변환 (YYYYMMDD 형식)
         date_str = query_date.strftime("%Y%m%d")
 
-        # 기본 디바이스 시리얼 번호 설정 (실제로는 pet_id에 연결된 디바이스를 조회해야 함)
+        # 반려동물에 연결된 디바이스 시리얼 번호 조회
         device_serial = self._get_device_for_pet(db, pet_id)
 
+        # 연결된 장치가 없으면 다른 장치의 데이터를 보여주지 않고 빈 결과 반환
+        if device_serial is None:
+            return self._empty_pet_active(pet_id)
+
         # 하이라이트 영상 URL 조회 (상위 5개)
         highlight_urls = self._get_highlight_videos_url(db, device_serial, date_str)
 
@@ -87,7 +97,23 @@ class PetActiveService:
 
         return result
 
-    def _get_device_for_pet(self, db: Session, pet_id: str) -> str:
+    def _empty_pet_active(self, pet_id: str) -> Dict[str, Any]:
+        """장치가 연결되지 않은 반려동물의 활동 정보 (데이터 없음)"""
+        most_active_hour = self._calculate_most_active_hour([])
+        return {
+            "pet_id": pet_id,
+            "abnormalBehavior": "없음",
+            "highlightVideoUrl": [""] * 5,
+            "mostActive": {
+                "start": most_active_hour,
+                "end": most_active_hour + 1
+            },
+            "heatmapImageUrl": None,
+            "timeOfActivity": [],
+            "recentDatOfActivity": []
+        }
+
+    def _get_device_for_pet(self, db: Session, pet_id: str) -> Optional[str]:
         """
         반려동물에 연결된 디바이스 시리얼 번호 조회
 
@@ -96,11 +122,9 @@ class PetActiveService:
             pet_id: 반려동물 ID
 
         Returns:
-            str: 디바이스 시리얼 번호
+            Optional[str]: 디바이스 시리얼 번호 (연결된 장치와 기본 장치가 모두 없으면 None)
         """
-        # 실제로는 pet_id와 디바이스 간의 연결 정보를 조회해야 함
-        # 여기서는 기본값 반환
-        return "SFRXC12515GF00001"
+        return self.pet_device_service.resolve_sn(db, pet_id)
 
     def _calculate_most_active_hour(self, time_activity: List[Dict[str, Any]]) -> int:
         """
@@ -319,46 +343,21 @@ class PetActiveService:
             List[Dict[str, Any]]: 시간별 활동량 데이터
         """
         try:
-            # 해당 날짜의 활동량 데이터 조회
-            query = text("""
-                         SELECT "TIME", active
-                         FROM capstone.active_reports
-                         WHERE "SN" = :sn
-                           AND "DATE" = :date
-                         ORDER BY "TIME"
-                         """)
+            # 해당 날짜의 시간별 집계 조회 (1분 단위 원본 대신 최대 24행)
+            rollups = self.rollup_repository.get_hourly(db, device_serial, date_str)
 
-            results = db.execute(query, {"sn": device_serial, "date": date_str}).fetchall()
-
-            if not results:
+            if not rollups:
                 # 데이터가 없으면 빈 배열 반환
                 logger.warning(f"활동량 데이터가 없습니다: {device_serial}, {date_str}")
                 return []
 
-            # 시간별 활동량 데이터 구성
-            hourly_data = {}
-
-            for time_str, active in results:
-                # TIME 형식: HHMMSS에서 시간 추출
-                hour = int(time_str[:2])
-
-                if hour not in hourly_data:
-                    hourly_data[hour] = {"total": 0, "count": 0}
-
-                hourly_data[hour]["total"] += float(active)
-                hourly_data[hour]["count"] += 1
-
             # 시간별 평균 활동량 계산
             result = []
-            for hour in range(24):  # 0~23시
-                if hour in hourly_data:
-                    total = hourly_data[hour]["total"]
-                    count = hourly_data[hour]["count"]
-                    avg_value = round(total / count, 2) if count > 0 else 0
-
+            for rollup in rollups:
+                if rollup.active_count > 0:
                     result.append({
-                        "hour": hour,
-                        "value": avg_value
+                        "hour": rollup.HOUR,
+                        "value": round(rollup.active_sum / rollup.active_count, 2)
                     })
 
             # 데이터가 없는 경우 빈 배열 반환
@@ -389,16 +388,8 @@ class PetActiveService:
             dates = [(query_date - timedelta(days=i)) for i in range(7)]
             date_strs = [d.strftime("%Y%m%d") for d in dates]
 
-            # 지정된 날짜들의 활동량 데이터 조회
-            query = text("""
-                         SELECT "DATE", active
-                         FROM capstone.active_reports
-                         WHERE "SN" = :sn
-                           AND "DATE" IN :dates
-                         ORDER BY "DATE", "TIME"
-                         """)
-
-            results = db.execute(query, {"sn": device_serial, "dates": tuple(date_strs)}).fetchall()
+            # 지정된 날짜들의 일별 집계 조회 (1분 단위 원본 대신 최대 7행)
+            rollups = self.rollup_repository.get_daily(db, device_serial, date_strs)
 
             # 일별 데이터 구성
             daily_data = {}
@@ -409,10 +400,10 @@ class PetActiveService:
                 daily_data[date_str] = {"day": day_str, "total": 0, "count": 0}
 
             # 데이터 처리
-            for date_str, active in results:
-                if date_str in daily_data:
-                    daily_data[date_str]["total"] += float(active)
-                    daily_data[date_str]["count"] += 1
+            for rollup in rollups:
+                if rollup.DATE in daily_data:
+                    daily_data[rollup.DATE]["total"] += float(rollup.active_sum)
+                    daily_data[rollup.DATE]["count"] += rollup.active_count
 
             # 일별 평균 활동량 계산
             result = []
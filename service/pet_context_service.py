@@ -0,0 +1,65 @@
+# /service/pet_context_service.py
+
+from sqlalchemy.orm import Session
+from typing import Dict, Any, Optional
+from cachetools import TTLCache
+from repository.pet_repository import PetRepository
+import threading
+import os
+
+# 반려동물 컨텍스트 스냅샷 캐시 (프로필 + 최신 건강 기록)
+# 쓰기 시 같은 프로세스의 캐시는 즉시 무효화되고, 다른 워커는 TTL 이후 갱신됨
+PET_CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("PET_CONTEXT_CACHE_TTL_SECONDS", "60"))
+PET_CONTEXT_CACHE_MAXSIZE = 10000
+
+_snapshot_cache = TTLCache(maxsize=PET_CONTEXT_CACHE_MAXSIZE, ttl=PET_CONTEXT_CACHE_TTL_SECONDS)
+_cache_lock = threading.Lock()
+
+
+class PetContextService:
+    def __init__(self):
+        self.repository = PetRepository()
+
+    def get_snapshot(self, db: Session, pet_id: str) -> Optional[Dict[str, Any]]:
+        """
+        반려동물 프로필과 최신 건강 기록 스냅샷 조회 (캐시 우선)
+
+        Returns:
+            Optional[Dict[str, Any]]: {"firebase_uid", "pet", "latest_health"} 또는 반려동물이 없으면 None
+        """
+        with _cache_lock:
+            snapshot = _snapshot_cache.get(pet_id)
+        if snapshot is not None:
+            return snapshot
+
+        row = self.repository.get_with_latest_health(db, pet_id)
+        if row is None:
+            return None
+
+        pet, latest_health = row
+        snapshot = {
+            "firebase_uid": pet.firebase_uid,
+            "pet": {
+                "pet_id": pet.pet_id,
+                "name": pet.name,
+                "gender": pet.gender,
+                "species": pet.species,
+                "birthdate": pet.birthdate.isoformat() if pet.birthdate else None
+            },
+            "latest_health": {
+                "date": latest_health.date.isoformat() if latest_health.date else None,
+                "weight": latest_health.weight,
+                "memo": latest_health.memo,
+                "shedding_status": latest_health.shedding_status
+            } if latest_health else None
+        }
+
+        with _cache_lock:
+            _snapshot_cache[pet_id] = snapshot
+        return snapshot
+
+    @staticmethod
+    def invalidate(pet_id: str):
+        """반려동물 또는 건강 기록이 변경되면 호출"""
+        with _cache_lock:
+            _snapshot_cache.pop(pet_id, None)
@@ -0,0 +1,100 @@
+# /service/pet_device_service.py
+
+from sqlalchemy.orm import Session
+from typing import Dict, Any, List, Optional
+from cachetools import TTLCache
+from repository.pet_device_repository import PetDeviceRepository
+from repository.device_repository import DeviceRepository
+import threading
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# 반려동물 → 장치 SN 매핑 캐시 (대시보드/상태 조회마다 DB를 조회하지 않도록)
+# 연결 변경 시 같은 프로세스의 캐시는 즉시 무효화되고, 다른 워커는 TTL 이후 갱신됨
+PET_DEVICE_CACHE_TTL_SECONDS = int(os.getenv("PET_DEVICE_CACHE_TTL_SECONDS", "300"))
+PET_DEVICE_CACHE_MAXSIZE = 10000
+# 연결된 장치가 없는 반려동물에 사용할 기본 장치 (개발/시연용, 기본값은 사용하지 않음)
+# 설정하면 연결되지 않은 모든 반려동물이 이 장치의 데이터를 보게 되므로 운영 환경에서는 비워 둠
+DEFAULT_DEVICE_SN = os.getenv("DEFAULT_DEVICE_SN") or None
+
+_sn_cache = TTLCache(maxsize=PET_DEVICE_CACHE_MAXSIZE, ttl=PET_DEVICE_CACHE_TTL_SECONDS)
+_cache_lock = threading.Lock()
+# 연결 없음도 캐시하기 위한 표시값
+_NO_DEVICE = ""
+
+
+class PetDeviceService:
+    def __init__(self):
+        self.repository = PetDeviceRepository()
+        self.device_repository = DeviceRepository()
+
+    def resolve_sn(self, db: Session, pet_id: str) -> Optional[str]:
+        """
+        반려동물에 연결된 장치 SN 조회 (캐시 우선)
+        연결된 장치가 없으면 DEFAULT_DEVICE_SN 반환 (설정하지 않았으면 None)
+        """
+        with _cache_lock:
+            sn = _sn_cache.get(pet_id)
+
+        if sn is None:
+            link = self.repository.get_by_pet(db, pet_id)
+            sn = link.SN if link else _NO_DEVICE
+            with _cache_lock:
+                _sn_cache[pet_id] = sn
+
+        if sn == _NO_DEVICE:
+            return DEFAULT_DEVICE_SN
+        return sn
+
+    def get_active_sns(self, db: Session) -> List[str]:
+        """분석 작업 대상 장치 SN 목록 (연결된 장치 + 기본 장치)"""
+        sns = self.repository.get_all_sns(db)
+        if DEFAULT_DEVICE_SN and DEFAULT_DEVICE_SN not in sns:
+            sns.append(DEFAULT_DEVICE_SN)
+        return sns
+
+    def link_device(self, db: Session, pet_id: str, SN: str, firebase_uid: str) -> Optional[Dict[str, Any]]:
+        """
+        반려동물에 장치 연결 (기존 연결은 교체)
+        반려동물과 장치의 소유자 확인은 호출자가 먼저 수행 (is_device_owner)
+
+        Returns:
+            Optional[Dict[str, Any]]: 연결 정보, 장치가 없거나 사용자의 장치가 아니면 None
+        """
+        if not self.is_device_owner(db, SN, firebase_uid):
+            return None
+
+        link = self.repository.upsert(db, pet_id, SN)
+        self.invalidate(pet_id)
+        return self._link_to_dict(link)
+
+    def is_device_owner(self, db: Session, SN: str, firebase_uid: str) -> bool:
+        """장치가 존재하고 사용자에게 등록된 장치(UID 일치)인지 확인"""
+        device = self.device_repository.get_device_by_sn(db, SN)
+        return device is not None and device.UID == firebase_uid
+
+    def unlink_device(self, db: Session, pet_id: str) -> bool:
+        deleted = self.repository.delete(db, pet_id)
+        self.invalidate(pet_id)
+        return deleted
+
+    def get_link(self, db: Session, pet_id: str) -> Optional[Dict[str, Any]]:
+        link = self.repository.get_by_pet(db, pet_id)
+        if not link:
+            return None
+        return self._link_to_dict(link)
+
+    @staticmethod
+    def invalidate(pet_id: str):
+        """반려동물의 장치 연결이 변경되면 호출"""
+        with _cache_lock:
+            _sn_cache.pop(pet_id, None)
+
+    def _link_to_dict(self, link) -> Dict[str, Any]:
+        return {
+            "pet_id": link.pet_id,
+            "SN": link.SN,
+            "created_at": link.created_at
+        }
@@ -5,6 +5,7 @@ from sqlalchemy import func, extract
 from typing import List, Dict, Any, Optional
 from repository.pet_health_repository import PetHealthRepository
 from repository.entity.pet_health_entity import PetHealth
+from service.pet_context_service import PetContextService
 from datetime import date, datetime
 import calendar
 
@@ -18,6 +19,7 @@ class PetHealthService:
                           shedding_status: Optional[str] = None) -> Dict[str, Any]:
         pet_health = self.repository.create(db, firebase_uid, pet_id, health_date,
                                             weight, memo, shedding_status)
+        PetContextService.invalidate(pet_id)
         return self._pet_health_to_dict(pet_health)
 
     def get_pet_health(self, db: Session, firebase_uid: str, pet_id: str,
@@ -57,10 +59,14 @@ class PetHealthService:
         pet_health = self.repository.update(db, firebase_uid, pet_id, health_date, **data)
         if not pet_health:
             return None
+        PetContextService.invalidate(pet_id)
         return self._pet_health_to_dict(pet_health)
 
     def delete_pet_health(self, db: Session, firebase_uid: str, pet_id: str, health_date: date) -> bool:
-        return self.repository.delete(db, firebase_uid, pet_id, health_date)
+        deleted = self.repository.delete(db, firebase_uid, pet_id, health_date)
+        if deleted:
+            PetContextService.invalidate(pet_id)
+        return deleted
 
     def _pet_health_to_dict(self, pet_health) -> Dict[str, Any]:
         return {
@@ -3,6 +3,8 @@
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 from repository.pet_repository import PetRepository
+from service.pet_context_service import PetContextService
+from service.pet_device_service import PetDeviceService
 import uuid
 from datetime import date
 
@@ -25,6 +27,13 @@ class PetService:
             return None
         return self._pet_to_dict(pet)
 
+    def get_user_pet(self, db: Session, firebase_uid: str, pet_id: str) -> Optional[Dict[str, Any]]:
+        """현재 사용자의 반려동물만 조회 (다른 사용자의 반려동물이면 None)"""
+        pet = self.repository.get_by_user_and_id(db, firebase_uid, pet_id)
+        if not pet:
+            return None
+        return self._pet_to_dict(pet)
+
     def get_pets_by_user(self, db: Session, firebase_uid: str) -> List[Dict[str, Any]]:
         pets = self.repository.get_by_user(db, firebase_uid)
         return [self._pet_to_dict(pet) for pet in pets]
@@ -34,10 +43,15 @@ class PetService:
         pet = self.repository.update(db, firebase_uid, pet_id, **data)
         if not pet:
             return None
+        PetContextService.invalidate(pet_id)
         return self._pet_to_dict(pet)
 
     def delete_pet(self, db: Session, pet_id: str) -> bool:
-        return self.repository.delete(db, pet_id)
+        deleted = self.repository.delete(db, pet_id)
+        if deleted:
+            PetContextService.invalidate(pet_id)
+            PetDeviceService.invalidate(pet_id)
+        return deleted
 
     def _pet_to_dict(self, pet) -> Dict[str, Any]:
         return {
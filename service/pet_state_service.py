@@ -1,19 +1,40 @@
 # /service/pet_state_service.py
 
 from sqlalchemy.orm import Session
-from sqlalchemy import text
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Tuple, AsyncGenerator
+import asyncio
+import json
 import logging
 from datetime import datetime
+from pytz import timezone
+from repository.device_state_repository import DeviceStateRepository
+from repository.pet_repository import PetRepository
+from service.pet_device_service import PetDeviceService
+from util.pet_state_broker import pet_state_broker, state_event
+from util.hiding_detector import RECENT_HIDING_FRAMES_QUERY, hiding_frame_flags
 
 logger = logging.getLogger(__name__)
 
+KST = timezone('Asia/Seoul')
+
+# 최근 몇 개 프레임으로 현재 은신 여부를 판단할지
+STATE_WINDOW_FRAMES = 5
+# 윈도우 안에서 박스 없음 / 저신뢰 프레임이 이 개수 이상이면 은신
+STATE_MIN_HIDDEN_FRAMES = 2
+# 상태 스트림에 이벤트가 없을 때 연결 유지용 주석을 보내는 간격(초)
+STATE_STREAM_HEARTBEAT_SECONDS = 15
+
 
 class PetStateService:
+    def __init__(self):
+        self.repository = DeviceStateRepository()
+        self.pet_device_service = PetDeviceService()
+        self.pet_repository = PetRepository()
+
     def get_pet_state(self, db: Session, pet_id: str, firebase_uid: str) -> Dict[str, Any]:
         """
-        반려동물의 현재 상태 정보 조회 (간소화된 버전)
-        - 은신 여부만 판단 (최근 5개 데이터만 사용)
+        반려동물의 현재 상태 정보 조회
+        - 1분 주기 작업에서 미리 계산해 둔 장치 상태를 반환 (yolo_results는 조회하지 않음)
 
         Args:
             db: 데이터베이스 세션
@@ -21,90 +42,131 @@ class PetStateService:
             firebase_uid: 사용자 Firebase UID
 
         Returns:
-            Dict[str, Any]: 반려동물 상태 정보 (pet_id, is_hiding)
+            Dict[str, Any]: 반려동물 상태 정보 (pet_id, is_hiding, updated_at, last_frame_timestamp)
         """
         # 기기 정보 조회 (pet_id로 기기의 SN 가져오기)
-        device_sn = self._get_device_sn_for_pet(db, pet_id)
-        if not device_sn:
-            device_sn = "SFRXC12515GF00001"  # 기본값 설정
-            logger.warning(f"No device found for pet {pet_id}, using default: {device_sn}")
+        device_sn = self.pet_device_service.resolve_sn(db, pet_id)
+        state = self.repository.get_by_sn(db, device_sn) if device_sn else None
 
-        # 은신 상태 판단 (최근 5개 데이터만 사용)
-        is_hiding = self._analyze_hiding_behavior(db, device_sn)
-
-        # 결과 구성 (간소화)
+        # 아직 계산된 상태가 없으면 은신 아님으로 응답
         return {
             "pet_id": pet_id,
-            "is_hiding": is_hiding
+            "is_hiding": state.is_hiding if state else False,
+            "updated_at": state.updated_at if state else None,
+            "last_frame_timestamp": state.last_frame_timestamp if state else None
         }
 
-    def _get_device_sn_for_pet(self, db: Session, pet_id: str) -> Optional[str]:
-        """펫 ID에 해당하는 기기 SN 조회"""
-        try:
-            # 여기서는 간단하게 하드코딩된 값을 반환
-            # 실제로는 DB에서 pet과 device 간의 관계를 조회해야 함
-            return "SFRXC12515GF00001"
-        except Exception as e:
-            logger.error(f"Error getting device SN for pet {pet_id}: {e}")
-            return None
-
-    def _analyze_hiding_behavior(self, db: Session, device_sn: str) -> bool:
+    def refresh_device_state(self, db: Session, device_sn: str) -> Dict[str, Any]:
         """
-        은신 행동 분석 (간소화된 버전)
-        - 최근 5개 YOLO 데이터만 분석하여 은신 여부 판단
+        장치의 최근 프레임으로 은신 여부를 다시 계산하여 저장 (1분 주기 작업에서 호출)
 
         Returns:
-            bool: 은신 여부
+            Dict[str, Any]: 저장된 상태 (SN, is_hiding, updated_at, last_frame_timestamp, changed)
         """
+        previous = self.repository.get_by_sn(db, device_sn)
+        was_hiding = previous.is_hiding if previous else None
+
+        is_hiding, last_frame_timestamp = self._analyze_hiding_behavior(db, device_sn)
+        state = self.repository.upsert(
+            db, device_sn, is_hiding, last_frame_timestamp, datetime.now(KST)
+        )
+        return {
+            "SN": state.SN,
+            "is_hiding": state.is_hiding,
+            "updated_at": state.updated_at,
+            "last_frame_timestamp": state.last_frame_timestamp,
+            "changed": was_hiding != state.is_hiding
+        }
+
+    def get_device_states(self, db: Session, device_sns: List[str]) -> Dict[str, Dict[str, Any]]:
+        """장치별 현재 상태 (계산된 상태가 없는 장치는 제외)"""
+        states = self.repository.get_by_sns(db, device_sns)
+        return {
+            state.SN: {
+                "SN": state.SN,
+                "is_hiding": state.is_hiding,
+                "updated_at": state.updated_at,
+                "last_frame_timestamp": state.last_frame_timestamp
+            }
+            for state in states
+        }
+
+    def get_user_pet_snapshot(self, db: Session, firebase_uid: str) -> Tuple[Dict[str, List[str]], List[Dict[str, Any]]]:
+        """
+        사용자의 반려동물별 장치와 현재 상태 조회 (상태 스트림 시작 시 사용)
+
+        Returns:
+            (sn_to_pets, snapshot): 장치 SN별 반려동물 ID 목록, 반려동물별 현재 상태 목록
+        """
+        sn_to_pets: Dict[str, List[str]] = {}
+        for pet in self.pet_repository.get_by_user(db, firebase_uid):
+            device_sn = self.pet_device_service.resolve_sn(db, pet.pet_id)
+            if device_sn:
+                sn_to_pets.setdefault(device_sn, []).append(pet.pet_id)
+
+        states = self.get_device_states(db, list(sn_to_pets))
+        snapshot = []
+        for device_sn, pet_ids in sn_to_pets.items():
+            state = states.get(device_sn)
+            for pet_id in pet_ids:
+                snapshot.append({
+                    "pet_id": pet_id,
+                    "is_hiding": state["is_hiding"] if state else False,
+                    "updated_at": state["updated_at"].isoformat() if state and state["updated_at"] else None,
+                    "last_frame_timestamp": state["last_frame_timestamp"] if state else None
+                })
+        return sn_to_pets, snapshot
+
+    async def stream_pet_states(self, sn_to_pets: Dict[str, List[str]],
+                                snapshot: List[Dict[str, Any]]) -> AsyncGenerator[str, None]:
+        """
+        반려동물 상태 변경을 server-sent events로 전달
+        - 처음에 현재 상태를 `state` 이벤트로 보내고
+        - 이후 1분 주기 작업이 발행하는 은신 상태 변경(`state`)과 최신 활동량(`activity`)을 반려동물별로 전달
+        """
+        queue = pet_state_broker.subscribe(sn_to_pets.keys())
         try:
-            # 최근 5개 YOLO 결과 조회
-            query = text(f"""
-                SELECT yolo_result 
-                FROM capstone.yolo_results 
-                WHERE device = :device_sn
-                ORDER BY yolo_result->>'timestamp' DESC
-                LIMIT 5
-            """)
-
-            # 쿼리 실행
-            results = db.execute(query, {"device_sn": device_sn})
-
-            # 결과 변환
-            data = [row[0] for row in results]
-
-            # 데이터가 없으면 은신 아님으로 판단
-            if not data:
-                return False
-
-            # 은신 판단 기준
-            # 1. 5개 중 2개 이상 박스가 없으면 은신으로 판단
-            # 2. 키포인트 신뢰도가 낮은 경우 (6개 이상 저신뢰도) 은신으로 판단
-            no_box_count = 0
-            low_keypoint_frames = 0
-
-            for yolo_data in data:
-                boxes = yolo_data.get("boxes", [])
-
-                # 박스 없음 체크
-                if not boxes:
-                    no_box_count += 1
+            for state in snapshot:
+                yield self._sse_event("state", state)
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=STATE_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
                     continue
 
-                # 키포인트 신뢰도 체크
-                keypoints_list = yolo_data.get("keypoints", [[]])[0] if yolo_data.get("keypoints") else []
+                data = {key: value for key, value in event.items() if key not in ("type", "SN", "key")}
+                for pet_id in sn_to_pets.get(event["SN"], []):
+                    yield self._sse_event(event["type"], {"pet_id": pet_id, **data})
+        finally:
+            pet_state_broker.unsubscribe(queue, sn_to_pets.keys())
 
-                if keypoints_list:
-                    low_conf_kpts = [
-                        kp for kp in keypoints_list
-                        if kp.get("conf", 0) <= 0.3
-                    ]
+    def publish_device_state(self, db: Session, state: Dict[str, Any]):
+        """refresh_device_state 결과 중 은신 여부가 바뀐 경우 구독자에게 전달"""
+        if state.get("changed"):
+            pet_state_broker.publish(db, state_event(state))
+
+    def _analyze_hiding_behavior(self, db: Session, device_sn: str):
+        """
+        은신 행동 분석
+        - 최근 5개 프레임의 박스 개수와 키포인트 신뢰도만 조회하여 판단
+        - 5개 중 2개 이상 박스가 없거나, 2개 이상이 저신뢰 키포인트 6개 이상이면 은신
+
+        Returns:
+            (bool, Optional[str]): 은신 여부, 판단에 사용한 가장 최근 프레임 타임스탬프
+        """
+        rows = RECENT_HIDING_FRAMES_QUERY.execute(
+            db, {"device_serial": device_sn, "limit": STATE_WINDOW_FRAMES}
+        ).fetchall()
 
-                    if len(low_conf_kpts) >= 6:
-                        low_keypoint_frames += 1
+        # 데이터가 없으면 은신 아님으로 판단
+        if not rows:
+            return False, None
 
-            # 판단 결과 반환
-            return no_box_count >= 2 or low_keypoint_frames >= 2
+        no_box, low_conf_hidden = hiding_frame_flags([row[2] for row in rows], [row[3] for row in rows])
+        is_hiding = bool(no_box.sum() >= STATE_MIN_HIDDEN_FRAMES or low_conf_hidden.sum() >= STATE_MIN_HIDDEN_FRAMES)
+        return is_hiding, rows[0][0]
 
-        except Exception as e:
-            logger.error(f"Error analyzing hiding behavior for device {device_sn}: {e}")
-            return False
\ No newline at end of file
+    def _sse_event(self, event: str, data: Dict[str, Any]) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -1,17 +1,79 @@
 # /service/s3_service.py
 
 from db.s3_utils import s3_client, S3_BUCKET, REGION
-from datetime import datetime
+from db.database import SessionLocal
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
+import base64
+import bisect
+import logging
+import os
 import re
+import threading
 from typing import List, Dict, Any, Optional
 import boto3
+from fastapi import BackgroundTasks
 from botocore.exceptions import ClientError
+from cachetools import TTLCache
 
 from repository.device_repository import DeviceRepository
+from repository.video_object_repository import VideoObjectRepository
+
+logger = logging.getLogger(__name__)
 
 # Initialize repository
 device_repository = DeviceRepository()
+video_object_repository = VideoObjectRepository()
+
+# SN별 장치 정보 캐시 (카메라가 1분마다 업로드 URL을 요청할 때마다 DB를 조회하지 않도록)
+# 등록되지 않은 SN은 캐시하지 않으므로 새로 등록된 장치는 바로 사용 가능
+DEVICE_CACHE_TTL_SECONDS = int(os.getenv("S3_DEVICE_CACHE_TTL_SECONDS", "300"))
+DEVICE_CACHE_MAXSIZE = 10000
+_device_cache = TTLCache(maxsize=DEVICE_CACHE_MAXSIZE, ttl=DEVICE_CACHE_TTL_SECONDS)
+_device_cache_lock = threading.Lock()
+
+# 날짜별 영상 목록 캐시 ((sn, date) -> 전체 객체 목록)
+# 같은 워커에서 해당 날짜의 업로드 URL이 발급되면 즉시 무효화되고, 다른 워커는 TTL 이후 갱신됨
+VIDEO_LIST_CACHE_TTL_SECONDS = int(os.getenv("S3_VIDEO_LIST_CACHE_TTL_SECONDS", "30"))
+VIDEO_LIST_CACHE_MAXSIZE = 1000
+_video_list_cache = TTLCache(maxsize=VIDEO_LIST_CACHE_MAXSIZE, ttl=VIDEO_LIST_CACHE_TTL_SECONDS)
+_video_list_cache_lock = threading.Lock()
+
+# 영상 메타데이터 인덱스를 S3 확인 없이 믿는 시간 (지나면 HEAD로 재확인, S3에서 만료/삭제된 객체 제거)
+VIDEO_INDEX_TTL = timedelta(seconds=int(os.getenv("S3_VIDEO_INDEX_TTL_SECONDS", "3600")))
+# 목록 조회 한 번에 인덱스에 기록할 최대 객체 수 (최근 영상 우선)
+VIDEO_INDEX_MAX_KEYS = int(os.getenv("S3_VIDEO_INDEX_MAX_KEYS", "1500"))
+
+# 일괄 업로드 URL 발급 시 최대 파일 수
+MAX_UPLOAD_URL_BATCH = 60
+# 일괄 업로드 URL 만료 여유 (파일별 만료 = 첫 파일부터의 녹화 종료 시점 + 여유, 업로드 지연/시계 오차 대비)
+UPLOAD_URL_EXPIRY_SLACK_SECONDS = int(os.getenv("S3_UPLOAD_URL_EXPIRY_SLACK_SECONDS", "300"))
+FILENAME_TIMESTAMP_PATTERN = re.compile(r"^(?P<sn>.+)_(?P<date>\d{8})_(?P<time>\d{6})(?P<ext>\.\w+)$")
+
+
+def get_device_info(db: Session, sn: str) -> Optional[Dict[str, Any]]:
+    """SN으로 장치 정보 조회 (캐시 우선)"""
+    with _device_cache_lock:
+        info = _device_cache.get(sn)
+    if info is not None:
+        return info
+
+    device = device_repository.get_device_by_sn(db, sn)
+    if not device:
+        return None
+
+    info = {"SN": device.SN, "UID": device.UID}
+    with _device_cache_lock:
+        _device_cache[sn] = info
+    return info
+
+
+def invalidate_device_cache(sn: Optional[str]):
+    """장치 정보가 변경되거나 삭제되면 호출"""
+    if not sn:
+        return
+    with _device_cache_lock:
+        _device_cache.pop(sn, None)
 
 
 def extract_date_from_filename(filename: str) -> str:
@@ -40,17 +102,73 @@ def generate_presigned_upload_url(
         folder: str,
         expires_in: int = 300
 ) -> dict:
-    device = device_repository.get_device_by_sn(db, sn)
-    if not device:
+    if not get_device_info(db, sn):
         raise FileNotFoundError("Serial Number not found")
 
     if not filename.startswith(sn):
         raise ValueError("Filename does not match SN")
 
+    return _sign_upload_url(sn, filename, folder, expires_in)
+
+
+def generate_presigned_upload_urls(
+        db: Session,
+        sn: str,
+        filename: str,
+        count: int,
+        folder: str,
+        interval_seconds: int = 60,
+        expiry_slack_seconds: int = UPLOAD_URL_EXPIRY_SLACK_SECONDS
+) -> List[dict]:
+    """
+    첫 파일명부터 interval_seconds 간격으로 이어지는 다음 count개 파일의 업로드 URL 일괄 발급
+    예: SN_20250413_140000.mp4, count=3 -> 140000, 140100, 140200
+
+    i번째 파일은 첫 파일보다 interval_seconds * i초 뒤에 녹화를 시작해 interval_seconds 동안 녹화되므로
+    URL 만료도 파일마다 interval_seconds * (i + 1) + expiry_slack_seconds로 설정
+
+    Args:
+        db: Database session
+        sn: Device serial number
+        filename: 첫 번째 파일명 ({SN}_{YYYYMMDD}_{HHMMSS}.{ext})
+        count: 발급할 URL 개수
+        folder: S3 폴더 (stream, opencv)
+        interval_seconds: 파일 간 시간 간격 (초)
+        expiry_slack_seconds: 각 파일 녹화 종료 후 업로드까지 허용할 여유 (초)
+    """
+    if not 1 <= count <= MAX_UPLOAD_URL_BATCH:
+        raise ValueError(f"count must be between 1 and {MAX_UPLOAD_URL_BATCH}")
+
+    if not get_device_info(db, sn):
+        raise FileNotFoundError("Serial Number not found")
+
+    match = FILENAME_TIMESTAMP_PATTERN.match(filename)
+    if not match or match.group("sn") != sn:
+        raise ValueError("Filename must be {SN}_{YYYYMMDD}_{HHMMSS}.{ext} for this SN")
+
+    try:
+        start = datetime.strptime(f"{match.group('date')}{match.group('time')}", "%Y%m%d%H%M%S")
+    except ValueError:
+        raise ValueError("Invalid timestamp in filename")
+
+    urls = []
+    for i in range(count):
+        clip_time = start + timedelta(seconds=interval_seconds * i)
+        clip_filename = f"{sn}_{clip_time.strftime('%Y%m%d_%H%M%S')}{match.group('ext')}"
+        expires_in = interval_seconds * (i + 1) + expiry_slack_seconds
+        urls.append({"filename": clip_filename, **_sign_upload_url(sn, clip_filename, folder, expires_in)})
+    return urls
+
+
+def _sign_upload_url(sn: str, filename: str, folder: str, expires_in: int) -> dict:
     date = extract_date_from_filename(filename)
     object_key = f"{folder}/{sn}/{date}/{filename}"
     content_type = get_content_type_by_extension(filename)
 
+    # 새 영상이 올라올 예정이므로 해당 날짜의 목록 캐시 무효화
+    if folder == "stream":
+        invalidate_video_list_cache(sn, date)
+
     try:
         url = s3_client.generate_presigned_url(
             "put_object",
@@ -93,11 +211,11 @@ def generate_video_presigned_url(
         Dictionary containing video metadata and pre-signed URL
     """
     # Verify device exists and belongs to the specified user
-    device = device_repository.get_device_by_sn(db, sn)
+    device = get_device_info(db, sn)
     if not device:
         raise FileNotFoundError("Serial Number not found")
 
-    if device.UID != firebase_uid:
+    if device["UID"] != firebase_uid:
         raise ValueError("Device does not belong to this user")
 
     # Format date if necessary
@@ -118,14 +236,36 @@ def generate_video_presigned_url(
     filename = f"{sn}_{date}_{time}.mp4"
     object_key = f"stream/{sn}/{date}/{filename}"
 
-    # Check if the object exists
-    try:
-        s3_client.head_object(Bucket=S3_BUCKET, Key=object_key)
-    except ClientError as e:
-        if e.response['Error']['Code'] == '404':
-            raise FileNotFoundError(f"Video file not found: {filename}")
-        else:
-            raise RuntimeError(f"Error checking for video file: {str(e)}")
+    # 메타데이터 인덱스 우선 (TTL 이내), 없거나 오래됐으면 HEAD 한 번으로 존재 확인과 메타데이터 조회
+    video = video_object_repository.get_by_key(db, object_key)
+    if video and video.indexed_at and datetime.now(timezone.utc) - video.indexed_at < VIDEO_INDEX_TTL:
+        metadata = {
+            "size": video.size,
+            "last_modified": video.last_modified.isoformat() if video.last_modified else None,
+            "content_type": video.content_type
+        }
+    else:
+        try:
+            response = s3_client.head_object(Bucket=S3_BUCKET, Key=object_key)
+        except ClientError as e:
+            if e.response['Error']['Code'] == '404':
+                if video:
+                    _remove_video_object(db, sn, date, object_key)
+                raise FileNotFoundError(f"Video file not found: {filename}")
+            else:
+                raise RuntimeError(f"Error checking for video file: {str(e)}")
+
+        metadata = {
+            "size": response.get('ContentLength', 0),
+            "last_modified": response.get('LastModified').isoformat() if 'LastModified' in response else None,
+            "content_type": response.get('ContentType', 'video/mp4')
+        }
+        _index_video_objects(db, sn, date, [{
+            "key": object_key,
+            "size": metadata["size"],
+            "last_modified": response.get('LastModified'),
+            "content_type": metadata["content_type"]
+        }])
 
     # Generate presigned URL
     try:
@@ -138,16 +278,11 @@ def generate_video_presigned_url(
             ExpiresIn=expires_in
         )
 
-        # Get object metadata
-        response = s3_client.head_object(Bucket=S3_BUCKET, Key=object_key)
-
         return {
             "filename": filename,
             "download_url": url,
             "s3_key": object_key,
-            "size": response.get('ContentLength', 0),
-            "last_modified": response.get('LastModified').isoformat() if 'LastModified' in response else None,
-            "content_type": response.get('ContentType', 'video/mp4'),
+            **metadata,
             "expires_in": expires_in
         }
 
@@ -155,15 +290,120 @@ def generate_video_presigned_url(
         raise RuntimeError(f"Failed to generate presigned URL: {str(e)}")
 
 
+def _video_object_rows(sn: str, date: str, objects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "s3_key": obj["key"],
+            "SN": sn,
+            "date": date,
+            "size": obj["size"],
+            "last_modified": obj["last_modified"],
+            "content_type": obj.get("content_type", "video/mp4")
+        }
+        for obj in objects
+    ]
+
+
+def _index_video_objects(db: Session, sn: str, date: str, objects: List[Dict[str, Any]]):
+    """HEAD로 확인한 객체 메타데이터를 인덱스 테이블에 저장 (실패해도 응답에는 영향 없음)"""
+    try:
+        video_object_repository.upsert_many(db, _video_object_rows(sn, date, objects))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Failed to save video metadata index: {e}")
+
+
+def _remove_video_object(db: Session, sn: str, date: str, object_key: str):
+    """S3에서 사라진 객체를 인덱스와 목록 캐시에서 제거"""
+    invalidate_video_list_cache(sn, date)
+    try:
+        video_object_repository.delete_by_key(db, object_key)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Failed to delete video metadata index entry: {e}")
+
+
+def sync_video_index(sn: str, date: str, objects: List[Dict[str, Any]]):
+    """
+    S3 목록 조회 결과로 해당 날짜의 인덱스를 동기화 (응답 이후 백그라운드 작업으로 실행)
+    목록에 없는 행(S3에서 만료/삭제된 객체)은 제거하고, 최근 VIDEO_INDEX_MAX_KEYS개만 저장/갱신
+    """
+    db = SessionLocal()
+    try:
+        video_object_repository.delete_missing(db, sn, date, [obj["key"] for obj in objects])
+        video_object_repository.upsert_many(db, _video_object_rows(sn, date, objects[-VIDEO_INDEX_MAX_KEYS:]))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to sync video metadata index for {sn}/{date}: {e}")
+    finally:
+        db.close()
+
+
+def invalidate_video_list_cache(sn: str, date: str):
+    with _video_list_cache_lock:
+        _video_list_cache.pop((sn, date), None)
+
+
+def encode_cursor(key: str) -> str:
+    return base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def _list_video_objects(sn: str, date: str, background_tasks: Optional[BackgroundTasks] = None) -> List[Dict[str, Any]]:
+    """
+    날짜 폴더의 mp4 객체 목록 (키 순 = 시간 순, 캐시 우선)
+    list_objects_v2는 한 번에 최대 1000개만 반환하므로 continuation token으로 끝까지 조회
+    S3에서 새로 조회한 목록(캐시 미스)만 응답 이후 백그라운드 작업으로 영상 메타데이터 인덱스에 동기화
+    """
+    cache_key = (sn, date)
+    with _video_list_cache_lock:
+        objects = _video_list_cache.get(cache_key)
+    if objects is not None:
+        return objects
+
+    prefix = f"stream/{sn}/{date}/"
+    objects = []
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=S3_BUCKET, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            # Only process .mp4 files
+            if not obj["Key"].endswith(".mp4"):
+                continue
+            objects.append({
+                "key": obj["Key"],
+                "size": obj["Size"],
+                "last_modified": obj["LastModified"]
+            })
+    objects.sort(key=lambda x: x["key"])
+    if background_tasks is not None:
+        background_tasks.add_task(sync_video_index, sn, date, objects)
+
+    with _video_list_cache_lock:
+        _video_list_cache[cache_key] = objects
+    return objects
+
+
 def list_videos_by_date(
         db: Session,
         sn: str,
         firebase_uid: str,
         date: str,
-        expires_in: int = 3600
-) -> List[Dict[str, Any]]:
+        expires_in: int = 3600,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        background_tasks: Optional[BackgroundTasks] = None
+) -> Dict[str, Any]:
     """
-    List all videos for a specific date and generate pre-signed URLs for each.
+    List videos for a specific date and generate pre-signed URLs for the returned page only.
 
     Args:
         db: Database session
@@ -171,16 +411,19 @@ def list_videos_by_date(
         firebase_uid: User firebase UID
         date: Date in YYYYMMDD format
         expires_in: URL expiration time in seconds
+        limit: 페이지 크기 (None이면 전체)
+        cursor: 이전 응답의 next_cursor (이 영상 다음부터 조회)
+        background_tasks: S3에서 새로 조회한 목록의 인덱스 동기화를 응답 이후로 미룰 작업 큐 (None이면 동기화하지 않음)
 
     Returns:
-        List of dictionaries containing video metadata and pre-signed URLs
+        {"videos": [...], "next_cursor": 다음 페이지 커서 또는 None}
     """
     # Verify device exists and belongs to the specified user
-    device = device_repository.get_device_by_sn(db, sn)
+    device = get_device_info(db, sn)
     if not device:
         raise FileNotFoundError("Serial Number not found")
 
-    if device.UID != firebase_uid:
+    if device["UID"] != firebase_uid:
         raise ValueError("Device does not belong to this user")
 
     # Format date if necessary
@@ -190,29 +433,22 @@ def list_videos_by_date(
     elif not re.match(r"\d{8}", date):
         raise ValueError("Invalid date format. Use YYYYMMDD or YYYY-MM-DD")
 
-    # List all objects in the specific date folder
-    prefix = f"stream/{sn}/{date}/"
-
     try:
-        response = s3_client.list_objects_v2(
-            Bucket=S3_BUCKET,
-            Prefix=prefix
-        )
+        objects = _list_video_objects(sn, date, background_tasks)
 
-        # If no objects found
-        if 'Contents' not in response:
-            return []
+        # 커서(마지막으로 반환한 키) 다음부터 limit개
+        start = 0
+        if cursor:
+            start = bisect.bisect_right([obj["key"] for obj in objects], decode_cursor(cursor))
+        end = len(objects) if limit is None else min(start + limit, len(objects))
+        page = objects[start:end]
 
-        # Generate presigned URLs for each video
+        # 반환할 페이지만 서명
         result = []
-        for obj in response['Contents']:
-            key = obj['Key']
+        for obj in page:
+            key = obj["key"]
             filename = key.split('/')[-1]
 
-            # Only process .mp4 files
-            if not filename.endswith('.mp4'):
-                continue
-
             url = s3_client.generate_presigned_url(
                 'get_object',
                 Params={
@@ -231,15 +467,14 @@ def list_videos_by_date(
                 "download_url": url,
                 "s3_key": key,
                 "time": time,
-                "size": obj['Size'],
-                "last_modified": obj['LastModified'].isoformat(),
+                "size": obj['size'],
+                "last_modified": obj['last_modified'].isoformat(),
                 "content_type": "video/mp4",
                 "expires_in": expires_in
             })
 
-        # Sort by time
-        result.sort(key=lambda x: x.get("time", ""))
-        return result
+        next_cursor = encode_cursor(page[-1]["key"]) if page and end < len(objects) else None
+        return {"videos": result, "next_cursor": next_cursor}
 
     except ClientError as e:
-        raise RuntimeError(f"Failed to list or generate presigned URLs: {str(e)}")
\ No newline at end of file
+        raise RuntimeError(f"Failed to list or generate presigned URLs: {str(e)}")
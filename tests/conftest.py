@@ -0,0 +1,51 @@
+import os
+
+# db.database / db.s3_utils는 임포트 시 연결을 만들므로 테스트에서는 메모리 SQLite와 메모리 스토리지 사용
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+# 관계(relationship)의 문자열 참조가 풀리도록 main.py와 같이 모든 엔티티를 등록
+from repository.entity import (
+    user_entity,
+    pet_entity,
+    device_entity,
+    pet_clean_entity,
+    pet_feed_entity,
+    pet_health_entity,
+    pet_active_entity,
+    chat_entity,
+    hiding_interval_entity,
+    device_state_entity,
+    pet_device_entity,
+    serial_counter_entity,
+    video_object_entity,
+    active_report_entity,
+    active_rollup_entity
+)
+
+
+def _attach_capstone_schema(dbapi_connection, connection_record):
+    # capstone 스키마를 붙인 메모리 DB로 대신하여 text() 쿼리의 capstone.* 이름도 그대로 동작
+    dbapi_connection.execute("ATTACH DATABASE ':memory:' AS capstone")
+
+
+@pytest.fixture
+def make_session():
+    """지정한 엔티티 테이블만 만든 메모리 SQLite 세션"""
+    engines = []
+
+    def factory(*entities):
+        engine = create_engine("sqlite://")
+        event.listen(engine, "connect", _attach_capstone_schema)
+        for entity in entities:
+            entity.__table__.create(bind=engine)
+        engines.append(engine)
+        return sessionmaker(bind=engine, autoflush=False)()
+
+    yield factory
+    for engine in engines:
+        engine.dispose()
@@ -0,0 +1,108 @@
+import pytest
+
+from repository.active_rollup_repository import ActiveRollupRepository
+from repository.entity.active_report_entity import ActiveReport
+from repository.entity.active_rollup_entity import ActiveHourlyRollup, ActiveDailyRollup
+
+SN = "SN0001"
+DATE = "20250508"
+
+
+@pytest.fixture
+def db(make_session):
+    return make_session(ActiveReport, ActiveHourlyRollup, ActiveDailyRollup)
+
+
+def add_reports(db, reports, sn=SN, date=DATE):
+    for time, active in reports.items():
+        report = db.get(ActiveReport, (sn, date, time))
+        if report is None:
+            db.add(ActiveReport(SN=sn, DATE=date, TIME=time, active=active))
+        else:
+            report.active = active
+    db.flush()
+
+
+def hourly(db, sn=SN, date=DATE):
+    db.flush()
+    return {
+        row.HOUR: (row.active_sum, row.active_count, row.active_max)
+        for row in ActiveRollupRepository().get_hourly(db, sn, date)
+    }
+
+
+def daily(db, sn=SN, date=DATE):
+    db.flush()
+    row = db.get(ActiveDailyRollup, (sn, date))
+    return row and (row.active_sum, row.active_count, row.active_max)
+
+
+def test_refresh_builds_hourly_and_daily(db):
+    add_reports(db, {"090000": 1.0, "093000": 3.0, "105900": 2.0, "235900": 4.0})
+
+    ActiveRollupRepository().refresh(db, SN, DATE, [9, 10, 23])
+
+    assert hourly(db) == {9: (4.0, 2, 3.0), 10: (2.0, 1, 2.0), 23: (4.0, 1, 4.0)}
+    assert daily(db) == (10.0, 4, 4.0)
+
+
+def test_refresh_recomputes_updated_minutes(db):
+    repository = ActiveRollupRepository()
+    add_reports(db, {"090000": 1.0, "090100": 5.0})
+    repository.refresh(db, SN, DATE, [9])
+
+    # 같은 분을 다시 계산해 저장해도 합계에 중복 가산되지 않음
+    add_reports(db, {"090100": 2.0, "090200": 1.0})
+    repository.refresh(db, SN, DATE, [9])
+
+    assert hourly(db) == {9: (4.0, 3, 2.0)}
+    assert daily(db) == (4.0, 3, 2.0)
+
+
+def test_refresh_only_touches_requested_hours(db):
+    repository = ActiveRollupRepository()
+    add_reports(db, {"080000": 1.0, "120000": 1.0})
+    repository.refresh(db, SN, DATE, [8, 12])
+
+    add_reports(db, {"080100": 1.0, "100000": 7.0, "120100": 1.0})
+    repository.refresh(db, SN, DATE, [8, 12])
+
+    # 10시는 요청하지 않았으므로 집계되지 않고, 일 집계는 시간 집계 합계를 따름
+    assert hourly(db) == {8: (2.0, 2, 1.0), 12: (2.0, 2, 1.0)}
+    assert daily(db) == (4.0, 4, 1.0)
+
+
+def test_refresh_ignores_empty_hours(db):
+    ActiveRollupRepository().refresh(db, SN, DATE, [])
+    ActiveRollupRepository().refresh(db, SN, DATE, [5])
+
+    assert hourly(db) == {}
+    assert daily(db) is None
+
+
+def test_rebuild_filters_by_device_and_since(db):
+    add_reports(db, {"090000": 1.0}, date="20250507")
+    add_reports(db, {"090000": 2.0}, date=DATE)
+    add_reports(db, {"090000": 3.0}, sn="SN0002", date=DATE)
+    repository = ActiveRollupRepository()
+
+    assert repository.rebuild(db, SN, since=DATE) == 1
+    assert daily(db) == (2.0, 1, 2.0)
+    assert daily(db, date="20250507") is None
+    assert daily(db, sn="SN0002") is None
+
+    assert repository.rebuild(db) == 3
+    assert [row.active_sum for row in repository.get_daily(db, SN, ["20250507", DATE])] == [1.0, 2.0]
+
+
+def test_refresh_touched_groups_by_device_and_date(db):
+    add_reports(db, {"090000": 1.0, "093000": 2.0, "110000": 4.0})
+    add_reports(db, {"090000": 3.0}, sn="SN0002")
+
+    refreshed = ActiveRollupRepository().refresh_touched(
+        db, [(SN, DATE, "090000"), (SN, DATE, "093000"), (SN, DATE, "110000"), ("SN0002", DATE, "090000")]
+    )
+
+    assert refreshed == 2
+    assert hourly(db) == {9: (3.0, 2, 2.0), 11: (4.0, 1, 4.0)}
+    assert daily(db, sn="SN0002") == (3.0, 1, 3.0)
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from llm_api import answer_cache as answer_cache_module
+from llm_api.answer_cache import SemanticAnswerCache
+
+KEY = ("leopard gecko", "M", "성체")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {"value": 1000.0}
+    monkeypatch.setattr(answer_cache_module.time, "time", lambda: now["value"])
+    return now
+
+
+def vector(*values):
+    return np.array(values, dtype="float32")
+
+
+def test_lookup_returns_answer_above_threshold():
+    cache = SemanticAnswerCache(similarity_threshold=0.95)
+    cache.store(vector(1, 0, 0), KEY, "답변")
+
+    assert cache.lookup(vector(2, 0.1, 0), KEY) == "답변"
+    assert cache.lookup(vector(0, 1, 0), KEY) is None
+
+
+def test_lookup_is_isolated_by_profile_key():
+    cache = SemanticAnswerCache()
+    cache.store(vector(1, 0), KEY, "답변")
+
+    assert cache.lookup(vector(1, 0), KEY[:-1] + ("유체",)) is None
+
+
+def test_expired_entries_are_dropped(clock):
+    cache = SemanticAnswerCache(ttl_seconds=60)
+    cache.store(vector(1, 0), KEY, "답변")
+
+    clock["value"] += 59
+    assert cache.lookup(vector(1, 0), KEY) == "답변"
+
+    clock["value"] += 2
+    assert cache.lookup(vector(1, 0), KEY) is None
+    assert KEY not in cache._entries
+
+
+def test_oldest_entries_are_evicted_per_key():
+    cache = SemanticAnswerCache(max_entries_per_key=2)
+    cache.store(vector(1, 0, 0), KEY, "first")
+    cache.store(vector(0, 1, 0), KEY, "second")
+    cache.store(vector(0, 0, 1), KEY, "third")
+
+    assert cache.lookup(vector(1, 0, 0), KEY) is None
+    assert cache.lookup(vector(0, 1, 0), KEY) == "second"
+    assert cache.lookup(vector(0, 0, 1), KEY) == "third"
+
+
+def test_oldest_keys_are_evicted():
+    cache = SemanticAnswerCache(max_keys=2)
+    for i in range(3):
+        cache.store(vector(1, 0), ("key", i), f"answer {i}")
+
+    assert cache.lookup(vector(1, 0), ("key", 0)) is None
+    assert cache.lookup(vector(1, 0), ("key", 2)) == "answer 2"
+
+
+def test_corpus_version_change_clears_cache():
+    cache = SemanticAnswerCache()
+    cache.set_corpus_version("v1")
+    cache.store(vector(1, 0), KEY, "답변")
+
+    cache.set_corpus_version("v1")
+    assert cache.lookup(vector(1, 0), KEY) == "답변"
+
+    cache.set_corpus_version("v2")
+    assert cache.lookup(vector(1, 0), KEY) is None
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from repository.entity.hiding_interval_entity import HidingInterval, HidingCheckpoint
+from util import hiding_detector
+from util.hiding_detector import apply_hiding_rules, hiding_frame_flags, process_hiding_for_device
+
+SN = "SN0001"
+START = datetime(2025, 5, 8, 12, 0, 0)
+VISIBLE = [0.9] * 10
+LOW_CONF = [0.1] * 8 + [0.9] * 2
+
+# (박스 수, 키포인트 conf) - 박스 없음 2연속, 저신뢰, 저신뢰 앞 박스 없음, 단독 박스 없음이 섞인 프레임열
+FRAMES = [
+    (1, VISIBLE), (0, []), (0, []), (1, VISIBLE), (0, []), (1, LOW_CONF), (1, LOW_CONF),
+    (1, VISIBLE), (0, []), (1, VISIBLE), (1, LOW_CONF), (0, []), (0, []), (0, []), (1, VISIBLE)
+]
+
+
+def frame_rows(frames, start=START, step=timedelta(seconds=60)):
+    rows = []
+    for i, (box_count, kp_conf) in enumerate(frames):
+        frame_time = start + step * i
+        rows.append((frame_time.strftime("%Y%m%d_%H%M%S"), frame_time, box_count, kp_conf))
+    return rows
+
+
+@pytest.fixture
+def frames_source(monkeypatch):
+    """stream_hiding_frames를 체크포인트 이후 행만 chunk_size 단위로 돌려주는 목록으로 대체"""
+    source = {"rows": []}
+
+    def stream(session, device_serial, since, chunk_size):
+        rows = [row for row in source["rows"] if row[0] > since]
+        for i in range(0, len(rows), chunk_size):
+            yield rows[i:i + chunk_size]
+
+    monkeypatch.setattr(hiding_detector, "stream_hiding_frames", stream)
+    return source
+
+
+def saved_intervals(session):
+    return [
+        (row.start_time, row.end_time, row.frame_count, row.no_box_frames, row.low_conf_frames)
+        for row in session.query(HidingInterval).order_by(HidingInterval.start_time)
+    ]
+
+
+def run_in_batches(make_session, frames_source, rows, split_points, chunk_size):
+    """rows를 split_points에서 나눠 여러 번의 실행(체크포인트 이어받기)으로 처리"""
+    session = make_session(HidingInterval, HidingCheckpoint)
+    bounds = [0] + list(split_points) + [len(rows)]
+    for end in bounds[1:]:
+        frames_source["rows"] = rows[:end]
+        process_hiding_for_device(session, SN, chunk_size)
+    return saved_intervals(session)
+
+
+def test_apply_hiding_rules():
+    no_box, low_conf_hidden = hiding_frame_flags([1, 0, 0, 1, 0, 1, 0], [VISIBLE, [], [], VISIBLE, [], LOW_CONF, []])
+
+    assert no_box.tolist() == [False, True, True, False, True, False, True]
+    assert low_conf_hidden.tolist() == [False, False, False, False, False, True, False]
+    assert apply_hiding_rules(no_box, low_conf_hidden).tolist() == [False, True, True, False, True, True, False]
+
+
+def test_single_run_intervals(make_session, frames_source):
+    intervals = run_in_batches(make_session, frames_source, frame_rows(FRAMES), [], chunk_size=100)
+
+    # 1~2분, 4~6분 구간은 HIDING_MAX_GAP_SECONDS(120초) 이내라 하나로 저장됨
+    minute = timedelta(minutes=1)
+    assert intervals == [
+        (START + 1 * minute, START + 6 * minute, 5, 3, 2),
+        (START + 10 * minute, START + 13 * minute, 4, 3, 1),
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 100])
+def test_chunking_matches_single_run(make_session, frames_source, chunk_size):
+    rows = frame_rows(FRAMES)
+    expected = run_in_batches(make_session, frames_source, rows, [], chunk_size=100)
+
+    assert run_in_batches(make_session, frames_source, rows, [], chunk_size) == expected
+
+
+@pytest.mark.parametrize("split_point", range(1, len(FRAMES)))
+def test_checkpoint_carry_over_matches_single_run(make_session, frames_source, split_point):
+    rows = frame_rows(FRAMES)
+    expected = run_in_batches(make_session, frames_source, rows, [], chunk_size=100)
+
+    assert run_in_batches(make_session, frames_source, rows, [split_point], chunk_size=4) == expected
+
+
+def test_checkpoint_stores_last_frame_state(make_session, frames_source):
+    session = make_session(HidingInterval, HidingCheckpoint)
+    rows = frame_rows(FRAMES[:3])
+    frames_source["rows"] = rows
+
+    process_hiding_for_device(session, SN, chunk_size=2)
+
+    checkpoint = session.get(HidingCheckpoint, SN)
+    assert (checkpoint.last_timestamp, checkpoint.last_no_box, checkpoint.last_hidden) == (rows[-1][0], True, True)
+
+
+def test_no_new_frames_keeps_state(make_session, frames_source):
+    session = make_session(HidingInterval, HidingCheckpoint)
+    frames_source["rows"] = frame_rows(FRAMES)
+    process_hiding_for_device(session, SN)
+    before = saved_intervals(session)
+
+    assert process_hiding_for_device(session, SN) == {"device": SN, "frames": 0, "intervals": 0}
+    assert saved_intervals(session) == before
+
+
+def test_gap_splits_intervals(make_session, frames_source):
+    rows = frame_rows([(0, []), (0, [])]) + frame_rows([(0, []), (0, [])], start=START + timedelta(hours=1))
+
+    intervals = run_in_batches(make_session, frames_source, rows, [2], chunk_size=100)
+
+    assert [interval[2] for interval in intervals] == [2, 2]
@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from db import prepared as prepared_module
+from db.prepared import PreparedQuery
+
+QUERY = PreparedQuery("recent_frames", """
+    SELECT to_timestamp(ts, 'YYYYMMDD')::timestamp
+    FROM capstone.yolo_results
+    WHERE device = :device AND date >= :since AND other = :device
+    LIMIT :limit
+""")
+
+
+class FakeConnection:
+    """SQLAlchemy Connection 대역 (DBAPI 연결별 info와 실행한 SQL만 기록)"""
+
+    def __init__(self, dbapi_info, dialect="postgresql"):
+        self.dialect = SimpleNamespace(name=dialect)
+        self.connection = SimpleNamespace(info=dbapi_info)
+        self.driver_sql = []
+        self.executed = []
+
+    def exec_driver_sql(self, sql, execution_options=None):
+        self.driver_sql.append(sql)
+
+    def execute(self, statement, params):
+        self.executed.append((str(statement), params))
+
+
+class FakeSession:
+    def __init__(self, connection):
+        self._connection = connection
+
+    def connection(self):
+        return self._connection
+
+
+def test_prepare_sql_uses_positional_params():
+    assert QUERY.param_names == ["device", "since", "limit"]
+    assert "device = $1 AND date >= $2 AND other = $1" in QUERY.prepare_sql
+    assert "LIMIT $3" in QUERY.prepare_sql
+    assert "::timestamp" in QUERY.prepare_sql
+    assert QUERY.prepare_sql.startswith("PREPARE recent_frames AS")
+    assert str(QUERY.execute_query) == "EXECUTE recent_frames(:device, :since, :limit)"
+
+
+def test_query_without_params():
+    query = PreparedQuery("device_serials", "SELECT 1")
+
+    assert query.param_names == []
+    assert str(query.execute_query) == "EXECUTE device_serials"
+
+
+def test_prepares_once_per_connection(monkeypatch):
+    monkeypatch.setattr(prepared_module, "PG_PREPARED_STATEMENTS", True)
+    params = {"device": "SN1", "since": "2025-05-01", "limit": 5}
+    first = FakeConnection({})
+
+    QUERY.execute(FakeSession(first), params)
+    QUERY.execute(FakeSession(first), params)
+
+    assert first.driver_sql == [QUERY.prepare_sql]
+    assert first.executed == [(str(QUERY.execute_query), params)] * 2
+
+    # 다른 DBAPI 연결(풀의 새 연결)에서는 다시 PREPARE
+    second = FakeConnection({})
+    QUERY.execute(FakeSession(second), params)
+    assert second.driver_sql == [QUERY.prepare_sql]
+
+    # 같은 DBAPI 연결을 다른 Connection으로 다시 빌려도 PREPARE하지 않음
+    reused = FakeConnection(first.connection.info)
+    QUERY.execute(FakeSession(reused), params)
+    assert reused.driver_sql == []
+
+
+@pytest.mark.parametrize("enabled, dialect", [(False, "postgresql"), (True, "sqlite")])
+def test_falls_back_to_plain_query(monkeypatch, enabled, dialect):
+    monkeypatch.setattr(prepared_module, "PG_PREPARED_STATEMENTS", enabled)
+    connection = FakeConnection({}, dialect)
+
+    QUERY.execute(FakeSession(connection), {"device": "SN1", "since": "2025-05-01", "limit": 5})
+
+    assert connection.driver_sql == []
+    assert connection.executed[0][0] == str(QUERY.query)
+
+
+def test_fallback_runs_on_sqlite(make_session):
+    db = make_session()
+    db.execute(text("CREATE TABLE capstone.frames (device TEXT, ts TEXT)"))
+    db.execute(text("INSERT INTO capstone.frames VALUES ('SN1', '1'), ('SN1', '2'), ('SN2', '3')"))
+    query = PreparedQuery("frames_by_device", """
+        SELECT ts FROM capstone.frames WHERE device = :device ORDER BY ts DESC LIMIT :limit
+    """)
+
+    rows = query.execute(db, {"device": "SN1", "limit": 5}).all()
+
+    assert [row[0] for row in rows] == ["2", "1"]
@@ -0,0 +1,117 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+pytest.importorskip("openai")
+pytest.importorskip("tiktoken")
+pytest.importorskip("sentence_transformers")
+
+from llm_api import rag_qa_prompt
+from llm_api.answer_cache import SemanticAnswerCache
+
+QUESTION = "레오파드 게코 적정 온도는 몇 도인가요?"
+FOLLOW_UP = "그럼 밤에는요?"
+GENERIC_ANSWER = "낮에는 28~32도, 밤에는 24~26도를 유지하세요."
+
+PETS = {
+    "pet-1": ({"id": "pet-1", "name": "모찌", "species": "레오파드 게코", "gender": "M", "birthdate": "2023-01-01",
+               "traits": []},
+              {"date": "2025-05-01", "weight": 52, "memo": "꼬리가 얇아짐", "shedding_status": "정상"}),
+    "pet-2": ({"id": "pet-2", "name": "두부", "species": "레오파드 게코", "gender": "M", "birthdate": "2022-06-01",
+               "traits": []},
+              {"date": "2025-05-03", "weight": 61, "memo": None, "shedding_status": "탈피 중"}),
+    "pet-3": ({"id": "pet-3", "name": "콩이", "species": "크레스티드 게코", "gender": "F", "birthdate": "2023-01-01",
+               "traits": []},
+              {"date": None, "weight": None, "memo": None, "shedding_status": None}),
+}
+
+# 코퍼스 중심과 같은 방향이면 단독 질문, 직교하면 이어지는 질문
+EMBEDDINGS = {QUESTION: [1.0, 0.0, 0.0], FOLLOW_UP: [0.0, 1.0, 0.0]}
+
+
+@pytest.fixture
+def chat(monkeypatch):
+    calls = []
+
+    def generate_answer(contexts, question, pet_info=None, latest_record=None, db=None, firebase_uid=None,
+                        history=None, profile=None):
+        calls.append({"question": question, "pet_info": pet_info, "history": history, "profile": profile})
+        return GENERIC_ANSWER if profile else f"{pet_info['name']} 맞춤 답변"
+
+    monkeypatch.setattr(rag_qa_prompt, "answer_cache", SemanticAnswerCache())
+    monkeypatch.setattr(rag_qa_prompt, "ANSWER_CACHE_ENABLED", True)
+    monkeypatch.setattr(rag_qa_prompt, "embed_model", object())
+    monkeypatch.setattr(rag_qa_prompt, "index", object())
+    monkeypatch.setattr(rag_qa_prompt, "metadata", [{"content": "온도 관리"}])
+    monkeypatch.setattr(rag_qa_prompt, "topic_centroid", np.array([1.0, 0.0, 0.0], dtype="float32"))
+    monkeypatch.setattr(rag_qa_prompt, "embed_text",
+                        lambda text, model: np.array([EMBEDDINGS[text]], dtype="float32"))
+    monkeypatch.setattr(rag_qa_prompt, "is_valid_query", lambda *args, **kwargs: True)
+    monkeypatch.setattr(rag_qa_prompt, "_load_history", lambda db, uid: [
+        {"role": "user", "question": f"{uid}의 이전 질문"}, {"role": "assistant", "answer": "이전 답변"}
+    ])
+    monkeypatch.setattr(rag_qa_prompt, "_load_pet_context", lambda db, pet_id, uid: PETS[pet_id])
+    monkeypatch.setattr(rag_qa_prompt, "_retrieve_contexts", lambda query_emb: [{"content": "온도 관리"}])
+    monkeypatch.setattr(rag_qa_prompt, "generate_answer", generate_answer)
+    return calls
+
+
+def test_same_question_from_different_pets_hits_cache(chat):
+    first = rag_qa_prompt.handle_query(QUESTION, "pet-1", "uid-1", None)
+    second = rag_qa_prompt.handle_query(QUESTION, "pet-2", "uid-2", None)
+    repeated = rag_qa_prompt.handle_query(QUESTION, "pet-1", "uid-1", None)
+
+    # 종/성별/성장 단계가 같으면 건강 기록과 대화가 달라도 한 번만 생성
+    assert len(chat) == 1
+    assert chat[0]["profile"] == ("레오파드 게코", "M", "성체")
+    assert chat[0]["pet_info"] is None and chat[0]["history"] == []
+
+    # 일반 답변 뒤에 각자의 건강 기록만 덧붙음
+    assert first.startswith(GENERIC_ANSWER) and second.startswith(GENERIC_ANSWER)
+    assert "모찌" in first and "52g" in first and "꼬리가 얇아짐" in first
+    assert "두부" in second and "61g" in second and "탈피 중" in second
+    assert "모찌" not in second and "꼬리가 얇아짐" not in second
+    assert repeated == first
+
+
+def test_different_profile_misses_cache(chat):
+    rag_qa_prompt.handle_query(QUESTION, "pet-1", "uid-1", None)
+    answer = rag_qa_prompt.handle_query(QUESTION, "pet-3", "uid-3", None)
+
+    assert len(chat) == 2
+    assert chat[1]["profile"] == ("크레스티드 게코", "F", "성체")
+    # 건강 기록이 없으면 덧붙이지 않음
+    assert answer == GENERIC_ANSWER
+
+
+def test_follow_up_question_is_personalized_and_not_cached(chat):
+    first = rag_qa_prompt.handle_query(FOLLOW_UP, "pet-1", "uid-1", None)
+    rag_qa_prompt.handle_query(FOLLOW_UP, "pet-2", "uid-2", None)
+
+    assert first == "모찌 맞춤 답변"
+    assert [call["profile"] for call in chat] == [None, None]
+    assert chat[0]["history"]
+
+
+def test_stream_shares_cache_with_handle_query(chat, monkeypatch):
+    async def astream_answer(*args, **kwargs):
+        raise AssertionError("cached answer should not call GPT")
+        yield
+
+    monkeypatch.setattr(rag_qa_prompt, "astream_answer", astream_answer)
+    rag_qa_prompt.handle_query(QUESTION, "pet-1", "uid-1", None)
+
+    answer = asyncio.run(rag_qa_prompt.ahandle_query(QUESTION, "pet-2", "uid-2", None))
+
+    assert answer.startswith(GENERIC_ANSWER) and "두부" in answer
+
+
+def test_disabled_cache_always_personalizes(chat, monkeypatch):
+    monkeypatch.setattr(rag_qa_prompt, "ANSWER_CACHE_ENABLED", False)
+
+    rag_qa_prompt.handle_query(QUESTION, "pet-1", "uid-1", None)
+    rag_qa_prompt.handle_query(QUESTION, "pet-1", "uid-1", None)
+
+    assert [call["profile"] for call in chat] == [None, None]
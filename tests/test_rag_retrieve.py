@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+pytest.importorskip("openai")
+pytest.importorskip("tiktoken")
+pytest.importorskip("sentence_transformers")
+
+from llm_api import rag_qa_prompt
+from llm_api.rag_qa_prompt import build_index, retrieve, retrieve_batch
+
+DIM = 384
+
+
+def corpus(n, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((n, DIM)).astype("float32")
+    metadata = [{"content": f"doc-{i}"} for i in range(n)]
+    return vectors, metadata
+
+
+@pytest.mark.parametrize("index_type, n, top_k", [
+    ("flat", 5, 10),
+    ("hnsw", 5, 10),
+    # nprobe개 리스트의 후보가 top_k보다 적어 -1이 섞여 반환됨
+    ("ivfpq", 300, 200),
+])
+def test_retrieve_drops_missing_results(index_type, n, top_k):
+    vectors, metadata = corpus(n)
+    index = build_index(vectors, index_type)
+
+    _, indices = index.search(vectors[:1], top_k)
+    assert (indices[0] == -1).any()
+
+    results, _ = retrieve(vectors[:1], index, metadata, top_k)
+
+    found = [int(idx) for idx in indices[0] if idx >= 0]
+    assert results == [metadata[idx] for idx in found]
+    assert results[0] == metadata[0]
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw"])
+def test_retrieve_batch_drops_missing_results(monkeypatch, index_type):
+    vectors, metadata = corpus(5)
+    monkeypatch.setattr(rag_qa_prompt, "index", build_index(vectors, index_type))
+    monkeypatch.setattr(rag_qa_prompt, "metadata", metadata)
+    monkeypatch.setattr(rag_qa_prompt, "SIMILARITY_THRESHOLD", float("inf"))
+
+    results = retrieve_batch(vectors[:2], top_k=10)
+
+    assert [len(contexts) for contexts in results] == [5, 5]
+    assert [contexts[0] for contexts in results] == metadata[:2]
+    assert all(len({c["content"] for c in contexts}) == len(contexts) for contexts in results)
+
+
+def test_retrieve_batch_returns_empty_context_above_threshold(monkeypatch):
+    vectors, metadata = corpus(5)
+    monkeypatch.setattr(rag_qa_prompt, "index", build_index(vectors, "flat"))
+    monkeypatch.setattr(rag_qa_prompt, "metadata", metadata)
+    monkeypatch.setattr(rag_qa_prompt, "SIMILARITY_THRESHOLD", 0.0)
+
+    assert retrieve_batch(vectors[:1] + 1.0, top_k=3) == [[{"content": ""}]]
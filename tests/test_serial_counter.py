@@ -0,0 +1,83 @@
+import uuid
+
+import pytest
+
+from repository.entity.device_entity import Device
+from repository.entity.serial_counter_entity import SerialCounter
+from repository.serial_counter_repository import SerialCounterRepository
+from service import device_service as device_service_module
+from service.device_service import DeviceService
+
+PREFIX = "SFRXC12519GF"
+
+
+@pytest.fixture
+def db(make_session):
+    return make_session(Device, SerialCounter)
+
+
+def add_devices(db, *sns):
+    for sn in sns:
+        db.add(Device(device_id=str(uuid.uuid4()), SN=sn))
+    db.commit()
+
+
+def test_allocate_starts_from_one_without_counter_or_devices(db):
+    repository = SerialCounterRepository()
+
+    assert repository.allocate(db, PREFIX) == 1
+    assert repository.allocate(db, PREFIX, 3) == 2
+    assert repository.allocate(db, PREFIX) == 5
+    assert db.get(SerialCounter, PREFIX).last_value == 5
+
+
+def test_allocate_counts_devices_registered_before_counter(db):
+    add_devices(db, f"{PREFIX}00001", f"{PREFIX}00002", "SFRXC12520GF00001")
+
+    assert SerialCounterRepository().allocate(db, PREFIX, 2) == 3
+    assert db.get(SerialCounter, PREFIX).last_value == 4
+
+
+def test_allocate_keeps_prefixes_separate(db):
+    repository = SerialCounterRepository()
+    repository.allocate(db, PREFIX, 10)
+
+    assert repository.allocate(db, "SFRXC12520GF") == 1
+
+
+def test_allocation_rolls_back_with_transaction(db):
+    repository = SerialCounterRepository()
+    repository.allocate(db, PREFIX, 2)
+    db.commit()
+
+    repository.allocate(db, PREFIX, 5)
+    db.rollback()
+
+    assert repository.allocate(db, PREFIX) == 3
+
+
+def test_register_devices_bulk_assigns_consecutive_serials(db, monkeypatch):
+    service = DeviceService()
+    monkeypatch.setattr(service, "_serial_prefix", lambda: PREFIX)
+    add_devices(db, f"{PREFIX}00001")
+
+    registered = service.register_devices_bulk(db, ["10.0.0.1", "10.0.0.2"])
+
+    assert registered == [
+        {"ip": "10.0.0.1", "serial_number": f"{PREFIX}00002"},
+        {"ip": "10.0.0.2", "serial_number": f"{PREFIX}00003"},
+    ]
+    assert db.query(Device).filter(Device.SN.like(f"{PREFIX}%")).count() == 3
+
+
+def test_register_devices_bulk_rejects_exhausted_prefix(db, monkeypatch):
+    service = DeviceService()
+    monkeypatch.setattr(service, "_serial_prefix", lambda: PREFIX)
+    monkeypatch.setattr(device_service_module, "SERIAL_SEQ_MAX", 2)
+
+    with pytest.raises(ValueError):
+        service.register_devices_bulk(db, ["10.0.0.1", "10.0.0.2", "10.0.0.3"])
+
+    # 실패한 요청의 순번과 장치는 함께 롤백됨
+    assert db.get(SerialCounter, PREFIX) is None
+    assert db.query(Device).count() == 0
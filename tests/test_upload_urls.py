@@ -0,0 +1,45 @@
+import pytest
+
+from service import s3_service
+from service.s3_service import MAX_UPLOAD_URL_BATCH, generate_presigned_upload_urls
+
+SN = "SFRXC12515GF00001"
+
+
+@pytest.fixture(autouse=True)
+def registered_device(monkeypatch):
+    monkeypatch.setattr(s3_service, "get_device_info", lambda db, sn: {"SN": sn, "UID": "uid"})
+
+
+def test_each_url_expires_after_its_clip():
+    uploads = generate_presigned_upload_urls(
+        None, SN, f"{SN}_20250413_140000.mp4", MAX_UPLOAD_URL_BATCH, folder="stream",
+        interval_seconds=60, expiry_slack_seconds=300
+    )
+
+    assert uploads[0]["expires_in"] == 60 + 300
+    # 마지막 파일(59분 뒤 녹화 시작)도 녹화가 끝난 뒤 여유 시간만큼 유효
+    assert uploads[-1]["filename"] == f"{SN}_20250413_145900.mp4"
+    assert uploads[-1]["expires_in"] == 60 * MAX_UPLOAD_URL_BATCH + 300
+
+
+def test_long_interval_keeps_last_url_valid():
+    uploads = generate_presigned_upload_urls(
+        None, SN, f"{SN}_20250413_230000.mp4", 3, folder="stream", interval_seconds=3600
+    )
+
+    assert [upload["filename"] for upload in uploads] == [
+        f"{SN}_20250413_230000.mp4", f"{SN}_20250414_000000.mp4", f"{SN}_20250414_010000.mp4"
+    ]
+    assert uploads[-1]["s3_key"] == f"stream/{SN}/20250414/{SN}_20250414_010000.mp4"
+    assert uploads[-1]["expires_in"] == 3 * 3600 + s3_service.UPLOAD_URL_EXPIRY_SLACK_SECONDS
+
+
+@pytest.mark.parametrize("count, filename", [
+    (0, f"{SN}_20250413_140000.mp4"),
+    (MAX_UPLOAD_URL_BATCH + 1, f"{SN}_20250413_140000.mp4"),
+    (1, "OTHER_20250413_140000.mp4"),
+])
+def test_rejects_invalid_batch(count, filename):
+    with pytest.raises(ValueError):
+        generate_presigned_upload_urls(None, SN, filename, count, folder="stream")
@@ -1,13 +1,17 @@
 # /util/active_create.py
 
 import logging
+import math
+from itertools import chain
+from typing import Tuple
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from pytz import timezone as pytz_timezone
-from sqlalchemy import text
 from sqlalchemy.orm import Session
+from db.prepared import PreparedQuery
 from service.active_report_service import ActiveReportService
+from util.yolo_partition import partition_date_range
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
@@ -15,46 +19,45 @@ logger = logging.getLogger(__name__)
 # 고정 장치 시리얼 번호 설정
 DEVICE_SN = "SFRXC12515GF00001"
 
-
-def fetch_yolo_data_by_time_range(session, device_serial, start_time, end_time):
-    """
-    RDS에서 특정 시간 범위의 YOLO 감지 결과 가져오기
-    타임스탬프 기준으로 조회
+# 활동량 계산에 필요한 값(타임스탬프, 첫 번째 박스 중심)만 DB에서 계산하여 가져옴
+# (JSONB 전체를 파이썬 딕셔너리로 만들지 않음, 박스가 없는 프레임은 제외)
+# 1분마다 장치별로 실행되므로 서버 측 prepared statement로 실행 (date 조건은 월 파티션 프루닝용)
+YOLO_ACTIVITY_POINTS_QUERY = PreparedQuery("yolo_activity_points", """
+    SELECT
+        extract(epoch FROM to_timestamp(yolo_result->>'timestamp', 'YYYYMMDD_HH24MISS')::timestamp)::float8 AS ts,
+        ((yolo_result #>> '{boxes,0,xyxy,0}')::float8 + (yolo_result #>> '{boxes,0,xyxy,2}')::float8) / 2 AS center_x,
+        ((yolo_result #>> '{boxes,0,xyxy,1}')::float8 + (yolo_result #>> '{boxes,0,xyxy,3}')::float8) / 2 AS center_y
+    FROM capstone.yolo_results
+    WHERE device = :device_serial
+    AND date BETWEEN :start_date AND :end_date
+    AND yolo_result->>'timestamp' >= :start_ts
+    AND yolo_result->>'timestamp' < :end_ts
+    AND jsonb_typeof(yolo_result #> '{boxes,0,xyxy}') = 'array'
+    ORDER BY yolo_result->>'timestamp'
+""")
+
+
+def fetch_activity_points(session, device_serial, start_time, end_time) -> Tuple[np.ndarray, np.ndarray]:
     """
-    try:
-        # 시간 형식 변환 (YYYYMMDD_HHMMSS)
-        start_str = start_time.strftime("%Y%m%d_%H%M%S")
-        end_str = end_time.strftime("%Y%m%d_%H%M%S")
-
-        # SQL 쿼리 구성
-        query = text(f"""
-            SELECT image, device, date, yolo_result 
-            FROM capstone.yolo_results 
-            WHERE device = '{device_serial}' 
-            AND yolo_result->>'timestamp' >= '{start_str}' 
-            AND yolo_result->>'timestamp' < '{end_str}'
-            ORDER BY yolo_result->>'timestamp'
-        """)
-
-        result = session.execute(query)
-
-        # 결과를 DataFrame으로 변환
-        rows = []
-        for row in result:
-            rows.append({
-                "image": row[0],
-                "device": row[1],
-                "date": row[2],
-                "yolo_result": row[3]  # JSONB 타입은 자동으로 Python 딕셔너리로 변환됨
-            })
-
-        df = pd.DataFrame(rows)
-        logger.info(f"Retrieved {len(df)} YOLO records for device {device_serial} in time range")
-        return df
+    특정 시간 범위의 프레임별 (타임스탬프, 박스 중심 좌표)를 NumPy 배열로 조회
 
-    except Exception as e:
-        logger.error(f"Error fetching YOLO data: {str(e)}")
-        raise
+    Returns:
+        (times, centers): datetime64[s] 배열, (N, 2) 중심 좌표 배열 (시간순)
+    """
+    start_date, end_date = partition_date_range(start_time, end_time)
+    rows = YOLO_ACTIVITY_POINTS_QUERY.execute(session, {
+        "device_serial": device_serial,
+        "start_date": start_date,
+        "end_date": end_date,
+        "start_ts": start_time.strftime("%Y%m%d_%H%M%S"),
+        "end_ts": end_time.strftime("%Y%m%d_%H%M%S")
+    }).fetchall()
+
+    # 행 객체를 거치지 않고 한 번에 float 배열로 변환
+    data = np.fromiter(chain.from_iterable(rows), dtype=np.float64, count=len(rows) * 3).reshape(-1, 3)
+    times = data[:, 0].astype(np.int64).astype("datetime64[s]")
+    logger.info(f"Retrieved {len(rows)} activity points for device {device_serial} in time range")
+    return times, data[:, 1:]
 
 
 def extract_center_from_yolo(yolo_data):
@@ -99,8 +102,6 @@ def calculate_activity(df, interval_minutes=1, start_time=None, end_time=None):
     # 시간 순 정렬
     center_data.sort(key=lambda x: x[0])
 
-    # 결과를 저장할 DataFrame 준비
-    rows = []
     device_sn = df['device'].iloc[0] if not df.empty else DEVICE_SN
 
     # 시간 범위 설정
@@ -143,88 +144,86 @@ def calculate_activity(df, interval_minutes=1, start_time=None, end_time=None):
         time_range_start = current_time - timedelta(minutes=interval_minutes)
         time_range_end = current_time
 
-    # 1분 간격 계산
-    interval_start = time_range_start.replace(
-        minute=time_range_start.minute,
-        second=0,
-        microsecond=0
+    times = np.array([ts for ts, _ in center_data], dtype="datetime64[s]")
+    centers = np.array([center for _, center in center_data], dtype=np.float64).reshape(-1, 2)
+    return calculate_activity_from_points(
+        device_sn, times, centers, time_range_start, time_range_end, interval_minutes
     )
 
-    # 필요한 경우 interval_start를 조정하여 time_range_start 이전으로 설정
-    while interval_start > time_range_start:
-        interval_start -= timedelta(minutes=interval_minutes)
-
-    # 다음 간격이 time_range_end를 넘을 때까지 반복
-    current_interval = interval_start
-    while current_interval < time_range_end:
-        next_interval = current_interval + timedelta(minutes=interval_minutes)
-
-        # 현재 간격의 활동량 계산
-        interval_activity = 0.0
-
-        # 중심 좌표가 충분히 있는 경우
-        if len(center_data) >= 2:
-            for i in range(1, len(center_data)):
-                prev_ts, prev_center = center_data[i - 1]
-                curr_ts, curr_center = center_data[i]
 
-                # 현재 간격에 포함되는 경우만 계산
-                if (current_interval <= prev_ts < next_interval or
-                        current_interval <= curr_ts < next_interval):
-                    dist = np.linalg.norm(np.array(curr_center) - np.array(prev_center))
-                    interval_activity += dist
-
-        # 결과 추가
-        date_str = current_interval.strftime('%Y%m%d')
-        time_str = f"{current_interval.strftime('%H%M')}00"
-
-        rows.append({
-            "SN": device_sn,
-            "DATE": date_str,
-            "TIME": time_str,
-            "active": round(interval_activity, 2)
-        })
-
-        # 다음 간격으로 이동
-        current_interval = next_interval
-
-    return pd.DataFrame(rows)
+def calculate_activity_from_points(device_sn, times, centers, start_time, end_time, interval_minutes=1):
+    """
+    시간순 중심 좌표 배열로 구간별 활동량 계산 (데이터가 없는 구간도 0으로 기록)
+    연속 프레임 간 이동 거리는 앞/뒤 프레임이 속한 구간에 더하며, 두 구간에 걸치면 양쪽 모두에 더함
 
+    Args:
+        device_sn: 장치 시리얼 번호
+        times: 프레임 시각 (datetime64[s] 배열)
+        centers: 프레임별 박스 중심 좌표 ((N, 2) 배열)
+        start_time: 시작 시간 (분 단위로 내림)
+        end_time: 종료 시간
+        interval_minutes: 계산 간격(분)
 
-def process_current_interval(session: Session, start_time: datetime, end_time: datetime):
+    Returns:
+        DataFrame: 활동량 데이터 (SN, DATE, TIME, active)
+    """
+    range_start = start_time.replace(tzinfo=None, second=0, microsecond=0)
+    range_end = end_time.replace(tzinfo=None)
+    interval_seconds = interval_minutes * 60
+    count = max(math.ceil((range_end - range_start).total_seconds() / interval_seconds), 0)
+
+    activity = np.zeros(count)
+    if len(times) >= 2 and count:
+        order = np.argsort(times, kind="stable")
+        times, centers = times[order], centers[order]
+        distances = np.linalg.norm(np.diff(centers, axis=0), axis=1)
+
+        offsets = (times - np.datetime64(range_start, "s")).astype(np.int64)
+        buckets = np.floor_divide(offsets, interval_seconds)
+        prev_buckets, curr_buckets = buckets[:-1], buckets[1:]
+        activity += _sum_by_bucket(prev_buckets, distances, count)
+        activity += _sum_by_bucket(curr_buckets, np.where(curr_buckets != prev_buckets, distances, 0.0), count)
+
+    intervals = [range_start + timedelta(minutes=interval_minutes * i) for i in range(count)]
+    return pd.DataFrame({
+        "SN": [device_sn] * count,
+        "DATE": [interval.strftime('%Y%m%d') for interval in intervals],
+        "TIME": [f"{interval.strftime('%H%M')}00" for interval in intervals],
+        "active": np.round(activity, 2)
+    })
+
+
+def _sum_by_bucket(buckets, weights, count):
+    """구간 번호별 가중치 합 (범위 밖 구간은 제외)"""
+    valid = (buckets >= 0) & (buckets < count)
+    return np.bincount(buckets[valid], weights=weights[valid], minlength=count)
+
+
+def process_current_interval(session: Session, start_time: datetime, end_time: datetime, device_serial: str = DEVICE_SN):
     """현재 1분 시간 간격에 대한 활동량 처리"""
     try:
         # ActiveReportService 인스턴스 생성
         active_report_service = ActiveReportService()
 
-        # YOLO 데이터 가져오기
-        df = fetch_yolo_data_by_time_range(session, DEVICE_SN, start_time, end_time)
-
-        # 데이터가 없어도 빈 DataFrame을 생성하여 0으로 기록
-        if df.empty:
-            logger.warning(f"No YOLO data found for device {DEVICE_SN}")
-            # 빈 DataFrame을 생성하여 0으로 기록
-            empty_df = pd.DataFrame([{
-                "image": None,
-                "device": DEVICE_SN,
-                "date": start_time.strftime("%Y%m%d"),
-                "yolo_result": {"timestamp": start_time.strftime("%Y%m%d_%H%M%S")}
-            }])
-            activity_df = calculate_activity(empty_df, start_time=start_time, end_time=end_time)
-        else:
-            # 활동량 계산 (시작/종료 시간 명시적 전달)
-            activity_df = calculate_activity(df, start_time=start_time, end_time=end_time)
+        # 타임스탬프와 박스 중심 좌표만 배열로 가져오기
+        times, centers = fetch_activity_points(session, device_serial, start_time, end_time)
+        if len(times) == 0:
+            logger.warning(f"No YOLO data found for device {device_serial}")
+
+        # 데이터가 없어도 구간별로 0으로 기록 (시작/종료 시간 명시적 전달)
+        activity_df = calculate_activity_from_points(device_serial, times, centers, start_time, end_time)
 
         if activity_df.empty:
-            logger.warning(f"Failed to create activity dataframe for device {DEVICE_SN}")
+            logger.warning(f"Failed to create activity dataframe for device {device_serial}")
             return False
 
         # DB에 저장
         saved_count = active_report_service.save_activity_data(session, activity_df)
-        logger.info(f"Saved {saved_count} records to database for device {DEVICE_SN}")
+        logger.info(f"Saved {saved_count} records to database for device {device_serial}")
 
         return True
 
     except Exception as e:
-        logger.error(f"Error processing device {DEVICE_SN}: {str(e)}")
+        session.rollback()
+        logger.error(f"Error processing device {device_serial}: {str(e)}")
         return False
\ No newline at end of file
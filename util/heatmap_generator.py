@@ -19,6 +19,9 @@ from sqlalchemy import text
 from sqlalchemy.orm import Session
 import boto3
 import tempfile
+from db.s3_utils import get_s3_client
+from db.storage_backend import STORAGE_BACKEND
+from util.profiling import profiled
 import uuid
 
 # 로깅 설정
@@ -30,6 +33,23 @@ KST = pytz_timezone('Asia/Seoul')
 # 고정 장치 시리얼 번호 설정
 DEVICE_SN = "SFRXC12515GF00001"
 
+YOLO_BY_DATE_QUERY = text("""
+    SELECT yolo_result
+    FROM capstone.yolo_results
+    WHERE device = :device_serial
+    AND date = :date
+""")
+
+RECENT_YOLO_QUERY = text("""
+    SELECT yolo_result
+    FROM capstone.yolo_results
+    WHERE device = :device_serial
+    ORDER BY yolo_result->>'timestamp' DESC
+    LIMIT :limit
+""")
+# 날짜를 지정하지 않았을 때 가져올 최근 데이터 수
+RECENT_YOLO_LIMIT = 1000
+
 
 def get_kst_now():
     """현재 한국 시간 반환"""
@@ -38,6 +58,10 @@ def get_kst_now():
 
 def connect_to_s3():
     """S3 클라이언트 연결"""
+    # 로컬 스토리지 백엔드 사용 시 AWS 설정 없이 공용 클라이언트 사용
+    if STORAGE_BACKEND != "s3":
+        return get_s3_client(), os.getenv("S3_BUCKET_NAME") or "local"
+
     try:
         # 환경 변수에서 AWS 설정 가져오기
         region = os.getenv("AWS_DEFAULT_REGION")
@@ -127,24 +151,12 @@ def fetch_yolo_data(session: Session, device_serial: str, date_str=None):
     try:
         if date_str:
             formatted_date = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
-            query = text(f"""
-                SELECT yolo_result 
-                FROM capstone.yolo_results 
-                WHERE device = '{device_serial}' 
-                AND date = '{formatted_date}'
-            """)
             logger.info(f"날짜 {formatted_date}의 YOLO 데이터 조회 중...")
+            result = session.execute(YOLO_BY_DATE_QUERY, {"device_serial": device_serial, "date": formatted_date})
         else:
-            query = text(f"""
-                SELECT yolo_result 
-                FROM capstone.yolo_results 
-                WHERE device = '{device_serial}'
-                ORDER BY yolo_result->>'timestamp' DESC
-                LIMIT 1000  -- 데이터 제한 추가
-            """)
-            logger.info(f"전체 기간(최근 1000건)의 YOLO 데이터 조회 중...")
-
-        result = session.execute(query)
+            logger.info(f"전체 기간(최근 {RECENT_YOLO_LIMIT}건)의 YOLO 데이터 조회 중...")
+            result = session.execute(RECENT_YOLO_QUERY, {"device_serial": device_serial, "limit": RECENT_YOLO_LIMIT})
+
         yolo_results = [row[0] for row in result]
 
         logger.info(f"디바이스 {device_serial}에서 {len(yolo_results)}개의 YOLO 데이터를 가져왔습니다.")
@@ -180,6 +192,7 @@ def fetch_yolo_data(session: Session, device_serial: str, date_str=None):
         return []
 
 
+@profiled("generate_heatmap")
 def generate_heatmap(yolo_results, output_path=None):
     """
     YOLO 결과에서 히트맵 생성 (비GUI 모드로 수정)
@@ -0,0 +1,255 @@
+# /util/hiding_detector.py
+
+import logging
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Dict, Any, List, Optional, Tuple
+import os
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from db.prepared import PreparedQuery
+from repository.hiding_interval_repository import HidingIntervalRepository
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 은신 판단 기준
+LOW_CONF_THRESHOLD = 0.3        # 키포인트 conf가 이 값 이하이면 저신뢰
+MIN_LOW_CONF_KEYPOINTS = 6      # 저신뢰 키포인트가 이 개수 이상이면 은신
+# 은신 프레임 사이 간격이 이 값을 넘으면 별도 구간으로 분리
+HIDING_MAX_GAP_SECONDS = int(os.getenv("HIDING_MAX_GAP_SECONDS", "120"))
+# 한 번에 DB에서 가져올 프레임 수
+HIDING_CHUNK_SIZE = int(os.getenv("HIDING_CHUNK_SIZE", "5000"))
+
+# 은신 판단에 필요한 값만 DB에서 추출 (JSONB 전체를 파이썬으로 가져오지 않음)
+HIDING_FRAME_COLUMNS = """
+        yolo_result->>'timestamp' AS ts,
+        to_timestamp(yolo_result->>'timestamp', 'YYYYMMDD_HH24MISS')::timestamp AS frame_time,
+        CASE jsonb_typeof(yolo_result->'boxes')
+            WHEN 'array' THEN jsonb_array_length(yolo_result->'boxes')
+            ELSE 0
+        END AS box_count,
+        ARRAY(
+            SELECT COALESCE((kp->>'conf')::float, 0)
+            FROM jsonb_array_elements(
+                CASE jsonb_typeof(yolo_result->'keypoints'->0)
+                    WHEN 'array' THEN yolo_result->'keypoints'->0
+                    ELSE '[]'::jsonb
+                END
+            ) AS kp
+        ) AS kp_conf
+"""
+
+HIDING_FRAME_QUERY = text(f"""
+    SELECT {HIDING_FRAME_COLUMNS}
+    FROM capstone.yolo_results
+    WHERE device = :device_serial
+    AND date >= :since_date
+    AND yolo_result->>'timestamp' > :since
+    ORDER BY yolo_result->>'timestamp'
+""")
+
+# 장치의 최근 프레임 (현재 은신 상태 판단용, 1분마다 장치별로 실행되므로 prepared statement)
+RECENT_HIDING_FRAMES_QUERY = PreparedQuery("recent_hiding_frames", f"""
+    SELECT {HIDING_FRAME_COLUMNS}
+    FROM capstone.yolo_results
+    WHERE device = :device_serial
+    ORDER BY yolo_result->>'timestamp' DESC
+    LIMIT :limit
+""")
+
+DEVICE_SERIALS_QUERY = text("""
+    SELECT DISTINCT "SN" FROM capstone.device WHERE "SN" IS NOT NULL
+""")
+
+
+def hiding_frame_flags(box_counts, kp_confs, low_conf_threshold: float = LOW_CONF_THRESHOLD,
+                       min_low_conf_keypoints: int = MIN_LOW_CONF_KEYPOINTS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    프레임별 기본 플래그 계산
+
+    Returns:
+        (no_box, low_conf_hidden): 박스 없음 여부, 박스가 있지만 저신뢰 키포인트가 많은 여부
+    """
+    no_box = np.asarray(box_counts, dtype=np.int64) == 0
+    kp_confs = [confs or () for confs in kp_confs]
+
+    # 가변 길이 키포인트 배열을 1차원으로 펼친 뒤 프레임별로 저신뢰 개수 집계
+    lengths = np.fromiter((len(confs) for confs in kp_confs), dtype=np.int64, count=len(kp_confs))
+    flat = np.fromiter(chain.from_iterable(kp_confs), dtype=np.float64, count=int(lengths.sum()))
+    frame_ids = np.repeat(np.arange(len(kp_confs)), lengths)
+    low_count = np.bincount(frame_ids, weights=flat <= low_conf_threshold, minlength=len(kp_confs))
+
+    low_conf_hidden = ~no_box & (low_count >= min_low_conf_keypoints)
+    return no_box, low_conf_hidden
+
+
+def apply_hiding_rules(no_box: np.ndarray, low_conf_hidden: np.ndarray) -> np.ndarray:
+    """
+    은신 규칙 적용
+    - 박스 없음이 연속된 두 프레임은 모두 은신
+    - 저신뢰 키포인트가 많은 프레임은 은신
+    - 은신으로 판단된 저신뢰 프레임 바로 앞의 박스 없음 프레임도 은신
+    """
+    hidden = low_conf_hidden.copy()
+    no_box_pair = no_box[1:] & no_box[:-1]
+    hidden[1:] |= no_box_pair
+    hidden[:-1] |= no_box_pair
+    hidden[:-1] |= no_box[:-1] & low_conf_hidden[1:]
+    return hidden
+
+
+class _IntervalBuilder:
+    """청크 단위로 들어오는 은신 프레임을 구간으로 병합"""
+
+    def __init__(self, max_gap: timedelta):
+        self.max_gap = np.timedelta64(int(max_gap.total_seconds()), "s")
+        self.intervals: List[Dict[str, Any]] = []
+        self._open = False  # 직전 청크의 마지막 프레임이 은신이었는지
+
+    def feed(self, times: np.ndarray, hidden: np.ndarray, no_box: np.ndarray, low_conf_hidden: np.ndarray):
+        if len(times) == 0:
+            return
+
+        idx = np.flatnonzero(hidden)
+        if idx.size == 0:
+            self._open = False
+            return
+
+        hidden_times = times[idx]
+        breaks = (np.diff(idx) != 1) | (np.diff(hidden_times) > self.max_gap)
+        starts = np.concatenate(([0], np.flatnonzero(breaks) + 1))
+        ends = np.concatenate((np.flatnonzero(breaks), [idx.size - 1]))
+        no_box_cum = np.concatenate(([0], np.cumsum(no_box[idx])))
+        low_conf_cum = np.concatenate(([0], np.cumsum(low_conf_hidden[idx])))
+
+        for i, (s, e) in enumerate(zip(starts, ends)):
+            interval = {
+                "start_time": hidden_times[s].item(),
+                "end_time": hidden_times[e].item(),
+                "frame_count": int(e - s + 1),
+                "no_box_frames": int(no_box_cum[e + 1] - no_box_cum[s]),
+                "low_conf_frames": int(low_conf_cum[e + 1] - low_conf_cum[s])
+            }
+
+            # 직전 청크 끝에서 이어지는 구간이면 병합
+            if (i == 0 and self._open and idx[s] == 0
+                    and hidden_times[s] - np.datetime64(self.intervals[-1]["end_time"], "s") <= self.max_gap):
+                last = self.intervals[-1]
+                last["end_time"] = interval["end_time"]
+                for key in ("frame_count", "no_box_frames", "low_conf_frames"):
+                    last[key] += interval[key]
+                continue
+
+            self.intervals.append(interval)
+
+        self._open = bool(hidden[-1])
+
+
+def fetch_device_serials(session: Session) -> List[str]:
+    """등록된 장치 시리얼 번호 목록"""
+    return [row[0] for row in session.execute(DEVICE_SERIALS_QUERY)]
+
+
+def _since_date(since: str) -> str:
+    """체크포인트 타임스탬프의 하루 전 날짜 (파티션 프루닝용, 체크포인트가 없으면 전체 기간)"""
+    if not since:
+        return "1970-01-01"
+    return (datetime.strptime(since, "%Y%m%d_%H%M%S") - timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+def stream_hiding_frames(session: Session, device_serial: str, since: str, chunk_size: int = HIDING_CHUNK_SIZE):
+    """체크포인트 이후 프레임을 chunk_size 단위로 스트리밍 (서버 측 커서)"""
+    result = session.execute(
+        HIDING_FRAME_QUERY.execution_options(yield_per=chunk_size),
+        {"device_serial": device_serial, "since": since, "since_date": _since_date(since)}
+    )
+    for partition in result.partitions(chunk_size):
+        yield partition
+
+
+def process_hiding_for_device(session: Session, device_serial: str,
+                              chunk_size: int = HIDING_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    장치 하나의 새 프레임으로 은신 구간을 계산하여 저장하고 체크포인트 갱신
+
+    체크포인트에는 마지막 프레임의 상태(박스 없음, 은신 여부)를 함께 저장하여
+    다음 실행에서 이전 프레임 기준 규칙을 그대로 이어서 적용한다.
+    """
+    repository = HidingIntervalRepository()
+    max_gap = timedelta(seconds=HIDING_MAX_GAP_SECONDS)
+    builder = _IntervalBuilder(max_gap)
+
+    checkpoint = repository.get_checkpoint(session, device_serial)
+    # carry: 아직 구간에 반영하지 않은 마지막 프레임 (다음 청크의 첫 프레임과 함께 판단)
+    carry: Optional[Dict[str, Any]] = None
+    if checkpoint:
+        carry = {
+            "ts": checkpoint.last_timestamp,
+            "time": np.datetime64(datetime.strptime(checkpoint.last_timestamp, "%Y%m%d_%H%M%S"), "s"),
+            "no_box": checkpoint.last_no_box,
+            "low_conf_hidden": False,
+            "hidden": checkpoint.last_hidden,
+            "stored": True  # 이전 실행에서 이미 저장된 프레임
+        }
+
+    frame_count = 0
+    for rows in stream_hiding_frames(session, device_serial, checkpoint.last_timestamp if checkpoint else "", chunk_size):
+        timestamps = [row[0] for row in rows]
+        times = np.array([row[1] for row in rows], dtype="datetime64[s]")
+        no_box, low_conf_hidden = hiding_frame_flags([row[2] for row in rows], [row[3] for row in rows])
+        frame_count += len(rows)
+
+        if carry:
+            timestamps = [carry["ts"]] + timestamps
+            times = np.concatenate(([carry["time"]], times))
+            no_box = np.concatenate(([carry["no_box"]], no_box))
+            low_conf_hidden = np.concatenate(([carry["low_conf_hidden"]], low_conf_hidden))
+
+        hidden = apply_hiding_rules(no_box, low_conf_hidden)
+        if carry:
+            hidden[0] |= carry["hidden"]
+        emit = hidden.copy()
+        if carry and carry["stored"] and carry["hidden"]:
+            # 이미 은신 구간으로 저장된 프레임은 다시 세지 않음
+            emit[0] = False
+
+        # 마지막 프레임은 다음 프레임을 보고 판단해야 하므로 carry로 넘김
+        builder.feed(times[:-1], emit[:-1], no_box[:-1], low_conf_hidden[:-1])
+        carry = {
+            "ts": timestamps[-1],
+            "time": times[-1],
+            "no_box": bool(no_box[-1]),
+            "low_conf_hidden": bool(low_conf_hidden[-1]),
+            "hidden": bool(hidden[-1]),
+            "stored": False
+        }
+
+    if frame_count == 0:
+        return {"device": device_serial, "frames": 0, "intervals": 0}
+
+    # 마지막 프레임 반영 후 체크포인트 저장
+    builder.feed(
+        np.array([carry["time"]]), np.array([carry["hidden"]]),
+        np.array([carry["no_box"]]), np.array([carry["low_conf_hidden"]])
+    )
+    saved = repository.save_intervals(session, device_serial, builder.intervals, max_gap)
+    repository.set_checkpoint(session, device_serial, carry["ts"], carry["no_box"], carry["hidden"])
+    session.commit()
+
+    logger.info(f"Hiding detection for {device_serial}: {frame_count} frames, {saved} intervals")
+    return {"device": device_serial, "frames": frame_count, "intervals": saved}
+
+
+def process_hiding_for_all_devices(session: Session, chunk_size: int = HIDING_CHUNK_SIZE) -> List[Dict[str, Any]]:
+    """등록된 모든 장치에 대해 은신 구간 계산 (장치별로 커밋, 실패한 장치는 건너뜀)"""
+    results = []
+    for device_serial in fetch_device_serials(session):
+        try:
+            results.append(process_hiding_for_device(session, device_serial, chunk_size))
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error in hiding detection for {device_serial}: {e}")
+    return results
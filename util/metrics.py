@@ -0,0 +1,202 @@
+# /util/metrics.py
+
+import os
+import time
+import logging
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import FastAPI, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+)
+from sqlalchemy import event
+from starlette.routing import Match
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_PATH = "/metrics"
+# 여러 워커로 실행할 때 워커별 지표를 합산하려면 prometheus_client 멀티프로세스 디렉토리 지정
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# 라우트에 매칭되지 않는 요청은 경로 대신 이 값으로 집계 (라벨 개수 폭증 방지)
+UNMATCHED_ROUTE = "unmatched"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "처리 중인 HTTP 요청 수",
+    ["method", "route"], multiprocess_mode="livesum"
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "요청당 SQL 쿼리 수",
+    ["method", "route"], buckets=COUNT_BUCKETS
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "요청당 SQL 실행 시간 합계",
+    ["method", "route"], buckets=LATENCY_BUCKETS
+)
+REQUEST_S3_CALLS = Histogram(
+    "http_request_s3_calls", "요청당 S3 API 호출 수",
+    ["method", "route"], buckets=COUNT_BUCKETS
+)
+REQUEST_S3_SECONDS = Histogram(
+    "http_request_s3_seconds", "요청당 S3 API 호출 시간 합계",
+    ["method", "route"], buckets=LATENCY_BUCKETS
+)
+S3_CALLS = Counter("s3_calls_total", "S3 API 호출 수", ["operation"])
+OPENAI_TOKENS = Counter("openai_tokens_total", "OpenAI API 토큰 사용량", ["source", "kind"])
+
+
+def route_template(app: FastAPI, scope) -> str:
+    """요청 경로에 매칭되는 라우트의 경로 템플릿 (예: /pets/{pet_id}/state)"""
+    partial = None
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+
+@dataclass
+class RequestStats:
+    """요청 하나 동안 실행된 SQL / S3 호출 집계"""
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    s3_calls: int = 0
+    s3_seconds: float = 0.0
+
+
+# 현재 요청의 집계 (동기 엔드포인트의 스레드풀에도 컨텍스트가 복사되어 같은 객체를 갱신)
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class MetricsMiddleware:
+    """
+    라우트(경로 템플릿)별 지연시간, 처리 중 요청 수, 요청당 SQL/S3 호출 수와 시간을 기록하는 ASGI 미들웨어
+    스트리밍 응답(SSE 등)은 응답 본문 전송이 끝날 때까지를 처리 시간으로 기록함
+    """
+
+    def __init__(self, app, fastapi_app: FastAPI):
+        self.app = app
+        self.fastapi_app = fastapi_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == METRICS_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(self.fastapi_app, scope)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        in_progress = REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_LATENCY.labels(method, route, str(status["code"])).observe(time.perf_counter() - start)
+            in_progress.dec()
+            _request_stats.reset(token)
+            REQUEST_DB_QUERIES.labels(method, route).observe(stats.db_queries)
+            REQUEST_DB_SECONDS.labels(method, route).observe(stats.db_seconds)
+            REQUEST_S3_CALLS.labels(method, route).observe(stats.s3_calls)
+            REQUEST_S3_SECONDS.labels(method, route).observe(stats.s3_seconds)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+
+
+def record_s3_call(operation: str, seconds: float):
+    """S3 API 호출 1건 기록 (요청 처리 중이면 요청 집계에도 반영)"""
+    S3_CALLS.labels(operation).inc()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.s3_calls += 1
+        stats.s3_seconds += seconds
+
+
+def record_openai_tokens(source: str, prompt_tokens: int, completion_tokens: int):
+    """OpenAI 호출 1건의 토큰 사용량 기록 (source: classifier / answer / answer_stream)"""
+    OPENAI_TOKENS.labels(source, "prompt").inc(prompt_tokens or 0)
+    OPENAI_TOKENS.labels(source, "completion").inc(completion_tokens or 0)
+
+
+def _before_s3_call(model, context, **kwargs):
+    context["metrics_start_time"] = time.perf_counter()
+
+
+def _after_s3_call(model, context, **kwargs):
+    start = context.get("metrics_start_time")
+    if start is not None:
+        record_s3_call(model.name, time.perf_counter() - start)
+
+
+def instrument_engine(engine):
+    """SQLAlchemy 엔진의 쿼리 실행 시간 집계"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def instrument_storage_client(client):
+    """S3 클라이언트 호출 집계 (boto3는 botocore 이벤트, 로컬 스토리지는 호출 훅 사용)"""
+    if hasattr(client, "meta"):
+        client.meta.events.register("before-call.s3", _before_s3_call)
+        client.meta.events.register("after-call.s3", _after_s3_call)
+    elif hasattr(client, "on_api_call"):
+        client.on_api_call = record_s3_call
+
+
+def setup_metrics(app: FastAPI, engine, storage_client=None):
+    """
+    Prometheus 지표 수집 미들웨어와 /metrics 엔드포인트 등록
+    METRICS_ENABLED=false이면 아무것도 등록하지 않음
+    """
+    if not METRICS_ENABLED:
+        return
+
+    instrument_engine(engine)
+    if storage_client is not None:
+        instrument_storage_client(storage_client)
+    app.add_middleware(MetricsMiddleware, fastapi_app=app)
+
+    @app.get(METRICS_PATH, include_in_schema=False)
+    def metrics():
+        if PROMETHEUS_MULTIPROC_DIR:
+            from prometheus_client import multiprocess
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+    logger.info(f"Prometheus metrics exposed on {METRICS_PATH}")
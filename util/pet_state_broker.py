@@ -0,0 +1,187 @@
+# /util/pet_state_broker.py
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import uuid
+from typing import Any, Dict, Iterable, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# 워커 간 이벤트 전달용 Postgres 채널
+PET_STATE_CHANNEL = "pet_state_events"
+PET_STATE_NOTIFY_ENABLED = os.getenv("PET_STATE_NOTIFY_ENABLED", "true").lower() == "true"
+# 구독자별 대기 이벤트 최대 개수 (느린 클라이언트는 오래된 이벤트부터 버림)
+SUBSCRIBER_QUEUE_SIZE = 100
+# LISTEN 연결이 끊겼을 때 재연결 대기 시간(초)
+LISTEN_RETRY_SECONDS = 5
+
+NOTIFY_QUERY = text("SELECT pg_notify(:channel, :payload)")
+
+
+class PetStateBroker:
+    """
+    장치(SN) 단위 상태 이벤트 pub/sub (프로세스 내 메모리)
+    - 1분 주기 작업이 은신 상태/활동량 변경을 publish
+    - publish된 이벤트는 같은 워커의 구독자에게 바로 전달되고,
+      pg_notify로 다른 워커에도 전달되어 각 워커의 구독자에게 전달됨
+    - 스케줄러가 모든 워커에서 실행되므로 같은 이벤트가 여러 번 들어올 수 있어
+      (SN, 이벤트 종류)별 마지막 이벤트 키로 중복을 제거함
+    """
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._last_keys: Dict[tuple, str] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, device_sns: Iterable[str]) -> asyncio.Queue:
+        """장치 목록의 이벤트를 받을 큐 등록 (이벤트 루프 안에서 호출)"""
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            for sn in set(device_sns):
+                self._subscribers.setdefault(sn, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue, device_sns: Iterable[str]):
+        with self._lock:
+            for sn in set(device_sns):
+                queues = self._subscribers.get(sn)
+                if queues:
+                    queues.discard(queue)
+                    if not queues:
+                        del self._subscribers[sn]
+
+    def publish(self, db: Optional[Session], event: Dict[str, Any]):
+        """
+        이벤트 발행 (같은 워커 구독자에게 전달 후 다른 워커에 NOTIFY)
+
+        Args:
+            db: NOTIFY를 보낼 세션 (None이면 같은 워커에만 전달)
+            event: {"type", "SN", "key", ...} 형태의 이벤트
+        """
+        self._dispatch(event)
+
+        if db is None or not PET_STATE_NOTIFY_ENABLED:
+            return
+        try:
+            payload = json.dumps({"origin": self.origin, "event": event}, ensure_ascii=False, default=str)
+            db.execute(NOTIFY_QUERY, {"channel": PET_STATE_CHANNEL, "payload": payload})
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error sending pet state notify: {e}")
+
+    def _dispatch(self, event: Dict[str, Any]):
+        """중복이 아닌 이벤트를 해당 장치 구독자 큐에 전달"""
+        dedupe_key = (event["SN"], event["type"])
+        with self._lock:
+            if self._last_keys.get(dedupe_key) == event["key"]:
+                return
+            self._last_keys[dedupe_key] = event["key"]
+            queues = list(self._subscribers.get(event["SN"], ()))
+
+        if not queues or self._loop is None:
+            return
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        for queue in queues:
+            if running is self._loop:
+                self._put(queue, event)
+            else:
+                self._loop.call_soon_threadsafe(self._put, queue, event)
+
+    def _put(self, queue: asyncio.Queue, event: Dict[str, Any]):
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+    async def listen(self, engine):
+        """
+        다른 워커가 보낸 NOTIFY를 받아 같은 워커 구독자에게 전달 (앱 시작 시 백그라운드 태스크로 실행)
+        """
+        if not PET_STATE_NOTIFY_ENABLED:
+            return
+
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        while True:
+            connection = None
+            try:
+                connection = engine.raw_connection()
+                dbapi_connection = connection.dbapi_connection
+                dbapi_connection.autocommit = True
+                with dbapi_connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {PET_STATE_CHANNEL}")
+
+                readable = asyncio.Event()
+                loop.add_reader(dbapi_connection.fileno(), readable.set)
+                logger.info(f"Listening for pet state events on {PET_STATE_CHANNEL}")
+                try:
+                    while True:
+                        await readable.wait()
+                        readable.clear()
+                        dbapi_connection.poll()
+                        while dbapi_connection.notifies:
+                            self._handle_notify(dbapi_connection.notifies.pop(0).payload)
+                finally:
+                    loop.remove_reader(dbapi_connection.fileno())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Pet state listener error: {e}")
+            finally:
+                if connection is not None:
+                    try:
+                        connection.invalidate()
+                    except Exception:
+                        pass
+            await asyncio.sleep(LISTEN_RETRY_SECONDS)
+
+    def _handle_notify(self, payload: str):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Invalid pet state notify payload")
+            return
+        if message.get("origin") == self.origin:
+            return
+        self._dispatch(message["event"])
+
+
+pet_state_broker = PetStateBroker()
+
+
+def state_event(state: Dict[str, Any]) -> Dict[str, Any]:
+    """refresh_device_state 결과를 은신 상태 이벤트로 변환"""
+    return {
+        "type": "state",
+        "SN": state["SN"],
+        "key": str(state["is_hiding"]),
+        "is_hiding": state["is_hiding"],
+        "updated_at": state["updated_at"].isoformat() if state["updated_at"] else None,
+        "last_frame_timestamp": state["last_frame_timestamp"]
+    }
+
+
+def activity_event(record: Dict[str, Any]) -> Dict[str, Any]:
+    """active_reports 레코드를 최신 활동량 이벤트로 변환"""
+    return {
+        "type": "activity",
+        "SN": record["SN"],
+        "key": f"{record['DATE']}{record['TIME']}:{record['active']}",
+        "DATE": record["DATE"],
+        "TIME": record["TIME"],
+        "active": record["active"]
+    }
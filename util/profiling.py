@@ -0,0 +1,226 @@
+# /util/profiling.py
+
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import cProfile
+import logging
+import functools
+import threading
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+
+from fastapi import FastAPI
+from sqlalchemy import event
+
+from util.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+# 프로파일링 모드 (기본 꺼짐, 켜도 요청 중 PROFILING_SAMPLE_RATE 비율만 프로파일링)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0.1"))
+# 프로파일러 종류 (cprofile / pyinstrument, pyinstrument는 별도 설치 필요)
+PROFILER = os.getenv("PROFILER", "cprofile").lower()
+PROFILING_DIR = os.getenv("PROFILING_DIR", "./profiles")
+# 이 시간(ms) 이상 걸린 SQL은 파라미터, EXPLAIN 결과와 함께 기록 (샘플링과 무관하게 항상)
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+SLOW_QUERY_LOG = "slow_queries.jsonl"
+
+# 요청 밖(스케줄러 작업 등)에서 호출된 경우의 라우트 키
+BACKGROUND_KEY = "background"
+
+# 현재 요청이 샘플링되었으면 라우트 템플릿, 아니면 None
+_profile_route: ContextVar[Optional[str]] = ContextVar("profile_route", default=None)
+# 현재 요청의 라우트 템플릿 (느린 쿼리 기록용, 샘플링 여부와 무관)
+_current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+_write_lock = threading.Lock()
+
+
+def _route_dir(route: str) -> str:
+    """라우트 템플릿을 디렉토리 이름으로 변환 (예: /pets/{pet_id}/state → pets_pet_id_state)"""
+    name = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_")
+    path = os.path.join(PROFILING_DIR, name or "root")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class ProfilingMiddleware:
+    """요청을 PROFILING_SAMPLE_RATE 비율로 샘플링하여 @profiled 함수가 프로파일을 남기도록 표시"""
+
+    def __init__(self, app, fastapi_app: FastAPI):
+        self.app = app
+        self.fastapi_app = fastapi_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = f"{scope['method']} {route_template(self.fastapi_app, scope)}"
+        route_token = _current_route.set(route)
+        profile_token = _profile_route.set(route if random.random() < PROFILING_SAMPLE_RATE else None)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _profile_route.reset(profile_token)
+            _current_route.reset(route_token)
+
+
+def _should_profile() -> Optional[str]:
+    """프로파일을 남길 라우트 키 (요청 밖에서는 같은 비율로 샘플링)"""
+    if _current_route.get() is not None:
+        return _profile_route.get()
+    return BACKGROUND_KEY if random.random() < PROFILING_SAMPLE_RATE else None
+
+
+def _start_profiler(is_async: bool):
+    """프로파일러 시작 (다른 프로파일링이 이미 실행 중이면 None)"""
+    try:
+        if PROFILER == "pyinstrument":
+            from pyinstrument import Profiler
+            profiler = Profiler(async_mode="enabled" if is_async else "disabled")
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        return profiler
+    except (RuntimeError, ValueError) as e:
+        # Python 3.12+의 cProfile은 프로세스에서 동시에 하나만 실행 가능
+        logger.debug(f"Profiler not started: {e}")
+        return None
+
+
+def _save_profile(profiler, route: str, name: str, elapsed: float):
+    filename = f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{int(elapsed * 1000)}ms"
+    try:
+        if PROFILER == "pyinstrument":
+            profiler.stop()
+            path = os.path.join(_route_dir(route), filename + ".html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+        else:
+            profiler.disable()
+            path = os.path.join(_route_dir(route), filename + ".prof")
+            profiler.dump_stats(path)
+        logger.info(f"Profile saved: {path}")
+    except Exception as e:
+        logger.error(f"Error saving profile for {name}: {e}")
+
+
+def profiled(name: str):
+    """
+    샘플링된 요청(또는 요청 밖 호출)에서 함수 실행을 프로파일링하여 PROFILING_DIR/{라우트}/에 저장
+    PROFILING_ENABLED=false이면 원래 함수를 그대로 반환 (오버헤드 없음)
+
+    cProfile은 실행 중인 스레드만 측정하므로 비동기 함수는 같은 이벤트 루프의 다른 작업이 섞일 수 있음
+    (PROFILER=pyinstrument이면 await 구간을 호출한 함수에 정확히 귀속)
+    """
+    def decorator(func):
+        if not PROFILING_ENABLED:
+            return func
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                route = _should_profile()
+                if route is None:
+                    return await func(*args, **kwargs)
+                profiler = _start_profiler(is_async=True)
+                if profiler is None:
+                    return await func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    _save_profile(profiler, route, name, time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            route = _should_profile()
+            if route is None:
+                return func(*args, **kwargs)
+            profiler = _start_profiler(is_async=False)
+            if profiler is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _save_profile(profiler, route, name, time.perf_counter() - start)
+        return wrapper
+
+    return decorator
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profiling_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("profiling_start_time")
+    if not start_times:
+        return
+    elapsed_ms = (time.perf_counter() - start_times.pop()) * 1000
+    if elapsed_ms < SLOW_QUERY_THRESHOLD_MS:
+        return
+
+    route = _current_route.get() or BACKGROUND_KEY
+    logger.warning(f"Slow query ({elapsed_ms:.0f}ms) in {route}: {' '.join(statement.split())[:200]}")
+
+    plan = None
+    if SLOW_QUERY_EXPLAIN and not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        plan = _explain(conn.engine, statement, parameters)
+
+    record = {
+        "time": datetime.now().isoformat(),
+        "route": route,
+        "elapsed_ms": round(elapsed_ms, 1),
+        "statement": statement,
+        "parameters": parameters,
+        "plan": plan
+    }
+    try:
+        with _write_lock:
+            os.makedirs(PROFILING_DIR, exist_ok=True)
+            with open(os.path.join(PROFILING_DIR, SLOW_QUERY_LOG), "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+    except Exception as e:
+        logger.error(f"Error writing slow query log: {e}")
+
+
+def _explain(engine, statement, parameters):
+    """
+    느린 쿼리의 실행 계획 (EXPLAIN, 실제 실행은 하지 않음)
+    원래 트랜잭션이 EXPLAIN 실패로 중단되지 않도록 별도 연결에서 실행
+    """
+    try:
+        with engine.connect() as connection:
+            rows = connection.exec_driver_sql("EXPLAIN " + statement, parameters).fetchall()
+        return "\n".join(row[0] for row in rows)
+    except Exception as e:
+        logger.debug(f"EXPLAIN failed: {e}")
+        return None
+
+
+def setup_profiling(app: FastAPI, engine):
+    """
+    프로파일링 미들웨어와 느린 쿼리 기록 훅 등록
+    PROFILING_ENABLED=false이면 아무것도 등록하지 않음
+    """
+    if not PROFILING_ENABLED:
+        return
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    app.add_middleware(ProfilingMiddleware, fastapi_app=app)
+    logger.info(
+        f"Profiling enabled: sample rate {PROFILING_SAMPLE_RATE}, slow query threshold {SLOW_QUERY_THRESHOLD_MS}ms, "
+        f"output {PROFILING_DIR}"
+    )
@@ -39,6 +39,7 @@ async def run_every_5_minutes(func: Callable, *args, **kwargs):
     """
     1분마다 함수를 실행하는 비동기 루프로 변경
     정각 기준으로 정확히 매 분마다 실행
+    동기 함수는 스레드에서 실행하며, 이전 실행이 끝난 뒤에 다음 실행을 예약하므로 겹치지 않음
     """
     while True:
         # 현재 시간
@@ -79,7 +80,8 @@ async def run_every_5_minutes(func: Callable, *args, **kwargs):
             if asyncio.iscoroutinefunction(func):
                 await func(*args, **task_kwargs)
             else:
-                func(*args, **task_kwargs)
+                # 동기 작업(DB/NumPy)은 스레드에서 실행하여 이벤트 루프(SSE, 비동기 채팅 등)를 막지 않음
+                await asyncio.to_thread(func, *args, **task_kwargs)
 
             logger.info(
                 f"Completed scheduled task. Duration: {(datetime.now() - now_execution).total_seconds():.2f} seconds")
@@ -91,6 +93,7 @@ async def run_daily_at_midnight(func: Callable, *args, **kwargs):
     """
     매일 자정에 함수를 실행하는 비동기 루프
     한국 시간 기준 (UTC+9)
+    동기 함수는 스레드에서 실행
     """
     while True:
         # 현재 한국 시간
@@ -115,7 +118,7 @@ async def run_daily_at_midnight(func: Callable, *args, **kwargs):
             if asyncio.iscoroutinefunction(func):
                 await func(*args, **kwargs)
             else:
-                func(*args, **kwargs)
+                await asyncio.to_thread(func, *args, **kwargs)
 
             logger.info(
                 f"Completed daily task. Duration: {(get_kst_now() - now_execution).total_seconds():.2f} seconds")
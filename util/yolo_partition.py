@@ -0,0 +1,334 @@
+# /util/yolo_partition.py
+
+import os
+import re
+import json
+import logging
+import tempfile
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+YOLO_SCHEMA = "capstone"
+YOLO_TABLE = "yolo_results"
+# 파티션 도입 전 데이터를 통째로 담는 파티션 (MINVALUE ~ 도입 시점)
+LEGACY_PARTITION = f"{YOLO_TABLE}_legacy"
+# date가 NULL이거나 미리 만든 파티션 범위를 벗어난 행이 들어가는 파티션
+DEFAULT_PARTITION = f"{YOLO_TABLE}_default"
+
+# 미리 만들어 둘 미래 월 파티션 수 (이번 달 제외)
+YOLO_PARTITION_PREMAKE_MONTHS = int(os.getenv("YOLO_PARTITION_PREMAKE_MONTHS", "3"))
+# 이 개월 수보다 오래된 월 파티션은 S3에 Parquet로 보관 후 분리/삭제
+YOLO_RETENTION_MONTHS = int(os.getenv("YOLO_RETENTION_MONTHS", "12"))
+YOLO_ARCHIVE_PREFIX = os.getenv("YOLO_ARCHIVE_PREFIX", "archive/yolo_results")
+YOLO_ARCHIVE_CHUNK_SIZE = 50000
+YOLO_ARCHIVE_COMPRESSION = "zstd"
+
+# 1분 주기 쿼리의 파티션 프루닝용 date 범위 여유 (date 컬럼과 타임스탬프의 날짜 경계가 어긋나도 누락 없도록)
+PARTITION_DATE_MARGIN = timedelta(days=1)
+
+# 장치 + 타임스탬프 조회용 인덱스 (부모 테이블에 만들면 모든 파티션에 생성됨)
+DEVICE_TIMESTAMP_INDEX = f"{YOLO_TABLE}_device_ts_idx"
+
+IS_PARTITIONED_QUERY = text("""
+    SELECT EXISTS (
+        SELECT 1
+        FROM pg_partitioned_table p
+        JOIN pg_class c ON c.oid = p.partrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = :schema AND c.relname = :table
+    )
+""")
+
+PARTITION_BOUNDS_QUERY = text("""
+    SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    JOIN pg_class parent ON parent.oid = i.inhparent
+    JOIN pg_namespace n ON n.oid = parent.relnamespace
+    WHERE n.nspname = :schema AND parent.relname = :table
+    ORDER BY c.relname
+""")
+
+MAX_DATE_QUERY = text(f"SELECT max(date) FROM {YOLO_SCHEMA}.{YOLO_TABLE}")
+
+# FOR VALUES FROM ('2025-05-01') TO ('2025-06-01') / FROM (MINVALUE) TO (...)
+_RANGE_BOUND = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def partition_date_range(start_time: datetime, end_time: datetime) -> Tuple[str, str]:
+    """
+    타임스탬프 범위 조회에 함께 걸 date 조건 (파티션 프루닝용, 양 끝에 하루씩 여유)
+
+    Returns:
+        (start_date, end_date): 'YYYY-MM-DD' 문자열 (둘 다 포함)
+    """
+    return (
+        (start_time - PARTITION_DATE_MARGIN).strftime("%Y-%m-%d"),
+        (end_time + PARTITION_DATE_MARGIN).strftime("%Y-%m-%d")
+    )
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    """월 초 날짜에 months개월을 더함"""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """월 파티션 이름 (예: yolo_results_p202505)"""
+    return f"{YOLO_TABLE}_p{month.strftime('%Y%m')}"
+
+
+def _parse_bound(value: str) -> Optional[date]:
+    """파티션 경계 표현식을 날짜로 변환 (MINVALUE / MAXVALUE는 None)"""
+    value = value.strip()
+    if value.upper() in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.strptime(value.strip("'")[:10], "%Y-%m-%d").date()
+
+
+def is_partitioned(connection) -> bool:
+    """capstone.yolo_results가 파티션 테이블인지 확인"""
+    return bool(connection.execute(IS_PARTITIONED_QUERY, {"schema": YOLO_SCHEMA, "table": YOLO_TABLE}).scalar())
+
+
+def list_partitions(connection) -> List[Tuple[str, Optional[date], Optional[date]]]:
+    """
+    범위 파티션 목록 (기본 파티션 제외)
+
+    Returns:
+        [(파티션 이름, 하한(포함, MINVALUE면 None), 상한(미포함, MAXVALUE면 None))]
+    """
+    partitions = []
+    for name, bound in connection.execute(PARTITION_BOUNDS_QUERY, {"schema": YOLO_SCHEMA, "table": YOLO_TABLE}):
+        match = _RANGE_BOUND.search(bound or "")
+        if match:
+            partitions.append((name, _parse_bound(match.group(1)), _parse_bound(match.group(2))))
+    return partitions
+
+
+def _overlaps(partitions, start: date, end: date) -> bool:
+    for _, lower, upper in partitions:
+        if (lower is None or lower < end) and (upper is None or start < upper):
+            return True
+    return False
+
+
+def create_month_partition(connection, month: date) -> str:
+    """
+    월 파티션 생성
+    기본 파티션에 이미 들어간 해당 월 행(파티션을 미리 만들지 못한 경우)은 새 파티션으로 옮긴 뒤 연결
+    """
+    start, end = month_start(month), add_months(month_start(month), 1)
+    name = partition_name(start)
+    parent = f"{YOLO_SCHEMA}.{YOLO_TABLE}"
+    bounds = {"start": start.isoformat(), "end": end.isoformat()}
+
+    connection.execute(text(f"CREATE TABLE {YOLO_SCHEMA}.{name} (LIKE {parent} INCLUDING DEFAULTS)"))
+    moved = connection.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {YOLO_SCHEMA}.{DEFAULT_PARTITION}
+            WHERE date >= :start AND date < :end
+            RETURNING *
+        )
+        INSERT INTO {YOLO_SCHEMA}.{name} SELECT * FROM moved
+    """), bounds).rowcount
+    connection.execute(text(
+        f"ALTER TABLE {parent} ATTACH PARTITION {YOLO_SCHEMA}.{name} "
+        f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    ))
+    logger.info(f"Created partition {name} [{start}, {end})" + (f", moved {moved} rows from default" if moved else ""))
+    return name
+
+
+def ensure_future_partitions(connection, today: Optional[date] = None,
+                             months: int = YOLO_PARTITION_PREMAKE_MONTHS) -> List[str]:
+    """
+    이번 달부터 months개월 뒤까지의 월 파티션을 미리 생성 (이미 있거나 다른 파티션과 겹치면 건너뜀)
+    파티션 테이블이 아니면 아무것도 하지 않음
+
+    Returns:
+        새로 만든 파티션 이름 목록
+    """
+    if not is_partitioned(connection):
+        return []
+
+    today = today or date.today()
+    partitions = list_partitions(connection)
+    created = []
+    for i in range(months + 1):
+        start = add_months(month_start(today), i)
+        if _overlaps(partitions, start, add_months(start, 1)):
+            continue
+        name = create_month_partition(connection, start)
+        partitions.append((name, start, add_months(start, 1)))
+        created.append(name)
+    return created
+
+
+def migrate_to_partitioned(engine, today: Optional[date] = None) -> bool:
+    """
+    기존 capstone.yolo_results를 date 기준 월 단위 범위 파티션 테이블로 전환 (1회성)
+    기존 테이블은 yolo_results_legacy로 이름을 바꿔 (MINVALUE ~ 다음 달) 파티션으로 그대로 연결 (데이터 복사 없음)
+
+    전체 이력을 읽는 작업은 배타 잠금 밖에서 먼저 수행하여 1분 주기 작업이 멈추지 않도록 함
+    1. 장치 + 타임스탬프 인덱스를 기존 테이블에 CREATE INDEX CONCURRENTLY로 생성
+    2. NULL date 행을 기본 파티션이 될 테이블로 이동
+    3. 범위 CHECK 제약을 NOT VALID로 추가한 뒤 VALIDATE (쓰기를 막지 않는 잠금으로 전체 검증)
+    4. 짧은 트랜잭션에서 이름 변경 → 파티션 부모 생성 → 부모 인덱스(ON ONLY) 생성 → 파티션 연결
+       (검증된 CHECK 제약으로 연결 시 검증 스캔을 건너뛰고, 1의 인덱스가 부모 인덱스에 그대로 연결됨)
+
+    새 부모 테이블에는 기존 테이블의 권한이 복사되지 않으므로 적재 계정의 INSERT 권한은 별도로 부여
+    2~4 사이에 NULL date 행이 새로 들어오면 3에서 실패하며, 다시 실행하면 이어서 진행함
+
+    Returns:
+        전환했으면 True, 이미 파티션 테이블이면 False
+    """
+    with engine.connect() as connection:
+        if is_partitioned(connection):
+            return False
+        max_date = connection.execute(MAX_DATE_QUERY).scalar()
+
+    today = today or date.today()
+    if isinstance(max_date, str):
+        max_date = datetime.strptime(max_date[:10], "%Y-%m-%d").date()
+    boundary = add_months(month_start(max(max_date or today, today)), 1).isoformat()
+
+    parent = f"{YOLO_SCHEMA}.{YOLO_TABLE}"
+    legacy = f"{YOLO_SCHEMA}.{LEGACY_PARTITION}"
+    default = f"{YOLO_SCHEMA}.{DEFAULT_PARTITION}"
+    legacy_index = f"{LEGACY_PARTITION}_device_ts_idx"
+    range_check = f"{LEGACY_PARTITION}_range"
+
+    # 1. 기존 테이블 인덱스 (CONCURRENTLY는 트랜잭션 밖에서만 실행 가능)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {legacy_index} "
+            f"ON {parent} (device, (yolo_result->>'timestamp'))"
+        ))
+    logger.info(f"Built {legacy_index} on {parent}")
+
+    # 2. NULL date 행 이동
+    with engine.begin() as connection:
+        connection.execute(text(f"CREATE TABLE IF NOT EXISTS {default} (LIKE {parent} INCLUDING DEFAULTS)"))
+        moved = connection.execute(text(f"""
+            WITH moved AS (DELETE FROM {parent} WHERE date IS NULL RETURNING *)
+            INSERT INTO {default} SELECT * FROM moved
+        """)).rowcount
+    logger.info(f"Moved {moved} NULL-date rows to {default}")
+
+    # 3. 범위 CHECK 제약 (추가는 짧은 잠금, 검증은 쓰기를 막지 않는 잠금)
+    with engine.begin() as connection:
+        connection.execute(text(f"ALTER TABLE {parent} DROP CONSTRAINT IF EXISTS {range_check}"))
+        connection.execute(text(
+            f"ALTER TABLE {parent} ADD CONSTRAINT {range_check} "
+            f"CHECK (date IS NOT NULL AND date < '{boundary}') NOT VALID"
+        ))
+    with engine.begin() as connection:
+        connection.execute(text(f"ALTER TABLE {parent} VALIDATE CONSTRAINT {range_check}"))
+    logger.info(f"Validated {range_check} (date < {boundary})")
+
+    # 4. 전환 (메타데이터 변경만 수행하는 짧은 트랜잭션)
+    with engine.begin() as connection:
+        connection.execute(text(f"ALTER TABLE {parent} RENAME TO {LEGACY_PARTITION}"))
+        connection.execute(text(f"CREATE TABLE {parent} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE (date)"))
+        connection.execute(text(
+            f"CREATE INDEX {DEVICE_TIMESTAMP_INDEX} ON ONLY {parent} (device, (yolo_result->>'timestamp'))"
+        ))
+        connection.execute(text(
+            f"ALTER TABLE {parent} ATTACH PARTITION {legacy} FOR VALUES FROM (MINVALUE) TO ('{boundary}')"
+        ))
+        connection.execute(text(f"ALTER TABLE {parent} ATTACH PARTITION {default} DEFAULT"))
+        ensure_future_partitions(connection, today)
+    logger.info(f"Converted {parent} to a partitioned table (legacy partition up to {boundary})")
+    return True
+
+
+def _write_parquet(connection, partition: str, path: str) -> int:
+    """파티션 전체를 서버 측 커서로 청크 단위로 읽어 Parquet 파일로 저장 (JSONB 컬럼은 JSON 문자열)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    result = connection.execution_options(yield_per=YOLO_ARCHIVE_CHUNK_SIZE).execute(
+        text(f"SELECT * FROM {YOLO_SCHEMA}.{partition}")
+    )
+    columns = list(result.keys())
+    writer = None
+    row_count = 0
+    try:
+        for rows in result.partitions(YOLO_ARCHIVE_CHUNK_SIZE):
+            data = {}
+            for i, column in enumerate(columns):
+                values = [row[i] for row in rows]
+                if any(isinstance(value, (dict, list)) for value in values):
+                    values = [None if value is None else json.dumps(value, ensure_ascii=False) for value in values]
+                data[column] = values
+            table = pa.Table.from_pydict(data)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression=YOLO_ARCHIVE_COMPRESSION)
+            else:
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+            row_count += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return row_count
+
+
+def archive_partition(connection, storage_client, bucket: str, partition: str, drop: bool = True) -> Optional[str]:
+    """
+    파티션을 압축 Parquet로 S3에 업로드한 뒤 부모 테이블에서 분리 (drop=True면 삭제까지)
+
+    Returns:
+        업로드한 S3 키 (빈 파티션이면 업로드 없이 분리하고 None)
+    """
+    key = f"{YOLO_ARCHIVE_PREFIX}/{partition}.parquet"
+    fd, path = tempfile.mkstemp(suffix=".parquet")
+    os.close(fd)
+    try:
+        row_count = _write_parquet(connection, partition, path)
+        if row_count:
+            storage_client.upload_file(path, bucket, key)
+            logger.info(f"Archived {row_count} rows of {partition} to s3://{bucket}/{key}")
+    finally:
+        os.remove(path)
+
+    connection.execute(text(f"ALTER TABLE {YOLO_SCHEMA}.{YOLO_TABLE} DETACH PARTITION {YOLO_SCHEMA}.{partition}"))
+    if drop:
+        connection.execute(text(f"DROP TABLE {YOLO_SCHEMA}.{partition}"))
+    logger.info(f"Detached partition {partition}" + (" and dropped it" if drop else ""))
+    return key if row_count else None
+
+
+def archive_expired_partitions(engine, storage_client, bucket: str, today: Optional[date] = None,
+                               retention_months: int = YOLO_RETENTION_MONTHS, drop: bool = True) -> List[str]:
+    """
+    상한이 보관 기준월(이번 달 - retention_months) 이전인 파티션을 하나씩 보관 처리
+    파티션마다 별도 트랜잭션으로 실행하여 실패해도 이미 보관한 파티션은 유지
+
+    Returns:
+        보관 처리한 파티션 이름 목록
+    """
+    today = today or date.today()
+    cutoff = add_months(month_start(today), -retention_months)
+
+    with engine.connect() as connection:
+        if not is_partitioned(connection):
+            return []
+        expired = [name for name, _, upper in list_partitions(connection) if upper is not None and upper <= cutoff]
+
+    archived = []
+    for name in expired:
+        with engine.begin() as connection:
+            archive_partition(connection, storage_client, bucket, name, drop=drop)
+        archived.append(name)
+    return archived